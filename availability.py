@@ -0,0 +1,118 @@
+"""
+Precomputed employee availability.
+Compiles leaves, work pattern off days, shift preferences and shift exclusions
+once, so the day model builders and the feasibility checker read the same facts.
+"""
+import numpy as np
+
+
+class Availability:
+    """
+    Availability of every employee for days first_day .. first_day + no_days - 1.
+
+    Attributes (row r is day first_day + r):
+        on_leave[r, i]: employee i is on leave
+        pattern_off[r, i]: employee i has a work pattern off day
+        shift_allowed[i, value]: preferences/exclusions allow employee i to work shift value
+        allowed[r, i, value]: employee i may take value (0 = off), before forbidden transitions
+        blocked[prev, value]: value may not follow prev (config["forbidden_constraints"])
+    """
+
+    def __init__(self, config, inputs, no_days, first_day=0, elapsed_days=None):
+        """
+        Args:
+            inputs: Output of config.generate_config_from_json (shift_day, work_pattern, leaves, ...)
+            first_day: Day index (0-based) of the first row, used for leave lookups
+            elapsed_days: Days between when inputs["shift_day"] was recorded and first_day;
+                          defaults to first_day (shift_day recorded at day 0)
+        """
+        self.config = config
+        self.inputs = inputs
+        self.no_days = no_days
+        self.first_day = first_day
+        self.elapsed_days = first_day if elapsed_days is None else elapsed_days
+
+        no_employees = config["no_employees"]
+        no_values = config["no_shifts"] + 1
+        self.on_leave = np.zeros((no_days, no_employees), dtype=bool)
+        self.pattern_off = np.zeros((no_days, no_employees), dtype=bool)
+        self.shift_allowed = np.zeros((no_employees, no_values), dtype=bool)
+        self.allowed = np.zeros((no_days, no_employees, no_values), dtype=bool)
+
+        self.blocked = np.zeros((no_values, no_values), dtype=bool)
+        for k_val, forbidden_val in config["forbidden_constraints"]:
+            self.blocked[k_val, forbidden_val] = True
+
+        # Work pattern off days, one pattern at a time
+        work_pattern = np.asarray(inputs["work_pattern"])
+        pattern_days = np.asarray(inputs["shift_day"]) + self.elapsed_days + np.arange(no_days)[:, None]
+        for pattern_id, pattern in config["work_pattern"].items():
+            members = work_pattern == pattern_id
+            self.pattern_off[:, members] = np.isin(pattern_days[:, members] % pattern["total_days"], pattern["off_days"])
+
+        for i in range(no_employees):
+            self._compile_leaves(i)
+            self._compile_shifts(i)
+        self._compile(slice(None), slice(None))
+
+    def update_employee(self, i):
+        """Recompiles employee i after a change to their pattern, leaves, preferences or exclusions."""
+        pattern = self.config["work_pattern"][self.inputs["work_pattern"][i]]
+        pattern_days = (self.inputs["shift_day"][i] + self.elapsed_days + np.arange(self.no_days)) % pattern["total_days"]
+        self.pattern_off[:, i] = np.isin(pattern_days, pattern["off_days"])
+        self._compile_leaves(i)
+        self._compile_shifts(i)
+        self._compile(slice(None), i)
+
+    def update_leave(self, i, day):
+        """Refreshes employee i on a single day after their leave set changed."""
+        row = day - self.first_day
+        if 0 <= row < self.no_days:
+            employee_leaves = self.inputs.get("employee_leaves", [])
+            self.on_leave[row, i] = i < len(employee_leaves) and day in employee_leaves[i]
+            self._compile(row, i)
+
+    def _compile_leaves(self, i):
+        employee_leaves = self.inputs.get("employee_leaves", [])
+        self.on_leave[:, i] = False
+        if i < len(employee_leaves):
+            rows = [day - self.first_day for day in employee_leaves[i] if 0 <= day - self.first_day < self.no_days]
+            self.on_leave[rows, i] = True
+
+    def _compile_shifts(self, i):
+        shift_preferences = self.inputs.get("shift_preferences", [])
+        shift_exclusions = self.inputs.get("shift_exclusions", [])
+        preferred = shift_preferences[i] if i < len(shift_preferences) else set()
+        excluded = shift_exclusions[i] if i < len(shift_exclusions) else set()
+        self.shift_allowed[i, 0] = False
+        for value in range(1, self.config["no_shifts"] + 1):
+            self.shift_allowed[i, value] = value not in excluded and (not preferred or value in preferred)
+
+    def _compile(self, rows, employees):
+        """Derives allowed[rows, employees] from the leave, pattern and shift tables."""
+        off = self.on_leave[rows, employees] | self.pattern_off[rows, employees]
+        self.allowed[rows, employees, 0] = off
+        self.allowed[rows, employees, 1:] = ~off[..., None] & self.shift_allowed[employees, 1:]
+
+    def on_duty(self):
+        """on_duty[r, i]: employee i must work a shift on day first_day + r."""
+        return ~(self.on_leave | self.pattern_off)
+
+    def day_mask(self, day, previous_day=None):
+        """allowed values for every employee on day, minus forbidden transitions from previous_day."""
+        mask = self.allowed[day - self.first_day]
+        if previous_day is not None:
+            mask = mask & ~self.blocked[np.asarray(previous_day)]
+        return mask
+
+    def day_domains(self, day, previous_day=None):
+        """Sorted allowed values per employee on day (0 = off)."""
+        return [np.flatnonzero(row).tolist() for row in self.day_mask(day, previous_day)]
+
+
+def availability_for(config, inputs, no_days):
+    """Returns inputs["availability"] if it covers days 0 .. no_days - 1, otherwise compiles a new one."""
+    availability = inputs.get("availability")
+    if availability is None or availability.first_day != 0 or availability.no_days < no_days:
+        availability = Availability(config, inputs, no_days)
+    return availability
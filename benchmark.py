@@ -0,0 +1,1074 @@
+"""
+Benchmarks for roaster generation.
+Compares solver engines on the sample config.json and on synthetic inputs.
+
+Usage:
+    python benchmark.py <benchmark name>
+"""
+import contextlib
+import copy
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+from availability import Availability
+from config import generate_config_from_json
+from ortools.sat.python import cp_model
+
+from diagnosis import diagnose_infeasibility
+from csp import build_day_model, configure_solver, create_day_schedule, day_domains, employee_classes, update_quality_count
+from feasibility_checker import FeasibilityChecker, check_feasibility, check_feasibility_per_day, check_feasibility_reference
+from flow import solve_day_flow
+from generate_roaster import simulate_roaster, iter_roaster
+from horizon import create_horizon_schedule, create_rolling_schedule, create_cyclic_schedule
+from telemetry import Telemetry
+from writers import RosterCsvWriter, RosterXlsxWriter
+
+
+def load_sample_config(path="config.json"):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def synthetic_json_config(no_employees, no_days, seed=0, tightness=0.45, leave_ratio=0.1):
+    """
+    Generates a config.json-style dict with the sample's shifts and work patterns.
+
+    tightness is the fraction of all employees required by the summed shift minimums.
+    """
+    rng = random.Random(seed)
+    no_shifts = 5
+    min_per_shift = max(1, round(no_employees * tightness / no_shifts))
+    max_per_shift = max(min_per_shift + 1, -(-no_employees // 4))
+    start_date = "2025-01-06"
+    shifts = [
+        {"shift_id": s + 1, "start_time": start, "end_time": end,
+         "min_no_of_employees": min_per_shift, "max_no_of_employees": max_per_shift, "colour": "FFFFFF"}
+        for s, (start, end) in enumerate([("00:00:00", "06:00:00"), ("06:00:00", "10:00:00"), ("10:00:00", "14:00:00"),
+                                           ("14:00:00", "18:00:00"), ("18:00:00", "00:00:00")])
+    ]
+    work_pattern = [
+        {"pettern_id": 1, "no_working_days": 4, "no_off_days": 2},
+        {"pettern_id": 2, "no_working_days": 6, "no_off_days": 3},
+        {"pettern_id": 3, "no_working_days": 5, "no_off_days": 2, "strict_weekend_off": "True"},
+    ]
+    totals = {1: 6, 2: 9, 3: 7}
+    employees = []
+    for e in range(no_employees):
+        pattern_id = rng.choice([1, 1, 2, 2, 3])
+        phase = rng.randrange(totals[pattern_id])
+        employee = {
+            "employee_id": f"SYN{e:05d}",
+            "name": f"Employee {e + 1}",
+            "preferred_work_pattern": pattern_id,
+            "no_work_days_from_previous_pattern": phase,
+            "no_off_days_from_previous_pattern": 0,
+            "last_shift": rng.randint(1, no_shifts),
+            "quality": [rng.randint(0, 4) for _ in range(no_shifts)],
+        }
+        roll = rng.random()
+        if roll < 0.1:
+            employee["shift_preference"] = sorted(rng.sample(range(1, no_shifts + 1), 3))
+        elif roll < 0.2:
+            employee["shift_exclusion"] = sorted(rng.sample(range(1, no_shifts + 1), 2))
+        if rng.random() < leave_ratio and no_days > 7:
+            first = rng.randrange(no_days - 5)
+            length = rng.randint(3, 7)
+            employee["leaves"] = [{"start_date": _date_after(start_date, first),
+                                   "end_date": _date_after(start_date, min(no_days - 1, first + length - 1))}]
+        employees.append(employee)
+
+    return {
+        "start_date": start_date,
+        "end_date": _date_after(start_date, no_days - 1),
+        "no_work_pattern": len(work_pattern),
+        "work_pattern": work_pattern,
+        "no_of_shifts": no_shifts,
+        "shifts": shifts,
+        "min_time_between_shifts": 12,
+        "no_of_employees": no_employees,
+        "employees": employees,
+    }
+
+
+def _date_after(start_date, days):
+    return (datetime.date.fromisoformat(start_date) + datetime.timedelta(days=days)).isoformat()
+
+
+def prepare(json_config, **overrides):
+    """Converts a config.json-style dict into (no_days, config, inputs, constraints)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        no_days, config, inputs, constraints, _ = generate_config_from_json(copy.deepcopy(json_config))
+    config.update(overrides)
+    return no_days, config, inputs, constraints
+
+
+def roster_cost(config, inputs, schedule):
+    """Replays the day model's objective (quality_count + 1 per worked shift) over a roster."""
+    cost = 0
+    quality_count = inputs["quality_count"]
+    for solution in schedule:
+        cost += sum(quality_count[i][value - 1] + 1 for i, value in enumerate(solution) if value > 0)
+        quality_count = update_quality_count(config, quality_count, solution)
+    return cost
+
+
+def quality_spread(quality_count):
+    """Sum over employees of the gap between their most and least worked shift."""
+    return sum(max(row) - min(row) for row in quality_count)
+
+
+def run_daily(no_days, config, inputs, constraints):
+    inputs = dict(inputs, schedule=[])
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simulate_roaster(0, no_days, config, inputs, constraints)
+
+
+def run_daily_stats(no_days, config, inputs, constraints):
+    """run_daily that also returns simulate_roaster's search counters."""
+    stats = {}
+    inputs = dict(inputs, schedule=[])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = simulate_roaster(0, no_days, config, inputs, constraints, stats)
+    return result, stats
+
+
+def run_daily_resume(no_days, config, inputs, constraints):
+    """run_daily_stats continuing from config["checkpoint_file"]."""
+    stats = {}
+    inputs = dict(inputs, schedule=[])
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = simulate_roaster(0, no_days, config, inputs, constraints, stats, resume=True)
+    return result, stats
+
+
+def run_streaming(no_days, config, inputs, constraints, commit_depth, directory, employees, shift_colours):
+    """
+    Streams iter_roaster into roster.csv/roster.xlsx in directory, under tracemalloc.
+
+    Returns:
+        (schedule or None, seconds to the first written day, peak traced bytes)
+    """
+    inputs = dict(inputs, schedule=[])
+    schedule, first_day = [], None
+    start = time.perf_counter()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()), \
+            RosterCsvWriter(os.path.join(directory, "roster.csv"), employees) as csv_writer, \
+            RosterXlsxWriter(os.path.join(directory, "roster.xlsx"), employees, shift_colours) as xlsx_writer:
+        days = iter_roaster(0, no_days, config, inputs, constraints, commit_depth=commit_depth)
+        while True:
+            try:
+                day, solution = next(days)
+            except StopIteration as done:
+                complete = done.value is not None
+                break
+            date = datetime.date(2025, 1, 1) + datetime.timedelta(days=day)
+            csv_writer.write_day(date, solution)
+            xlsx_writer.write_day(date, solution)
+            if first_day is None:
+                first_day = time.perf_counter() - start
+            schedule.append(solution)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return schedule if complete else None, first_day, peak
+
+
+def run_daily_telemetry(no_days, config, inputs, constraints, mode, path):
+    """
+    run_daily with telemetry: None, a hook counting events, or a JSON lines file at path.
+
+    Returns:
+        (schedule or None, search seconds, events emitted)
+    """
+    events = []
+    telemetry = None
+    if mode == "hook":
+        telemetry = Telemetry(hook=events.append)
+    elif mode == "file":
+        telemetry = Telemetry(path, hook=events.append)
+    inputs = dict(inputs, schedule=[])
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        schedule, _ = simulate_roaster(0, no_days, config, inputs, constraints, telemetry=telemetry)
+    seconds = time.perf_counter() - start
+    if telemetry is not None:
+        telemetry.close()
+    return schedule, seconds, len(events)
+
+
+def run_horizon(no_days, config, inputs, constraints):
+    return create_horizon_schedule(no_days, config, inputs, constraints)
+
+
+def run_rolling(no_days, config, inputs, constraints):
+    return create_rolling_schedule(no_days, config, inputs, constraints)
+
+
+def _call_into_queue(queue, fn, args):
+    queue.put(fn(*args))
+
+
+def run_with_timeout(fn, args, timeout):
+    """
+    Runs fn(*args) in a child process.
+
+    Returns:
+        (result, seconds, timed_out)
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_call_into_queue, args=(queue, fn, args))
+    start = time.perf_counter()
+    process.start()
+    try:
+        # Read before joining: a child blocked on a large put() never exits
+        result = queue.get(timeout=timeout)
+    except queue_module.Empty:
+        process.terminate()
+        process.join()
+        return None, time.perf_counter() - start, True
+    seconds = time.perf_counter() - start
+    process.join()
+    return result, seconds, False
+
+
+def _report(case, engine, result, seconds, timed_out, config, inputs):
+    if timed_out:
+        outcome, cost, spread = "timeout", "-", "-"
+    elif result is None or result[0] is None:
+        outcome, cost, spread = "no roster", "-", "-"
+    else:
+        outcome, cost, spread = "ok", roster_cost(config, inputs, result[0]), quality_spread(result[1])
+    print(f"{case:<24} {engine:<10} {seconds:>9.2f}s {outcome:<10} {cost:>8} {spread:>8}")
+
+
+def bench_horizon(timeout=300):
+    """
+    Day-by-day backtracking vs the whole-horizon model.
+
+    cost replays the day model's objective over the roster; spread is the final
+    quality_count imbalance (lower is fairer for both).
+    """
+    cases = [("sample config.json", load_sample_config())]
+    for no_employees, no_days in [(60, 30), (200, 30), (500, 60)]:
+        cases.append((f"synthetic {no_employees}x{no_days}", synthetic_json_config(no_employees, no_days)))
+
+    print(f"{'case':<24} {'engine':<10} {'time':>10} {'outcome':<10} {'cost':>8} {'spread':>8}")
+    for case, json_config in cases:
+        # Leave the horizon solver time to return its best roster before the timeout
+        no_days, config, inputs, constraints = prepare(json_config, horizon_time_limit=timeout * 0.9)
+        for engine, fn in [("daily", run_daily), ("horizon", run_horizon)]:
+            result, seconds, timed_out = run_with_timeout(fn, (no_days, config, inputs, constraints), timeout)
+            _report(case, engine, result, seconds, timed_out, config, inputs)
+
+
+def random_day_inputs(no_days, config, inputs, rng):
+    """Picks a random day and previous-day assignment to solve a single day model from."""
+    day = rng.randrange(no_days)
+    return day, dict(
+        inputs,
+        shift_day=[value + day for value in inputs["shift_day"]],
+        previous_day=[rng.randint(0, config["no_shifts"]) for _ in inputs["previous_day"]],
+    )
+
+
+def feasible_day_inputs(no_days, config, inputs, constraints, rng):
+    """random_day_inputs, redrawn until the day has a solution."""
+    engine = config.get("day_engine", "cpsat")
+    config["day_engine"] = "flow"
+    try:
+        while True:
+            day, day_inputs = random_day_inputs(no_days, config, inputs, rng)
+            if create_day_schedule(config, day_inputs, constraints, current_day=day)[0] is not None:
+                return day, day_inputs
+    finally:
+        config["day_engine"] = engine
+
+
+def day_cost(inputs, solution):
+    return sum(inputs["quality_count"][i][value - 1] + 1 for i, value in enumerate(solution) if value > 0)
+
+
+def check_day_solution(config, inputs, constraints, day, solution):
+    """Asserts that solution satisfies every hard constraint of the day model."""
+    for i, domain in enumerate(day_domains(config, inputs, day)):
+        assert solution[i] in domain, f"employee {i} got {solution[i]} outside {domain}"
+    for value in range(1, config["no_shifts"] + 1):
+        assert constraints["min_count"][value] <= solution.count(value) <= constraints["max_count"][value]
+
+
+def bench_flow(instances=60, seed=0):
+    """
+    Min-cost flow day engine vs the CP-SAT day model on randomized single days.
+
+    Every instance must agree on feasibility and on the optimal cost.
+    """
+    rng = random.Random(seed)
+    timings = {"cpsat": 0.0, "flow": 0.0}
+    feasible = 0
+    for instance in range(instances):
+        no_employees = rng.choice([20, 50, 100, 300])
+        json_config = synthetic_json_config(no_employees, 14, seed=rng.randrange(10 ** 6),
+                                            tightness=rng.uniform(0.3, 0.75), leave_ratio=0.3)
+        no_days, config, inputs, constraints = prepare(json_config)
+        day, day_inputs = random_day_inputs(no_days, config, inputs, rng)
+
+        results = {}
+        for engine in timings:
+            config["day_engine"] = engine
+            start = time.perf_counter()
+            solution, _ = create_day_schedule(config, day_inputs, constraints, current_day=day)
+            timings[engine] += time.perf_counter() - start
+            results[engine] = solution
+
+        assert (results["cpsat"] is None) == (results["flow"] is None), f"instance {instance}: feasibility differs"
+        if results["flow"] is not None:
+            feasible += 1
+            check_day_solution(config, day_inputs, constraints, day, results["flow"])
+            cpsat_cost, flow_cost = day_cost(day_inputs, results["cpsat"]), day_cost(day_inputs, results["flow"])
+            assert cpsat_cost == flow_cost, f"instance {instance}: CP-SAT cost {cpsat_cost} != flow cost {flow_cost}"
+
+    print(f"{instances} instances ({feasible} feasible): feasibility and optimal cost identical")
+    for engine, seconds in timings.items():
+        print(f"{engine:<6} total {seconds:8.3f}s   mean {1000 * seconds / instances:8.2f}ms per day")
+
+
+def bench_encoding(sizes=(100, 500, 2000), cuts=(0, 3), seed=0):
+    """Model size and build/solve time of the integer and boolean day encodings."""
+    print(f"{'employees':>9} {'cuts':>4} {'encoding':<8} {'vars':>7} {'constraints':>11} {'build':>8} "
+          f"{'solve (portfolio)':>18} {'solve (automatic)':>18} objective")
+    for no_employees in sizes:
+        no_days, config, inputs, constraints = prepare(synthetic_json_config(no_employees, 14, seed=seed))
+        day, day_inputs = feasible_day_inputs(no_days, config, inputs, constraints, random.Random(seed))
+
+        # Exclusion cuts from successive optimal days, as simulate_roaster would add them
+        config.update(day_encoding="boolean", search_branching="automatic")
+        prev_solutions = []
+        for _ in range(max(cuts)):
+            solution, _ = create_day_schedule(config, day_inputs, constraints, list(prev_solutions), current_day=day)
+            prev_solutions.append(solution)
+
+        for no_cuts in cuts:
+            for encoding in ("integer", "boolean"):
+                config["day_encoding"] = encoding
+                start = time.perf_counter()
+                model, decode = build_day_model(config, day_inputs, constraints, prev_solutions[:no_cuts], day)
+                build = time.perf_counter() - start
+                proto = model.Proto()
+
+                solves, objectives = [], []
+                for branching in ("portfolio", "automatic"):
+                    config["search_branching"] = branching
+                    solver = configure_solver(cp_model.CpSolver(), config)
+                    start = time.perf_counter()
+                    status = solver.Solve(model)
+                    solves.append(f"{time.perf_counter() - start:>17.3f}s")
+                    objectives.append(str(solver.ObjectiveValue()) if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else "-")
+                print(f"{no_employees:>9} {no_cuts:>4} {encoding:<8} {len(proto.variables):>7} {len(proto.constraints):>11} "
+                      f"{build:>7.3f}s {solves[0]} {solves[1]} {'/'.join(objectives)}")
+
+
+def bench_backjump(timeout=60, seeds=(1, 3, 4, 5, 6, 8)):
+    """
+    Chronological backtracking vs conflict-directed backjumping on tight synthetic rosters.
+
+    30 employees over 21 days with a 16 hour rest rule, so forbidden transitions
+    and work pattern phases leave some days (or the whole period) without solutions.
+    """
+    print(f"{'case':<24} {'driver':<14} {'time':>10} {'outcome':<10} {'solves':>7} {'nogoods':>8} {'skipped':>8}")
+    for seed in seeds:
+        json_config = synthetic_json_config(30, 21, seed=seed, tightness=0.5, leave_ratio=0)
+        json_config["min_time_between_shifts"] = 16
+        for driver, backjumping in [("chronological", False), ("backjumping", True)]:
+            no_days, config, inputs, constraints = prepare(json_config, backjumping=backjumping)
+            result, seconds, timed_out = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                outcome, stats = "timeout", {}
+            else:
+                (schedule, _), stats = result
+                outcome = "no roster" if schedule is None else "ok"
+            print(f"{f'synthetic 30x21 seed {seed}':<24} {driver:<14} {seconds:>9.2f}s {outcome:<10} "
+                  f"{stats.get('solves', '-'):>7} {stats.get('nogoods', '-'):>8} {stats.get('skipped_levels', '-'):>8}")
+
+
+def bench_lookahead(timeout=60, seeds=(3, 4, 6, 8, 9)):
+    """
+    simulate_roaster without lookahead vs the "check" and "model" lookahead modes.
+
+    pruned counts candidates the "check" mode rejected; backtracks counts days
+    the search had to leave without a roster (chronological backtracking).
+    """
+    cases = [("sample config.json", load_sample_config())]
+    for seed in seeds:
+        json_config = synthetic_json_config(30, 21, seed=seed, tightness=0.45, leave_ratio=0)
+        json_config["min_time_between_shifts"] = 16
+        cases.append((f"synthetic 30x21 seed {seed}", json_config))
+
+    print(f"{'case':<24} {'lookahead':<10} {'time':>10} {'outcome':<10} {'solves':>7} {'backtracks':>10} {'pruned':>7}")
+    for case, json_config in cases:
+        for lookahead in (False, "check", "model"):
+            no_days, config, inputs, constraints = prepare(json_config, lookahead=lookahead)
+            result, seconds, timed_out = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                outcome, stats = "timeout", {}
+            else:
+                (schedule, _), stats = result
+                outcome = "no roster" if schedule is None else "ok"
+            print(f"{case:<24} {str(lookahead):<10} {seconds:>9.2f}s {outcome:<10} {stats.get('solves', '-'):>7} "
+                  f"{stats.get('backtracks', '-'):>10} {stats.get('lookahead_pruned', '-'):>7}")
+
+
+def bench_failed_states(timeout=60, seeds=(3, 4, 8)):
+    """
+    Chronological backtracking with and without the failed-state cache.
+
+    Same tight 30x21 rosters as bench_backjump; tolerance is the allowed
+    quality_count difference for a cache hit ("-" ignores quality_count).
+    """
+    settings = [("off", 0, None), ("exact", 10000, 0), ("tol 2", 10000, 2), ("any quality", 10000, None)]
+    print(f"{'case':<24} {'cache':<12} {'time':>10} {'outcome':<10} {'solves':>7} {'hits':>7} {'misses':>7}")
+    for seed in seeds:
+        json_config = synthetic_json_config(30, 21, seed=seed, tightness=0.5, leave_ratio=0)
+        json_config["min_time_between_shifts"] = 16
+        for name, size, tolerance in settings:
+            no_days, config, inputs, constraints = prepare(json_config, failed_state_cache_size=size,
+                                                           failed_state_quality_tolerance=tolerance)
+            result, seconds, timed_out = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                outcome, stats = "timeout", {}
+            else:
+                (schedule, _), stats = result
+                outcome = "no roster" if schedule is None else "ok"
+            print(f"{f'synthetic 30x21 seed {seed}':<24} {name:<12} {seconds:>9.2f}s {outcome:<10} {stats.get('solves', '-'):>7} "
+                  f"{stats.get('failed_state_hits', '-'):>7} {stats.get('failed_state_misses', '-'):>7}")
+
+
+def bench_pool(timeout=60):
+    """
+    Solver calls and time per attempted day with and without the per-day solution pool.
+
+    attempts counts candidate days tried; without the pool every attempt is a
+    solve, with it a day's retries share one pooled solve.
+    """
+    cases = [("seed 4, threshold 10", 4, dict(failed_state_cache_size=10000)),
+             ("seed 1, threshold 3", 1, dict(threshold=3))]
+    pools = [("off", {}), ("pool", dict(solution_pool=True)),
+             ("pool gap 3 dist 3", dict(solution_pool=True, solution_pool_gap=3, solution_pool_min_distance=3))]
+    print(f"{'case':<22} {'pool':<18} {'time':>9} {'solves':>7} {'attempts':>8} {'solves/attempt':>14} {'ms/attempt':>10}")
+    for case, seed, overrides in cases:
+        json_config = synthetic_json_config(30, 21, seed=seed, tightness=0.5, leave_ratio=0)
+        json_config["min_time_between_shifts"] = 16
+        for name, pool in pools:
+            no_days, config, inputs, constraints = prepare(json_config, **overrides, **pool)
+            result, seconds, timed_out = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                print(f"{case:<22} {name:<18} {seconds:>8.2f}s timeout")
+                continue
+            _, stats = result
+            print(f"{case:<22} {name:<18} {seconds:>8.2f}s {stats['solves']:>7} {stats['attempts']:>8} "
+                  f"{stats['solves'] / stats['attempts']:>14.2f} {1000 * seconds / stats['attempts']:>10.1f}")
+
+
+def bench_rolling(timeout=900, lengths=(30, 60, 120, 180, 365), no_employees=60):
+    """Runtime vs horizon length of the rolling-horizon mode (W=7, K=5), with the daily driver for reference."""
+    print(f"{'days':>5} {'engine':<8} {'time':>10} {'per day':>9} {'outcome':<10} {'cost':>8} {'spread':>8}")
+    for no_days in lengths:
+        no_days, config, inputs, constraints = prepare(synthetic_json_config(no_employees, no_days, seed=8))
+        for engine, fn in [("daily", run_daily), ("rolling", run_rolling)]:
+            result, seconds, timed_out = run_with_timeout(fn, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                outcome, cost, spread = "timeout", "-", "-"
+            elif result[0] is None:
+                outcome, cost, spread = "no roster", "-", "-"
+            else:
+                outcome, cost, spread = "ok", roster_cost(config, inputs, result[0]), quality_spread(result[1])
+            print(f"{no_days:>5} {engine:<8} {seconds:>9.2f}s {1000 * seconds / no_days:>7.0f}ms {outcome:<10} {cost:>8} {spread:>8}")
+
+
+def bench_budget(budgets=(None, 5, 20), timeout=90):
+    """
+    Wall-clock time of simulate_roaster under a run-level time budget.
+
+    The tight 30x21 seed 4 roster backtracks for over a minute without a budget;
+    the sample and seed 8 finish well inside any budget. solver is the per-day
+    solver time summed over every attempt, gap the largest per-day relative gap.
+    """
+    tight = synthetic_json_config(30, 21, seed=4, tightness=0.5, leave_ratio=0)
+    tight["min_time_between_shifts"] = 16
+    cases = [("sample config.json", load_sample_config(), {}),
+             ("synthetic 60x30 seed 8", synthetic_json_config(60, 30, seed=8), {}),
+             ("synthetic 60x30 gap 5%", synthetic_json_config(60, 30, seed=8), dict(relative_gap_limit=0.05)),
+             ("synthetic 30x21 seed 4", tight, {})]
+    print(f"{'case':<24} {'budget':>7} {'time':>10} {'outcome':<10} {'solver':>9} {'gap':>7}")
+    for case, json_config, overrides in cases:
+        for seconds in budgets:
+            no_days, config, inputs, constraints = prepare(json_config, time_budget=seconds, **overrides)
+            result, elapsed, timed_out = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            if timed_out:
+                print(f"{case:<24} {str(seconds):>7} {elapsed:>9.2f}s killed")
+                continue
+            (schedule, _), stats = result
+            outcome = "ok" if schedule is not None else "timeout" if stats["timed_out"] or stats["timeouts"] else "no roster"
+            gaps = [gap for gap in stats["day_gap"] if gap is not None]
+            print(f"{case:<24} {str(seconds):>7} {elapsed:>9.2f}s {outcome:<10} {sum(stats['day_seconds']):>8.2f}s "
+                  f"{max(gaps, default=0.0):>6.1%}")
+
+
+def bench_workers(workers=(1, 4, 8, 16), timeout=300):
+    """
+    simulate_roaster with parallel CP-SAT day solves, free vs interleaved (deterministic) workers.
+
+    Each setting runs twice; same says whether both runs produced the same roster.
+    Instances: small 30x14, medium 200x7 and large 500x7 synthetic rosters, with
+    seeds that have a roster.
+    """
+    sizes = [("small 30x14", 30, 14, 3), ("medium 200x7", 200, 7, 0), ("large 500x7", 500, 7, 1)]
+    print(f"{'case':<14} {'workers':>7} {'mode':<12} {'time':>10} {'outcome':<10} {'cost':>8} {'same':<5}")
+    for case, no_employees, no_days, seed in sizes:
+        json_config = synthetic_json_config(no_employees, no_days, seed=seed, tightness=0.4)
+        for no_workers in workers:
+            for mode, interleave in [("parallel", False), ("interleaved", True)]:
+                if no_workers == 1 and interleave:
+                    continue  # A single worker is deterministic already
+                no_days, config, inputs, constraints = prepare(json_config, search_workers=no_workers,
+                                                               interleave_search=interleave)
+                runs = [run_with_timeout(run_daily, (no_days, config, inputs, constraints), timeout) for _ in range(2)]
+                (result, seconds, timed_out), (again, _, _) = runs
+                if timed_out:
+                    print(f"{case:<14} {no_workers:>7} {mode:<12} {seconds:>9.2f}s timeout")
+                    continue
+                outcome = "ok" if result[0] is not None else "no roster"
+                cost = roster_cost(config, inputs, result[0]) if result[0] is not None else "-"
+                same = again is not None and again[0] == result[0]
+                print(f"{case:<14} {no_workers:>7} {mode:<12} {seconds:>9.2f}s {outcome:<10} {cost:>8} {str(same):<5}")
+
+
+class FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Records the time from construction to the first solution found."""
+
+    def __init__(self):
+        super().__init__()
+        self.start = time.perf_counter()
+        self.first = None
+
+    def OnSolutionCallback(self):
+        if self.first is None:
+            self.first = time.perf_counter() - self.start
+
+
+def bench_hints(cases=((60, 30, 8), (200, 14, 0)), first_day=7):
+    """
+    Time to first solution and to optimum of day solves with and without solution hints.
+
+    A daily run provides the roster; each day from first_day on is then re-solved as
+    a first attempt (cold vs the "cycle" hint, the same weekday a week earlier) and as
+    a retry excluding the roster's solution (cold vs the "attempt" hint, with and
+    without repair_hint, since the excluded attempt itself is infeasible).
+    """
+    print(f"{'case':<12} {'solve':<8} {'hint':<15} {'first solution':>15} {'optimum':>9}")
+    for no_employees, no_days, seed in cases:
+        json_config = synthetic_json_config(no_employees, no_days, seed=seed, tightness=0.4)
+        no_days, config, inputs, constraints = prepare(json_config)
+        schedule, _ = run_daily(no_days, config, inputs, constraints)
+        inputs = dict(inputs, availability=Availability(config, inputs, no_days))
+
+        settings = [("first", "cold", None, False), ("first", "cycle", "cycle", False),
+                    ("retry", "cold", None, False), ("retry", "attempt", "attempt", False),
+                    ("retry", "attempt+repair", "attempt", True)]
+        timings = {setting: [0.0, 0.0] for setting in settings}
+        quality_count = inputs["quality_count"]
+        for day in range(no_days):
+            if day >= first_day:
+                day_inputs = dict(inputs, previous_day=schedule[day - 1], quality_count=quality_count)
+                for setting in settings:
+                    solve, _, source, repair = setting
+                    prev_solutions = [schedule[day]] if solve == "retry" else []
+                    hint = {"cycle": schedule[day - 7], "attempt": schedule[day]}.get(source)
+                    config["repair_hint"] = repair
+                    model, _ = build_day_model(config, day_inputs, constraints, prev_solutions, day, hint=hint)
+                    solver = configure_solver(cp_model.CpSolver(), config)
+                    timer = FirstSolutionTimer()
+                    solver.Solve(model, timer)
+                    timings[setting][0] += timer.first or 0.0
+                    timings[setting][1] += time.perf_counter() - timer.start
+            quality_count = update_quality_count(config, quality_count, schedule[day])
+
+        solved = no_days - first_day
+        for (solve, name, _, _), (first, total) in timings.items():
+            print(f"{f'{no_employees}x{no_days}':<12} {solve:<8} {name:<15} {1000 * first / solved:>13.1f}ms "
+                  f"{1000 * total / solved:>7.1f}ms")
+
+
+def check_roster(no_days, config, inputs, constraints, schedule):
+    """Asserts that schedule satisfies every hard constraint over the whole horizon."""
+    availability = Availability(config, inputs, no_days)
+    assert len(schedule) == no_days
+    previous_day = inputs["previous_day"]
+    for day, solution in enumerate(schedule):
+        for i, domain in enumerate(availability.day_domains(day, previous_day)):
+            assert solution[i] in domain, f"day {day}: employee {i} got {solution[i]} outside {domain}"
+        for value in range(1, config["no_shifts"] + 1):
+            assert constraints["min_count"][value] <= list(solution).count(value) <= constraints["max_count"][value]
+        previous_day = solution
+
+
+def bench_cyclic(lengths=(91, 182, 365), no_employees=60, timeout=300):
+    """
+    Cyclic mode vs the daily driver on sites with fixed work patterns.
+
+    Employees work the 6-day and the 7-day strict_weekend_off patterns (a 42-day
+    cycle); "leaves" gives 10% of employees one 3-7 day leave, which the cyclic
+    mode patches. Every roster is checked against all hard constraints.
+    """
+    print(f"{'days':>5} {'leaves':<7} {'engine':<7} {'time':>10} {'outcome':<10} {'cost':>8} {'spread':>8}")
+    for no_days in lengths:
+        for leave_ratio in (0, 0.1):
+            json_config = synthetic_json_config(no_employees, no_days, seed=8, tightness=0.4, leave_ratio=leave_ratio)
+            for employee in json_config["employees"]:
+                if employee["preferred_work_pattern"] == 2:
+                    employee["preferred_work_pattern"] = 1
+                    employee["no_work_days_from_previous_pattern"] %= 6
+            no_days, config, inputs, constraints = prepare(json_config)
+            for engine, fn in [("daily", run_daily), ("cyclic", create_cyclic_schedule)]:
+                result, seconds, timed_out = run_with_timeout(fn, (no_days, config, inputs, constraints), timeout)
+                if timed_out:
+                    outcome, cost, spread = "timeout", "-", "-"
+                elif result[0] is None:
+                    outcome, cost, spread = "no roster", "-", "-"
+                else:
+                    check_roster(no_days, config, inputs, constraints, result[0])
+                    outcome, cost, spread = "ok", roster_cost(config, inputs, result[0]), quality_spread(result[1])
+                print(f"{no_days:>5} {str(bool(leave_ratio)):<7} {engine:<7} {seconds:>9.2f}s {outcome:<10} {cost:>8} {spread:>8}")
+
+
+def bench_speculative(timeout=120):
+    """
+    Sequential backtracking vs speculative subtree search on tight 30x21 rosters.
+
+    The rosters of bench_lookahead (16 hour rest rule), with thresholds that
+    make the search backtrack hundreds of times before it proves there is no
+    roster, and the seed 4 roster of bench_failed_states, which ends in one.
+    Each setting runs twice to check that it returns the same roster.
+    """
+    cases = [("seed 4 threshold 3", 4, 0.45, dict(threshold=3)),
+             ("seed 4 threshold 5", 4, 0.45, dict(threshold=5)),
+             ("seed 1 threshold 3", 1, 0.45, dict(threshold=3)),
+             ("seed 4 cache tol 2", 4, 0.5, dict(failed_state_cache_size=10000, failed_state_quality_tolerance=2))]
+    settings = [("sequential", {}), ("2 workers", dict(speculative_workers=2)), ("4 workers", dict(speculative_workers=4))]
+    print(f"{'case':<20} {'search':<11} {'time':>10} {'outcome':<10} {'solves':>7} {'backtracks':>10} {'same':<5}")
+    for case, seed, tightness, case_overrides in cases:
+        json_config = synthetic_json_config(30, 21, seed=seed, tightness=tightness, leave_ratio=0)
+        json_config["min_time_between_shifts"] = 16
+        for name, overrides in settings:
+            no_days, config, inputs, constraints = prepare(json_config, **case_overrides, **overrides)
+            runs = [run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout) for _ in range(2)]
+            (result, seconds, timed_out), (again, _, _) = runs
+            if timed_out:
+                print(f"{case:<20} {name:<11} {seconds:>9.2f}s timeout")
+                continue
+            (schedule, _), stats = result
+            outcome = "no roster" if schedule is None else "ok"
+            same = again is not None and again[0][0] == schedule
+            print(f"{case:<20} {name:<11} {seconds:>9.2f}s {outcome:<10} {stats['solves']:>7} "
+                  f"{stats['backtracks']:>10} {str(same):<5}")
+
+
+def bench_checkpoint(timeout=300, interval=0.5):
+    """
+    Checkpoint overhead, and resuming a killed run against an uninterrupted one.
+
+    Each case runs without checkpoints, then with one every interval seconds;
+    a third run is killed halfway and resumed from its checkpoint. same says
+    whether the resumed run ended with the same roster and the same search
+    counters (solves, attempts, backtracks) as the uninterrupted one.
+    """
+    tight = synthetic_json_config(30, 21, seed=1, tightness=0.45, leave_ratio=0)
+    tight["min_time_between_shifts"] = 16
+    cached = synthetic_json_config(30, 21, seed=4, tightness=0.45, leave_ratio=0)
+    cached["min_time_between_shifts"] = 16
+    cases = [("60x365 seed 8", synthetic_json_config(60, 365, seed=8), {}),
+             ("30x21 seed 1 thr 3", tight, dict(threshold=3)),
+             ("30x21 seed 1 pool", tight, dict(threshold=3, solution_pool=True)),
+             ("30x21 seed 4 cache", cached, dict(threshold=5, failed_state_cache_size=10000, failed_state_quality_tolerance=2))]
+    print(f"{'case':<20} {'plain':>9} {'checkpoints':>12} {'killed at':>10} {'resumed':>9} {'outcome':<10} {'same':<5}")
+    for case, json_config, overrides in cases:
+        path = f"bench_checkpoint_{os.getpid()}.npz"
+        try:
+            no_days, config, inputs, constraints = prepare(json_config, **overrides)
+            (plain, _), plain_seconds, _ = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            config.update(checkpoint_file=path, checkpoint_interval=interval)
+            (full, full_stats), seconds, _ = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), timeout)
+            os.remove(path)
+            _, killed_at, _ = run_with_timeout(run_daily_stats, (no_days, config, inputs, constraints), seconds / 2)
+            (resumed, resumed_stats), resumed_seconds, _ = run_with_timeout(run_daily_resume, (no_days, config, inputs, constraints), timeout)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        counters = ("solves", "attempts", "backtracks")
+        same = resumed[0] == full[0] == plain[0] and all(resumed_stats[c] == full_stats[c] for c in counters)
+        outcome = "ok" if full[0] is not None else "no roster"
+        print(f"{case:<20} {plain_seconds:>8.2f}s {seconds:>11.2f}s {killed_at:>9.2f}s {resumed_seconds:>8.2f}s "
+              f"{outcome:<10} {str(same):<5}")
+
+
+def bench_streaming(lengths=(90, 365), depths=(None, 7, 2, 0), no_employees=60, timeout=600):
+    """
+    Streaming the daily search into the CSV/XLSX writers at several commit depths.
+
+    Reports the time until the first day is written, the total time, and the
+    peak Python memory (tracemalloc, so CP-SAT's own memory is not included)
+    of the search plus writers. same says whether the roster matches the one
+    found without a commit depth.
+    """
+    print(f"{'days':>5} {'depth':>6} {'first day':>10} {'total':>9} {'peak':>10} {'outcome':<10} {'same':<5}")
+    for no_days in lengths:
+        json_config = synthetic_json_config(no_employees, no_days, seed=8)
+        _, config, inputs, constraints = prepare(json_config)
+        employees = [{"employee_id": f"E{i}"} for i in range(config["no_employees"])]
+        shift_colours = {"Off": "D3D3D3"} | {f"Shift {shift['shift_id']}": shift["colour"] for shift in json_config["shifts"]}
+        reference = None
+        for depth in depths:
+            with tempfile.TemporaryDirectory() as directory:
+                args = (no_days, config, inputs, constraints, depth, directory, employees, shift_colours)
+                result, seconds, timed_out = run_with_timeout(run_streaming, args, timeout)
+            if timed_out:
+                print(f"{no_days:>5} {str(depth):>6} timeout")
+                continue
+            schedule, first_day, peak = result
+            if depth is None:
+                reference = schedule
+            outcome = "no roster" if schedule is None else "ok"
+            first = f"{first_day:.2f}s" if first_day is not None else "-"
+            print(f"{no_days:>5} {str(depth):>6} {first:>10} {seconds:>8.2f}s {peak / 2**20:>8.1f}MB "
+                  f"{outcome:<10} {str(schedule == reference):<5}")
+
+
+def bench_telemetry(repeats=3, timeout=300):
+    """
+    Search time without telemetry, with a hook, and with a JSON lines file.
+
+    The 60x90 seed 8 roster (no backtracking) and the tight 30x21 seed 4
+    roster of bench_speculative (hundreds of backtracks); the best of
+    repeats runs is reported.
+    """
+    tight = synthetic_json_config(30, 21, seed=4, tightness=0.45, leave_ratio=0)
+    tight["min_time_between_shifts"] = 16
+    cases = [("60x90 seed 8", synthetic_json_config(60, 90, seed=8), {}),
+             ("30x21 seed 4 thr 5", tight, dict(threshold=5))]
+    print(f"{'case':<20} {'telemetry':<10} {'search':>9} {'events':>7} {'same':<5}")
+    for case, json_config, overrides in cases:
+        no_days, config, inputs, constraints = prepare(json_config, **overrides)
+        reference = None
+        for mode in (None, "hook", "file"):
+            with tempfile.TemporaryDirectory() as directory:
+                args = (no_days, config, inputs, constraints, mode, os.path.join(directory, "telemetry.jsonl"))
+                runs = [run_with_timeout(run_daily_telemetry, args, timeout)[0] for _ in range(repeats)]
+            schedule, seconds, events = min(runs, key=lambda run: run[1])
+            if mode is None:
+                reference = schedule
+            print(f"{case:<20} {str(mode):<10} {seconds:>8.2f}s {events:>7} {str(schedule == reference):<5}")
+
+
+def bench_feasibility(sizes=((100, 30), (1000, 365), (5000, 365)), tightness=(0.45, 0.7), repeats=3):
+    """
+    Vectorized check_feasibility against the day-by-day loop it replaced.
+
+    Availability is compiled beforehand, as in process_request.py. tightness
+    0.7 leaves many days short, so most messages are formatted; same says
+    whether both checkers return the same verdict and messages, in order
+    (without the exact check 7, which the loop version lacks). exact is the
+    time with check 7.
+    """
+    print(f"{'employees':>9} {'days':>5} {'tight':>6} {'loop':>9} {'vectorized':>11} {'speedup':>8} {'exact':>9} "
+          f"{'messages':>9} {'same':<5}")
+    for no_employees, no_days in sizes:
+        for tight in tightness:
+            _, config, inputs, constraints = prepare(synthetic_json_config(no_employees, no_days, tightness=tight))
+            inputs["availability"] = Availability(config, inputs, no_days)
+            timings = {}
+            checks = (("loop", check_feasibility_reference, {}), ("vectorized", check_feasibility, dict(exact=False)),
+                      ("exact", check_feasibility, {}))
+            for name, check, options in checks:
+                best = None
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    result = check(config, inputs, constraints, no_days, **options)
+                    seconds = time.perf_counter() - start
+                    best = seconds if best is None else min(best, seconds)
+                timings[name] = (best, result)
+            (loop_seconds, expected), (seconds, result) = timings["loop"], timings["vectorized"]
+            print(f"{no_employees:>9} {no_days:>5} {tight:>6} {loop_seconds:>8.3f}s {seconds:>10.4f}s "
+                  f"{loop_seconds / seconds:>7.0f}x {timings['exact'][0]:>8.4f}s {len(result[1]):>9} {str(result == expected):<5}")
+
+
+def random_checker_edit(rng, checker, config, inputs, constraints, no_days):
+    """
+    Applies one random edit to checker and the same edit to inputs/constraints.
+
+    Edits are leave ranges added and removed, preferences, exclusions, work
+    patterns and shift bounds.
+
+    Returns:
+        The kind of edit
+    """
+    no_shifts = config["no_shifts"]
+    i = rng.randrange(config["no_employees"])
+    kind = rng.choice(["add_leave", "remove_leave", "preferences", "exclusions", "pattern", "bounds"])
+    if kind in ("add_leave", "remove_leave"):
+        first = rng.randrange(no_days)
+        last = min(no_days - 1, first + rng.randrange(14))
+        days = set(range(first, last + 1))
+        if kind == "add_leave":
+            inputs["employee_leaves"][i] |= days
+        else:
+            inputs["employee_leaves"][i] -= days
+        getattr(checker, kind)(i, first, last)
+    elif kind in ("preferences", "exclusions"):
+        shifts = set(rng.sample(range(1, no_shifts + 1), rng.randrange(3)))
+        inputs[f"shift_{kind}"][i] = shifts
+        getattr(checker, f"set_shift_{kind}")(i, shifts)
+    elif kind == "pattern":
+        pattern_id = rng.choice(list(config["work_pattern"]))
+        shift_day = rng.randrange(config["work_pattern"][pattern_id]["total_days"])
+        inputs["work_pattern"][i], inputs["shift_day"][i] = pattern_id, shift_day
+        checker.set_work_pattern(i, pattern_id, shift_day)
+    else:
+        shift_id = rng.randrange(1, no_shifts + 1)
+        min_count = max(0, constraints["min_count"][shift_id] + rng.choice([-1, 1]))
+        max_count = max(min_count, constraints["max_count"][shift_id] + rng.choice([-1, 0, 1]))
+        constraints["min_count"][shift_id], constraints["max_count"][shift_id] = min_count, max_count
+        checker.set_shift_bounds(shift_id, min_count, max_count)
+    return kind
+
+
+def bench_incremental(sizes=((100, 30), (1000, 365), (5000, 365)), tightness=0.7, edits=200, seed=0):
+    """
+    FeasibilityChecker edits against a full check_feasibility after each one.
+
+    Random edits (see random_checker_edit) go to the checker and to a copy
+    of the inputs; every check() must return what check_feasibility returns
+    on the copy. Times are per edit, check() included.
+    """
+    print(f"{'employees':>9} {'days':>5} {'full':>9} {'incremental':>12} {'speedup':>8}")
+    for no_employees, no_days in sizes:
+        rng = random.Random(seed)
+        _, config, inputs, constraints = prepare(synthetic_json_config(no_employees, no_days, tightness=tightness))
+        checker = FeasibilityChecker(config, inputs, constraints, no_days)
+        full_seconds = incremental_seconds = 0.0
+        for edit in range(edits):
+            start = time.perf_counter()
+            kind = random_checker_edit(rng, checker, config, inputs, constraints, no_days)
+            result = checker.check()
+            incremental_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = check_feasibility(config, inputs, constraints, no_days)
+            full_seconds += time.perf_counter() - start
+            assert result == expected, f"{no_employees} employees, edit {edit} ({kind}): results differ"
+        print(f"{no_employees:>9} {no_days:>5} {full_seconds / edits * 1e3:>7.2f}ms {incremental_seconds / edits * 1e3:>10.2f}ms "
+              f"{full_seconds / incremental_seconds:>7.1f}x")
+
+def bench_exact_day(instances=2000, no_employees=12, seed=0):
+    """
+    Count checks vs the exact Hall test of check_feasibility_per_day on random small days.
+
+    Employees get random shift preferences and forbidden transitions from a
+    random previous day, so flexible employees are often counted for several
+    shifts. Ground truth is solve_day_flow. Reports how many infeasible days
+    each test catches (neither may reject a feasible day) and the time per
+    call on these days and on a 5000-employee day of the search.
+    """
+    rng = random.Random(seed)
+    json_config = synthetic_json_config(no_employees, 14, seed=seed, leave_ratio=0)
+    _, config, inputs, constraints = prepare(json_config, forbidden_constraints=[(5, 1), (5, 2), (4, 1), (3, 1)])
+    caught = {"counts": 0, "exact": 0}
+    wrong = {"counts": 0, "exact": 0}
+    seconds = {"counts": 0.0, "exact": 0.0}
+    infeasible = 0
+    for _ in range(instances):
+        day_inputs = dict(inputs, shift_preferences=[set(rng.sample(range(1, 6), rng.randint(1, 4))) for _ in range(no_employees)])
+        day_inputs.pop("availability", None)
+        day_constraints = {"min_count": {s: rng.randint(0, 2) for s in range(1, 6)}}
+        day_constraints["max_count"] = {s: day_constraints["min_count"][s] + rng.randint(1, 4) for s in range(1, 6)}
+        previous_day = [rng.randint(0, 5) for _ in range(no_employees)]
+        day = rng.randrange(14)
+        availability = Availability(config, day_inputs, 14)
+        day_inputs["availability"] = availability
+        domains = [row for row in availability.day_domains(day, previous_day)]
+        truth, _ = solve_day_flow(domains, [[0] * 5] * no_employees, day_constraints, 5)
+        infeasible += truth is None
+        for name, exact in (("counts", False), ("exact", True)):
+            start = time.perf_counter()
+            feasible, _ = check_feasibility_per_day(config, day_inputs, day_constraints, day, previous_day=previous_day, exact=exact)
+            seconds[name] += time.perf_counter() - start
+            caught[name] += truth is None and not feasible
+            wrong[name] += truth is not None and not feasible
+    print(f"{instances} days of {no_employees} employees, {infeasible} infeasible")
+    print(f"{'test':<7} {'caught':>7} {'wrong':>6} {'per call':>10}")
+    for name in ("counts", "exact"):
+        print(f"{name:<7} {caught[name]:>7} {wrong[name]:>6} {seconds[name] / instances * 1e6:>8.0f}us")
+    
+    _, config, inputs, constraints = prepare(synthetic_json_config(5000, 30, seed=seed))
+    inputs["availability"] = Availability(config, inputs, 30)
+    previous_day = [0] * config["no_employees"]  # Everyone off the day before: no transition is forbidden
+    for name, exact in (("counts", False), ("exact", True)):
+        start = time.perf_counter()
+        for day in range(30):
+            check_feasibility_per_day(config, inputs, constraints, day, previous_day=previous_day, exact=exact)
+        print(f"5000 employees, {name:<7} {(time.perf_counter() - start) / 30 * 1e3:>6.2f}ms per call")
+
+
+def bench_diagnosis(seeds=(4, 8, 11), no_employees=30, no_days=21):
+    """
+    diagnose_infeasibility on synthetic rosters the daily search fails on.
+
+    Each diagnosis gets as long as the failed daily search took, as in
+    process_request.py. Reports whether check_feasibility already rejects the
+    input, the diagnosis time, the core size and whether it was minimised.
+    """
+    cases = [("16h rest", dict(tightness=0.45, leave_ratio=0), dict(min_time_between_shifts=16)),
+             ("default", {}, {}),
+             ("tight", dict(tightness=0.8, leave_ratio=0.5), {})]
+    print(f"{'case':<9} {'seed':>4} {'daily':>8} {'checker':>8} {'diagnosis':>9} {'core':>5} {'minimal':>7}")
+    for seed in seeds:
+        for label, generator_args, config_overrides in cases:
+            json_config = dict(synthetic_json_config(no_employees, no_days, seed=seed, **generator_args), **config_overrides)
+            days, config, inputs, constraints = prepare(json_config)
+            start = time.perf_counter()
+            solutions, _ = run_daily(days, config, inputs, constraints)
+            daily_seconds = time.perf_counter() - start
+            if solutions is not None:
+                continue
+            feasible, _ = check_feasibility(config, inputs, constraints, days)
+            diagnosis = diagnose_infeasibility(config, inputs, constraints, days, daily_seconds, json_config["employees"])
+            print(f"{label:<9} {seed:>4} {daily_seconds:>7.2f}s {'passes' if feasible else 'rejects':>8} "
+                  f"{diagnosis['seconds']:>8.2f}s {len(diagnosis['core']):>5} {str(diagnosis['minimal']):>7}")
+            for description in diagnosis["core"]:
+                print(f"    {description}")
+
+
+def class_signature(classes, solution):
+    """Per-class value counts of a day solution; solutions that only swap interchangeable employees share it."""
+    return tuple(tuple(sorted(Counter(solution[i] for i in members).items())) for _, members in classes)
+
+
+def bench_classes(sizes=(100, 500, 2000), attempts=4, seed=0):
+    """
+    Integer day model vs the equivalence-class model over successive exclusion-cut attempts.
+
+    "fresh" starts every employee at a zero quality_count row (a new roster), "random"
+    draws it per employee as in the other benchmarks. distinct counts the attempts that
+    are not mere swaps of interchangeable employees.
+    """
+    print(f"{'employees':>9} {'quality':<7} {'classes':>7} {'encoding':<8} {'time':>9} {'distinct':>8}  costs")
+    for no_employees in sizes:
+        for quality in ("fresh", "random"):
+            json_config = synthetic_json_config(no_employees, 14, seed=seed)
+            if quality == "fresh":
+                for employee in json_config["employees"]:
+                    employee["quality"] = [0] * json_config["no_of_shifts"]
+            no_days, config, inputs, constraints = prepare(json_config)
+            day, day_inputs = feasible_day_inputs(no_days, config, inputs, constraints, random.Random(seed))
+            classes = employee_classes(config, day_inputs, day)
+
+            for encoding in ("integer", "classes"):
+                config["day_encoding"] = encoding
+                solutions = []
+                start = time.perf_counter()
+                for _ in range(attempts):
+                    solution, _ = create_day_schedule(config, day_inputs, constraints, list(solutions), current_day=day)
+                    if solution is None:
+                        break
+                    solutions.append(solution)
+                seconds = time.perf_counter() - start
+                distinct = len({class_signature(classes, solution) for solution in solutions})
+                costs = [day_cost(day_inputs, solution) for solution in solutions]
+                print(f"{no_employees:>9} {quality:<7} {len(classes):>7} {encoding:<8} {seconds:>8.2f}s {distinct:>8}  {costs}")
+
+
+# Regression budget for importing process_request.py, and the modules it must leave to the code paths that use them
+STARTUP_BUDGET_MS = 250
+DEFERRED_MODULES = ("pandas", "openpyxl", "ortools")
+
+
+def import_times(modules):
+    """
+    Runs "import <modules>" in a fresh interpreter under -X importtime.
+
+    Returns:
+        {module: (self, cumulative) microseconds} for every module the interpreter imported
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modules}"], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if not line.startswith("import time:") or not fields[0].strip().isdigit():
+            continue  # Header
+        times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+
+def bench_startup(repeats=5, top=8):
+    """
+    Import time of process_request.py under python -X importtime, against STARTUP_BUDGET_MS.
+
+    The best of repeats fresh interpreters counts. Fails if the import exceeds
+    the budget or pulls in any of DEFERRED_MODULES, and lists the modules
+    with the largest own import time. For scale, also reports the own import
+    time of the deferred modules when imported eagerly.
+    """
+    runs = [import_times("process_request") for _ in range(repeats)]
+    best = min(runs, key=lambda times: times["process_request"][1])
+    startup_ms = best["process_request"][1] / 1e3
+    eager = import_times("pandas, openpyxl, ortools.sat.python.cp_model, ortools.graph.python.min_cost_flow")
+    eager_ms = sum(own for module, (own, _) in eager.items() if module.split(".")[0] in DEFERRED_MODULES) / 1e3
+    print(f"process_request import: {startup_ms:.1f}ms (budget {STARTUP_BUDGET_MS}ms)")
+    print(f"{', '.join(DEFERRED_MODULES)} imported eagerly: {eager_ms:.1f}ms")
+    for module, (own, _) in sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top]:
+        print(f"    {own / 1e3:>7.1f}ms  {module}")
+    deferred = sorted(module for module in best if module.split(".")[0] in DEFERRED_MODULES)
+    assert not deferred, f"process_request imports {deferred[:5]} at startup"
+    assert startup_ms <= STARTUP_BUDGET_MS, f"process_request import took {startup_ms:.1f}ms, over the {STARTUP_BUDGET_MS}ms budget"
+
+
+BENCHMARKS = {
+    "horizon": bench_horizon,
+    "flow": bench_flow,
+    "encoding": bench_encoding,
+    "backjump": bench_backjump,
+    "lookahead": bench_lookahead,
+    "failed_states": bench_failed_states,
+    "pool": bench_pool,
+    "rolling": bench_rolling,
+    "classes": bench_classes,
+    "budget": bench_budget,
+    "workers": bench_workers,
+    "hints": bench_hints,
+    "cyclic": bench_cyclic,
+    "speculative": bench_speculative,
+    "checkpoint": bench_checkpoint,
+    "streaming": bench_streaming,
+    "telemetry": bench_telemetry,
+    "feasibility": bench_feasibility,
+    "exact_day": bench_exact_day,
+    "diagnosis": bench_diagnosis,
+    "incremental": bench_incremental,
+    "startup": bench_startup,
+}
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"\n=== {name} ===")
+        BENCHMARKS[name]()
@@ -0,0 +1,43 @@
+"""
+Run-level time budget.
+Splits one wall-clock deadline across the solver calls of a roaster run.
+"""
+import time
+
+
+class TimeBudget:
+    """
+    Wall-clock deadline shared by every solver call of one run.
+
+    Each solve gets an even share of the time left over the solves still
+    expected, capped at its own time limit, so early days cannot use up the
+    time of later ones. Once a share drops below first_solution_time, solves
+    stop at their first solution instead of proving optimality.
+    """
+
+    def __init__(self, seconds, first_solution_time=0.1):
+        self.seconds = seconds
+        self.first_solution_time = first_solution_time
+        self.deadline = time.monotonic() + seconds
+
+    @classmethod
+    def from_config(cls, config):
+        """Starts a budget of config["time_budget"] seconds, or returns None if it is unset."""
+        if config.get("time_budget") is None:
+            return None
+        return cls(config["time_budget"], config.get("first_solution_time", 0.1))
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def limits(self, time_limit, solves_left):
+        """
+        Returns (time_limit, first_solution) for the next of solves_left solves.
+
+        time_limit is the solve's own limit (e.g. csp_time_limit), used as a cap.
+        """
+        share = min(time_limit, self.remaining() / max(1, solves_left))
+        return share, share < self.first_solution_time
@@ -0,0 +1,78 @@
+"""
+Search checkpoints for simulate_roaster.
+Saves the day-by-day search state to a compressed .npz file so a run can resume after a crash.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def save_checkpoint(path, state):
+    """
+    Writes a search state atomically (a temporary file replaces the old checkpoint).
+
+    Args:
+        state: dict with the arrays "roster" (committed days on the current path),
+               "quality_count" and "shift_day", "tried" (solutions tried per
+               level, stacked) with "tried_counts" (how many per level), and
+               "search": JSON-serialisable rest of the state
+    """
+    arrays = {key: np.asarray(value) for key, value in state.items() if key != "search"}
+    arrays["search"] = np.array(json.dumps(state["search"]))
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path):
+    """Reads a state written by save_checkpoint, or returns None if there is no checkpoint."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        state = {key: data[key] for key in data.files if key != "search"}
+        state["search"] = json.loads(str(data["search"]))
+    return state
+
+
+# Config keys that change which roster the daily search finds, or the search state it saves
+SEARCH_CONFIG_KEYS = (
+    "threshold", "quality_threshold", "csp_time_limit", "day_engine", "day_encoding", "search_branching",
+    "backjumping", "lookahead", "failed_state_cache_size", "failed_state_quality_tolerance",
+    "solution_pool", "solution_pool_gap", "solution_pool_min_distance", "speculative_workers",
+    "speculative_candidates", "first_solution_time", "relative_gap_limit", "search_workers",
+    "interleave_search", "random_seed", "deterministic_time_limit", "solution_hints", "hint_period",
+    "hint_roster_file", "repair_hint",
+)
+
+
+def problem_fingerprint(config, inputs, constraints, day_no, total_no_days):
+    """
+    Identifies the roster problem a checkpoint belongs to, so another problem's checkpoint is never resumed.
+
+    Covers the inputs (sets sorted), the staffing constraints, the work
+    patterns, the forbidden transitions and the SEARCH_CONFIG_KEYS.
+    """
+    def sets(employee_sets):
+        return [sorted(map(int, employee_set)) for employee_set in employee_sets]
+
+    def counts(shift_counts):
+        return sorted([int(shift), int(count)] for shift, count in shift_counts.items())
+
+    problem = json.dumps([
+        day_no, total_no_days, config["no_employees"], config["no_shifts"],
+        sorted([int(pattern_id), pattern["total_days"], sorted(pattern["off_days"]), bool(pattern.get("strict_weekend_off"))]
+               for pattern_id, pattern in config["work_pattern"].items()),
+        sorted([int(shift), int(forbidden)] for shift, forbidden in config["forbidden_constraints"]),
+        {key: config.get(key) for key in SEARCH_CONFIG_KEYS},
+        counts(constraints["min_count"]), counts(constraints["max_count"]),
+        [list(map(int, row)) for row in inputs["quality_count"]],
+        list(map(int, inputs["previous_day"])), list(map(int, inputs["shift_day"])),
+        list(map(int, inputs["work_pattern"])),
+        sets(inputs.get("employee_leaves", [])), sets(inputs.get("shift_preferences", [])),
+        sets(inputs.get("shift_exclusions", [])),
+        [list(map(int, solution)) for solution in inputs.get("schedule", [])],
+    ], default=str)
+    return hashlib.sha256(problem.encode()).hexdigest()
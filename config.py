@@ -49,8 +49,10 @@
 # with open('original.json', 'w') as outfile:
 #     json.dump(output_data, outfile, indent=2)
 
+import copy
 import json
 import datetime
+import time
 
 def generate_config_from_json(json_config):
     config = {
@@ -60,6 +62,51 @@ def generate_config_from_json(json_config):
         "forbidden_constraints": [],
         "quality_threshold": json_config.get("quality_threshold", 100),
         "threshold": json_config.get("threshold", 10),
+        "roster_mode": json_config.get("roster_mode", "daily"),  # "daily" (day-by-day backtracking), "horizon" (single model), "rolling" or "cyclic"
+        "horizon_time_limit": json_config.get("horizon_time_limit", 120.0),
+        "horizon_search_workers": json_config.get("horizon_search_workers", 8),
+        "horizon_symmetry_breaking": json_config.get("horizon_symmetry_breaking", False),  # Order interchangeable employees in window models
+        "rolling_window": json_config.get("rolling_window", 7),  # Days solved together per rolling window (W)
+        "rolling_commit": json_config.get("rolling_commit", 5),  # Days committed per window before sliding (K)
+        "rolling_max_retries": json_config.get("rolling_max_retries", 3),  # Failed window retries, each reopening K more days
+        "rolling_time_limit": json_config.get("rolling_time_limit", 30.0),  # Time limit per window solve
+        "rolling_search_workers": json_config.get("rolling_search_workers", 1),
+        "rolling_search_branching": json_config.get("rolling_search_branching", "automatic"),
+        "cyclic_time_limit": json_config.get("cyclic_time_limit", 60.0),  # Time limit for the cycle model
+        "cyclic_max_period": json_config.get("cyclic_max_period", 63),  # Longest work pattern cycle (LCM of total_days) solved as one model
+        "cyclic_max_leave_ratio": json_config.get("cyclic_max_leave_ratio", 0.05),  # Max share of employee days on leave for the cyclic mode
+        "cyclic_patch_margin": json_config.get("cyclic_patch_margin", 2),  # Days added on each side per retry when patching leaves
+        "day_engine": json_config.get("day_engine", "cpsat"),  # "cpsat" or "flow" (min-cost flow, CP-SAT once exclusion cuts are needed)
+        "day_encoding": json_config.get("day_encoding", "integer"),  # CP-SAT day model: "integer", "boolean" (one-hot literals) or "classes"
+        "search_branching": json_config.get("search_branching", "portfolio"),  # CP-SAT branching: "portfolio", "automatic" or "fixed"
+        "backjumping": json_config.get("backjumping", False),  # Explain failed days and record nogoods on the previous day
+        "lookahead": json_config.get("lookahead", False),  # Next-day lookahead: False, "check" (staffing counts) or "model" (in the day model)
+        "failed_state_cache_size": json_config.get("failed_state_cache_size", 0),  # Failed (day, previous_day) states to remember; 0 disables
+        "failed_state_quality_tolerance": json_config.get("failed_state_quality_tolerance"),  # Max quality_count difference for a match; None ignores it
+        "solution_pool": json_config.get("solution_pool", False),  # Take a day's attempts from one pooled solve instead of re-solving
+        "solution_pool_gap": json_config.get("solution_pool_gap", 0),  # Pooled solutions may cost this much more than the optimum
+        "solution_pool_min_distance": json_config.get("solution_pool_min_distance", 1),  # Min employees in which pooled solutions differ
+        "speculative_workers": json_config.get("speculative_workers", 0),  # Processes searching retried days' alternatives at once; 0 disables
+        "speculative_candidates": json_config.get("speculative_candidates"),  # Alternatives per branching point; None means one per worker
+        "checkpoint_file": json_config.get("checkpoint_file"),  # .npz file the daily search state is saved to; None disables
+        "checkpoint_interval": json_config.get("checkpoint_interval", 60.0),  # Seconds between checkpoints
+        "commit_depth": json_config.get("commit_depth"),  # Daily mode: days the search may backtrack before a day is written; None writes at the end
+        "diagnose": json_config.get("diagnose", False),  # On a failed run, report a minimal set of conflicting input constraints
+        "diagnosis_time_limit": json_config.get("diagnosis_time_limit"),  # Seconds for the diagnosis; None = as long as the failed solve took
+        "telemetry_file": json_config.get("telemetry_file"),  # JSON lines file for solver, search and phase events; None disables
+        "profile": json_config.get("profile"),  # "cprofile" or "tracemalloc" capture of the run, emitted as telemetry; None disables
+        "profile_file": json_config.get("profile_file"),  # Optional file for the full capture (pstats dump or tracemalloc snapshot)
+        "time_budget": json_config.get("time_budget"),  # Wall-clock seconds for the whole run; None means no deadline
+        "first_solution_time": json_config.get("first_solution_time", 0.1),  # Solves given less time stop at their first solution
+        "relative_gap_limit": json_config.get("relative_gap_limit"),  # Stop each solve within this relative gap; None keeps CP-SAT's
+        "search_workers": json_config.get("search_workers", 1),  # CP-SAT workers per day solve
+        "interleave_search": json_config.get("interleave_search", False),  # Run parallel workers in deterministic batches
+        "random_seed": json_config.get("random_seed"),  # CP-SAT seed for every worker; None keeps CP-SAT's (fixed) default
+        "deterministic_time_limit": json_config.get("deterministic_time_limit"),  # Limit in deterministic time units; None uses time limits only
+        "solution_hints": json_config.get("solution_hints", []),  # Day hint sources in priority order: "attempt", "cycle", "roster"
+        "hint_period": json_config.get("hint_period", 7),  # Days back the "cycle" hint looks (7 = same weekday last week)
+        "hint_roster_file": json_config.get("hint_roster_file"),  # Prior roster.csv for the "roster" hint
+        "repair_hint": json_config.get("repair_hint", False),  # Let CP-SAT repair hints that break constraints
     }
     
     for pattern in json_config["work_pattern"]:
@@ -259,13 +306,55 @@ def generate_config_from_json(json_config):
     # Return filtered employees list (only those with valid work patterns)
     return no_days, config, inputs, constraints, filtered_employees
 
-with open('config.json', 'r') as f:
-    json_config = json.load(f)
 
-start_date = datetime.datetime.strptime(json_config["start_date"], "%Y-%m-%d")
-end_date = datetime.datetime.strptime(json_config["end_date"], "%Y-%m-%d")
-no_days, config, inputs, constraints, employees = generate_config_from_json(json_config)
-shift_colours = {"Off": "D3D3D3"} | {f"Shift {shift['shift_id']}": shift["colour"] for shift in json_config["shifts"]}
+class Problem:
+    """
+    One roster request, converted from a config.json-style dict.
+
+    Attributes:
+        json_config: The dict it was converted from
+        no_days, config, inputs, constraints, employees: As returned by generate_config_from_json
+        start_date, end_date: datetime of the first and last day
+        shift_colours: Fill colour per shift label ("Off", "Shift 1", ...)
+        load_seconds: Time taken to read (read_seconds) and convert it
+    """
+
+    def __init__(self, json_config, read_seconds=0.0):
+        start = time.perf_counter()
+        self.json_config = json_config
+        self.start_date = datetime.datetime.strptime(json_config["start_date"], "%Y-%m-%d")
+        self.end_date = datetime.datetime.strptime(json_config["end_date"], "%Y-%m-%d")
+        self.no_days, self.config, self.inputs, self.constraints, self.employees = generate_config_from_json(json_config)
+        self.shift_colours = {"Off": "D3D3D3"} | {f"Shift {shift['shift_id']}": shift["colour"] for shift in json_config["shifts"]}
+        self.load_seconds = read_seconds + time.perf_counter() - start
+
+
+def load_problem(path_or_dict):
+    """
+    Reads a config.json file, or converts a dict of the same shape (which is copied, not modified), into a Problem.
+    """
+    start = time.perf_counter()
+    if isinstance(path_or_dict, dict):
+        json_config = copy.deepcopy(path_or_dict)
+    else:
+        with open(path_or_dict, 'r') as f:
+            json_config = json.load(f)
+    return Problem(json_config, time.perf_counter() - start)
+
+
+# Module attributes of the config.json in the current directory, loaded on first access only
+PROBLEM_ATTRIBUTES = ("json_config", "start_date", "end_date", "no_days", "config", "inputs", "constraints", "employees",
+                      "shift_colours")
+_problem = None
+
+
+def __getattr__(name):
+    global _problem
+    if name not in PROBLEM_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _problem is None:
+        _problem = load_problem("config.json")
+    return getattr(_problem, name)
 
 # print("Config:")
 # print(json.dumps(config, indent=2))
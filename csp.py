@@ -1,28 +1,190 @@
 from ortools.sat.python import cp_model
+from collections import Counter
 import math
-import copy
+import time
 
+from availability import Availability
+from flow import solve_day_flow
 
-def create_day_schedule(config, inputs, constraints, prev_solutions=None, current_day=None):
+
+def day_availability(config, inputs, current_day=None):
     """
-    Creates an optimal day schedule using constraint programming.
+    Returns (availability, day) to look up current_day in.
     
-    Fixed issues:
-    - Quality count indexing bug (was using [shift] instead of [employee][shift])
-    - Improved quality metric (minimize variance instead of exponential)
-    - Optimized CSP model (reuse indicator variables)
-    - Better search strategy
+    Uses the precomputed inputs["availability"] when present, otherwise compiles
+    the single day from inputs (whose shift_day is already advanced to current_day).
+    """
+    availability = inputs.get("availability")
+    if availability is not None and current_day is not None:
+        return availability, current_day
+    if current_day is None:
+        inputs = dict(inputs, employee_leaves=[])  # No day to check leaves against
+    day = current_day if current_day is not None else 0
+    return Availability(config, inputs, 1, first_day=day, elapsed_days=0), day
+
+
+def day_domains(config, inputs, current_day=None):
+    """
+    Returns the sorted allowed values (0 = off) of every employee on current_day.
     
-    Args:
-        current_day: Day index (0-based) for checking leave constraints
+    Covers leaves, work pattern off days, shift preferences/exclusions and the
+    forbidden transitions from inputs["previous_day"].
+    """
+    availability, day = day_availability(config, inputs, current_day)
+    return availability.day_domains(day, inputs["previous_day"])
+
+
+def apply_quality_count(config, quality_count, solution):
+    """
+    Updates quality_count in place with one day's solution.
+    
+    Each worked shift is counted once, then the employee's row is normalised
+    (minimum subtracted, capped at quality_threshold) to keep values bounded.
+    Rows are replaced, never mutated, so the old rows make up the undo log.
+    
+    Returns:
+        undo_log to pass to undo_quality_count
+    """
+    undo_log = []
+    quality_threshold = config.get("quality_threshold", 100)
+    for i in range(config["no_employees"]):
+        if solution[i] > 0:  # Only update for non-zero shifts
+            undo_log.append((i, quality_count[i]))
+            row = list(quality_count[i])
+            row[solution[i] - 1] += 1
+            
+            # Normalize: subtract minimum to keep values bounded
+            offset = min(row)
+            quality_count[i] = [min(quality_threshold, v - offset) for v in row]
+    return undo_log
+
+
+def undo_quality_count(quality_count, undo_log):
+    """Reverts an apply_quality_count update in place."""
+    for i, row in reversed(undo_log):
+        quality_count[i] = row
+
+
+def update_quality_count(config, quality_count, solution):
+    """Returns a copy of quality_count updated with one day's solution (see apply_quality_count)."""
+    new_quality_count = [list(row) for row in quality_count]
+    apply_quality_count(config, new_quality_count, solution)
+    return new_quality_count
+
+
+SEARCH_BRANCHING = {
+    "portfolio": cp_model.PORTFOLIO_SEARCH,  # Better than FIXED_SEARCH
+    "automatic": cp_model.AUTOMATIC_SEARCH,
+    "fixed": cp_model.FIXED_SEARCH,
+}
+
+
+def configure_solver(solver, config, time_limit=None, num_workers=None, search_branching=None, first_solution=False):
+    """
+    Applies the shared CP-SAT search parameters to solver (num_workers and
+    search_branching override the config's).
+    
+    config["relative_gap_limit"] lets a solve stop once its objective is within
+    that fraction of the best bound; first_solution stops it at the first one.
+    config["repair_hint"] makes CP-SAT repair a solution hint that breaks
+    some constraints instead of dropping it.
+    
+    Parallel search (config["search_workers"] > 1) stays reproducible with
+    config["interleave_search"], which runs the workers in deterministic
+    batches, and config["deterministic_time_limit"], which bounds the search
+    by CP-SAT's deterministic time instead of the wall clock alone.
+    config["random_seed"] fixes the seed of every worker.
+    """
+    if time_limit is None:
+        time_limit = config.get("csp_time_limit", 30.0)
+    if num_workers is None:
+        num_workers = config.get("search_workers", 1)  # Single-threaded by default
+    if search_branching is None:
+        search_branching = config.get("search_branching", "portfolio")
+    solver.parameters.search_branching = SEARCH_BRANCHING[search_branching]
+    solver.parameters.max_time_in_seconds = time_limit
+    solver.parameters.num_search_workers = num_workers
+    solver.parameters.interleave_search = config.get("interleave_search", False)
+    if config.get("random_seed") is not None:
+        solver.parameters.random_seed = config["random_seed"]
+    if config.get("deterministic_time_limit") is not None:
+        solver.parameters.max_deterministic_time = config["deterministic_time_limit"]
+    if config.get("relative_gap_limit") is not None:
+        solver.parameters.relative_gap_limit = config["relative_gap_limit"]
+    solver.parameters.repair_hint = config.get("repair_hint", False)  # Search near an infeasible hint first
+    solver.parameters.stop_after_first_solution = first_solution
+    return solver
+
+
+def relative_gap(solver):
+    """Gap between the solution's objective and the solver's best bound, relative to the objective (0 = optimal)."""
+    objective = solver.ObjectiveValue()
+    return abs(objective - solver.BestObjectiveBound()) / max(1.0, abs(objective))
+
+
+def solver_info(model, solver, status):
+    """Model size, status and CP-SAT response stats of a solve, for the info dicts of the solve functions."""
+    proto = model.Proto()
+    solved = status == cp_model.OPTIMAL or status == cp_model.FEASIBLE
+    return dict(engine="cpsat", variables=len(proto.variables), constraints=len(proto.constraints),
+                status=solver.StatusName(status), conflicts=solver.NumConflicts(), branches=solver.NumBranches(),
+                wall_time=solver.WallTime(), objective=solver.ObjectiveValue() if solved else None)
+
+
+def build_day_model(config, inputs, constraints, prev_solutions=None, current_day=None, nogoods=None, lookahead=False, hint=None):
+    """
+    Builds the CP-SAT model for one day.
+    
+    config["day_encoding"] selects the formulation:
+    - "integer" (default): one IntVar per employee linked to per-shift indicators
+    - "boolean": one literal per allowed value, see build_boolean_day_model
+    - "classes": counts per class of interchangeable employees, see
+      build_class_day_model; falls back to "boolean" with nogoods or lookahead,
+      which need per-employee variables
+    
+    nogoods are partial assignments {employee: value} known to leave a later day
+    without a solution; each one becomes a cut like the exclusion cuts.
+    With lookahead, the next day's constraints are added as well (see
+    add_next_day_layer), so the day's solution always leaves it feasible.
+    
+    hint is a solution hint, one value per employee (None = no hint); values
+    outside the employee's domain on the day are dropped (see allowed_hint).
+    
+    Returns:
+        (model, decode) where decode(solver) returns the day's solution list
     """
     if prev_solutions is None:
         prev_solutions = []
+    if nogoods is None:
+        nogoods = []
+    hint = allowed_hint(config, inputs, hint, current_day)
+    day_encoding = config.get("day_encoding", "integer")
+    if day_encoding == "classes" and not nogoods and not lookahead:
+        return build_class_day_model(config, inputs, constraints, prev_solutions, current_day, hint)
+    if day_encoding in ("boolean", "classes"):
+        return build_boolean_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods, lookahead, hint)
+    return build_integer_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods, lookahead, hint)
+
+
+def allowed_hint(config, inputs, hint, current_day=None):
+    """
+    Returns hint without the values its employees may not take on current_day.
     
-    # Validate inputs
-    if len(inputs["quality_count"]) != config["no_employees"]:
-        raise ValueError(f"quality_count length ({len(inputs['quality_count'])}) doesn't match number of employees ({config['no_employees']})")
+    Leaves, pattern off days, preferences, exclusions and transitions from
+    previous_day can all rule out a hinted value; hinting it anyway would only
+    make CP-SAT drop or repair the whole hint.
     
+    Returns:
+        One value per employee, None where there is no usable hint, or None without a hint
+    """
+    if hint is None:
+        return None
+    return [value if value is not None and value in domain else None
+            for value, domain in zip(hint, day_domains(config, inputs, current_day))]
+
+
+def build_integer_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods=(), lookahead=False, hint=None):
+    """Day model with an IntVar x[i] per employee and reified shift indicators."""
     model = cp_model.CpModel()
     
     # Initialize variables: x[i] = shift assigned to employee i (0 = off)
@@ -44,43 +206,20 @@ def create_day_schedule(config, inputs, constraints, prev_solutions=None, curren
         model.Add(sum(indicators[value]) <= constraints["max_count"][value])
     
     # Schedule off days based on work patterns and leaves
-    shift_preferences = inputs.get("shift_preferences", [])
+    availability, day = day_availability(config, inputs, current_day)
+    off = availability.allowed[day - availability.first_day, :, 0]
     
     for i in range(config["no_employees"]):
-        # Check if employee is on leave for current day
-        employee_leaves = inputs.get("employee_leaves", [])
-        if current_day is not None and i < len(employee_leaves):
-            if current_day in employee_leaves[i]:
-                # Employee is on leave - must be off
-                model.Add(x[i] == 0)
-                continue  # Skip work pattern check for leave days
-        
-        # Check work pattern off days
-        pattern_id = inputs["work_pattern"][i]
-        pattern = config["work_pattern"][pattern_id]
-        shift_day = inputs["shift_day"][i]
-        
-        if shift_day % pattern["total_days"] in pattern["off_days"]:
+        if off[i]:
+            # Employee is on leave or on a work pattern off day - must be off
             model.Add(x[i] == 0)
-        else:
-            model.Add(x[i] != 0)
-        
-        # Apply shift preferences: if employee has preferences, restrict to those shifts (or 0 for off)
-        if i < len(shift_preferences) and shift_preferences[i]:
-            # Employee can only work shifts from their preference list (or be off = 0)
-            allowed_shifts = {0} | shift_preferences[i]  # Include 0 (off) and preferred shifts
-            # Create constraint: x[i] must be in allowed_shifts
-            # We do this by ensuring x[i] is NOT in the disallowed set
-            disallowed_shifts = set(range(1, config["no_shifts"] + 1)) - shift_preferences[i]
-            for disallowed_shift in disallowed_shifts:
-                model.Add(x[i] != disallowed_shift)
+            continue
+        model.Add(x[i] != 0)
         
-        # Apply shift exclusions: if employee has exclusions, prevent those shifts
-        shift_exclusions = inputs.get("shift_exclusions", [])
-        if i < len(shift_exclusions) and shift_exclusions[i]:
-            # Employee cannot work any shift in the exclusion list
-            for excluded_shift in shift_exclusions[i]:
-                model.Add(x[i] != excluded_shift)
+        # Apply shift preferences and exclusions: x[i] must not take a disallowed shift
+        for value in range(1, config["no_shifts"] + 1):
+            if not availability.shift_allowed[i, value]:
+                model.Add(x[i] != value)
     
     # Hard forbidden constraints: prevent certain shift sequences
     for k_val, forbidden_val in config["forbidden_constraints"]:
@@ -94,10 +233,6 @@ def create_day_schedule(config, inputs, constraints, prev_solutions=None, curren
     total_quality = 0
     
     for i in range(config["no_employees"]):
-        # Validate quality_count structure
-        if len(inputs["quality_count"][i]) != config["no_shifts"]:
-            raise ValueError(f"Employee {i} quality_count length ({len(inputs['quality_count'][i])}) doesn't match number of shifts ({config['no_shifts']})")
-        
         # Calculate cost for each shift assignment for this employee
         # Cost is based on how many times they've already worked this shift
         shift_costs = []
@@ -140,37 +275,437 @@ def create_day_schedule(config, inputs, constraints, prev_solutions=None, curren
         # At least one difference required
         model.Add(sum(or_conditions) >= 1)
     
+    # Nogoods: at least one employee of each recorded conflict takes another shift
+    for n, nogood in enumerate(nogoods):
+        differs = []
+        for i, value in nogood.items():
+            condition = model.NewBoolVar(f'nogood_{n}_{i}')
+            model.Add(x[i] != value).OnlyEnforceIf(condition)
+            differs.append(condition)
+        model.AddBoolOr(differs)
+    
+    if lookahead:
+        add_next_day_layer(model, config, inputs, constraints, current_day,
+                           lambda i, value: indicators[value][i] if value in indicators else None)
+    
+    # Solution hint: the employee's value and the matching shift indicators
+    for i, hinted in enumerate(hint or []):
+        if hinted is not None:
+            model.AddHint(x[i], hinted)
+            for value in indicators:
+                model.AddHint(indicators[value][i], value == hinted)
+    
+    return model, lambda solver: [solver.Value(xi) for xi in x]
+
+
+def build_boolean_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods=(), lookahead=False, hint=None):
+    """
+    Day model using only Boolean literals.
+    
+    Each employee gets one literal per value left in their domain after pattern,
+    leave, preference, exclusion and forbidden-transition pruning, with an
+    exactly-one constraint over them. An exclusion cut is a single clause.
+    """
+    model = cp_model.CpModel()
+    
+    # lits[i][value] = 1 if employee i takes value (0 = off); pruned values get no literal
+    lits = []
+    for i, domain in enumerate(day_domains(config, inputs, current_day)):
+        lits.append({value: model.NewBoolVar(f'x_{i}_{value}') for value in domain})
+        model.AddExactlyOne(lits[i].values())
+    
+    # Add min/max count constraints for each shift
+    for value in range(1, config["no_shifts"] + 1):
+        assigned = [lits[i][value] for i in range(config["no_employees"]) if value in lits[i]]
+        model.Add(sum(assigned) >= constraints["min_count"][value])
+        model.Add(sum(assigned) <= constraints["max_count"][value])
+    
+    # Same linear cost as the integer model: quality_count + 1 per worked shift
+    model.Minimize(sum(
+        (inputs["quality_count"][i][value - 1] + 1) * lit
+        for i in range(config["no_employees"]) for value, lit in lits[i].items() if value > 0
+    ))
+    
+    # Exclusion cuts: at least one employee leaves their previous value
+    for prev_solution in prev_solutions:
+        if any(prev_solution[i] not in lits[i] for i in range(config["no_employees"])):
+            continue  # Previous solution is already outside the pruned domains
+        model.AddBoolOr([lits[i][prev_solution[i]].Not() for i in range(config["no_employees"])])
+    add_nogood_clauses(model, lits, nogoods)
+    if lookahead:
+        add_next_day_layer(model, config, inputs, constraints, current_day, lambda i, value: lits[i].get(value))
+    
+    for i, hinted in enumerate(hint or []):
+        if hinted is not None:
+            for value, lit in lits[i].items():
+                model.AddHint(lit, value == hinted)
+    
+    def decode(solver):
+        return [next(value for value, lit in lits[i].items() if solver.BooleanValue(lit))
+                for i in range(config["no_employees"])]
+    
+    return model, decode
+
+
+def employee_classes(config, inputs, current_day=None):
+    """
+    Groups the employees that are interchangeable on current_day.
+    
+    Employees with the same domain (after leaves, pattern off days, preferences,
+    exclusions and transitions from previous_day) and the same quality_count row
+    have identical constraints and costs in the day model. To stay
+    interchangeable on later days too, they must also share their work pattern,
+    its phase (shift_day mod total_days), their leave days, preferences and
+    exclusions, and their previous_day shift.
+    
+    Returns:
+        List of (domain, members), ordered by first member; members are ascending
+    """
+    def employee_set(key, i):
+        sets = inputs.get(key, [])
+        return tuple(sorted(sets[i])) if i < len(sets) else ()
+    
+    classes = {}
+    for i, domain in enumerate(day_domains(config, inputs, current_day)):
+        pattern_id = inputs["work_pattern"][i]
+        key = (tuple(domain), tuple(inputs["quality_count"][i]), pattern_id,
+               inputs["shift_day"][i] % config["work_pattern"][pattern_id]["total_days"],
+               employee_set("employee_leaves", i), employee_set("shift_preferences", i),
+               employee_set("shift_exclusions", i), int(inputs["previous_day"][i]))
+        classes.setdefault(key, []).append(i)
+    return [(list(key[0]), members) for key, members in classes.items()]
+
+
+def build_class_day_model(config, inputs, constraints, prev_solutions, current_day, hint=None):
+    """
+    Day model over classes of interchangeable employees (see employee_classes).
+    
+    The solver picks how many members of each class take each value, so it no
+    longer explores permutations of identical employees. Counts are expanded
+    back deterministically: members in index order take values in ascending
+    order. Exclusion cuts are stated on the class counts, so a solution that
+    only swaps identical employees no longer counts as a new one. A hint is
+    turned into class counts for the classes whose members are all hinted.
+    """
+    model = cp_model.CpModel()
+    classes = employee_classes(config, inputs, current_day)
+    
+    # counts[c][value] = number of members of class c taking value (0 = off)
+    counts = []
+    for c, (domain, members) in enumerate(classes):
+        counts.append({value: model.NewIntVar(0, len(members), f'n_{c}_{value}') for value in domain})
+        model.Add(sum(counts[c].values()) == len(members))
+    
+    # Add min/max count constraints for each shift
+    for value in range(1, config["no_shifts"] + 1):
+        assigned = [counts[c][value] for c in range(len(classes)) if value in counts[c]]
+        model.Add(sum(assigned) >= constraints["min_count"][value])
+        model.Add(sum(assigned) <= constraints["max_count"][value])
+    
+    # Same linear cost as the integer model, shared by every member of a class
+    model.Minimize(sum(
+        (inputs["quality_count"][members[0]][value - 1] + 1) * count
+        for (_, members), class_counts in zip(classes, counts) for value, count in class_counts.items() if value > 0
+    ))
+    
+    # Exclusion cuts: at least one class count differs from the previous solution's
+    for n, prev_solution in enumerate(prev_solutions):
+        prev_counts = [Counter(prev_solution[i] for i in members) for _, members in classes]
+        if any(value not in counts[c] for c in range(len(classes)) for value in prev_counts[c]):
+            continue  # Previous solution is already outside the pruned domains
+        differs = []
+        for c, class_counts in enumerate(counts):
+            if len(class_counts) == 1:
+                continue  # A single value leaves nothing to change
+            for value, count in class_counts.items():
+                condition = model.NewBoolVar(f'diff_{n}_{c}_{value}')
+                model.Add(count != prev_counts[c][value]).OnlyEnforceIf(condition)
+                differs.append(condition)
+        model.AddBoolOr(differs)  # Empty when no count can change: no other solution exists
+    
+    for (domain, members), class_counts in zip(classes, counts):
+        if hint is not None and all(hint[i] is not None for i in members):
+            hinted = Counter(hint[i] for i in members)
+            for value, count in class_counts.items():
+                model.AddHint(count, hinted[value])
+    
+    def decode(solver):
+        solution = [0] * config["no_employees"]
+        for (domain, members), class_counts in zip(classes, counts):
+            assigned = [value for value in domain for _ in range(solver.Value(class_counts[value]))]
+            for i, value in zip(members, assigned):
+                solution[i] = value
+        return solution
+    
+    return model, decode
+
+
+def add_nogood_clauses(model, lits, nogoods):
+    """Adds one clause per nogood {employee: value} over per-value literals lits[i][value]."""
+    for nogood in nogoods:
+        if any(value not in lits[i] for i, value in nogood.items()):
+            continue  # Nogood is already outside the pruned domains
+        model.AddBoolOr([lits[i][value].Not() for i, value in nogood.items()])
+
+
+def add_next_day_layer(model, config, inputs, constraints, current_day, value_literal):
+    """
+    Adds the day after current_day to a day model as a feasibility-only layer.
+    
+    The next day gets one literal per allowed value with its min/max counts,
+    and each forbidden transition links it to value_literal(i, value), the
+    literal of employee i taking value on current_day (None if impossible).
+    Nothing is added without a precomputed inputs["availability"] covering it.
+    """
+    availability = inputs.get("availability")
+    if availability is None or current_day is None or current_day + 1 >= availability.first_day + availability.no_days:
+        return
+    
+    next_lits = []
+    for i, domain in enumerate(availability.day_domains(current_day + 1)):
+        next_lits.append({value: model.NewBoolVar(f'next_{i}_{value}') for value in domain})
+        model.AddExactlyOne(next_lits[i].values())
+    
+    for value in range(1, config["no_shifts"] + 1):
+        assigned = [next_lits[i][value] for i in range(config["no_employees"]) if value in next_lits[i]]
+        model.Add(sum(assigned) >= constraints["min_count"][value])
+        model.Add(sum(assigned) <= constraints["max_count"][value])
+    
+    for k_val, forbidden_val in config["forbidden_constraints"]:
+        for i in range(config["no_employees"]):
+            today = value_literal(i, k_val)
+            if today is not None and forbidden_val in next_lits[i]:
+                model.AddBoolOr([today.Not(), next_lits[i][forbidden_val].Not()])
+
+
+def explain_day_failure(config, inputs, constraints, nogoods=None, current_day=None, time_limit=None, info=None):
+    """
+    Explains a day without solutions in terms of the previous day's shifts.
+    
+    The day is re-solved without exclusion cuts, and each employee's forbidden
+    transitions from inputs["previous_day"] are guarded by an assumption
+    literal. When the day is infeasible, CP-SAT returns a subset of those
+    assumptions that is infeasible on its own; leaves, pattern off days,
+    preferences, exclusions and nogoods make up the rest of the conflict.
+    time_limit and info work as in solve_day.
+    
+    Returns:
+        None if the day has a solution without exclusion cuts (or none was proven),
+        otherwise the employees whose previous-day shift takes part in the conflict;
+        an empty list means no previous day can make the day feasible
+    """
+    start = time.perf_counter()
+    availability, day = day_availability(config, inputs, current_day)
+    model = cp_model.CpModel()
+    
+    lits = []
+    for i, domain in enumerate(availability.day_domains(day)):
+        lits.append({value: model.NewBoolVar(f'x_{i}_{value}') for value in domain})
+        model.AddExactlyOne(lits[i].values())
+    
+    for value in range(1, config["no_shifts"] + 1):
+        assigned = [lits[i][value] for i in range(config["no_employees"]) if value in lits[i]]
+        model.Add(sum(assigned) >= constraints["min_count"][value])
+        model.Add(sum(assigned) <= constraints["max_count"][value])
+    add_nogood_clauses(model, lits, nogoods or [])
+    
+    # assumptions[literal index] = employee whose forbidden transitions the literal enables
+    assumptions = {}
+    transitions = []
+    for i in range(config["no_employees"]):
+        blocked = [lit for value, lit in lits[i].items() if availability.blocked[inputs["previous_day"][i], value]]
+        if blocked:
+            transition = model.NewBoolVar(f'transition_{i}')
+            for lit in blocked:
+                model.AddImplication(transition, lit.Not())
+            assumptions[transition.Index()] = i
+            transitions.append(transition)
+    model.AddAssumptions(transitions)
+    build_seconds = time.perf_counter() - start
+    
+    solver = cp_model.CpSolver()
+    configure_solver(solver, config, time_limit)
+    status = solver.Solve(model)
+    if info is not None:
+        info.update(seconds=time.perf_counter() - start, gap=None, timed_out=status == cp_model.UNKNOWN,
+                    build_seconds=build_seconds, **solver_info(model, solver, status))
+    if status != cp_model.INFEASIBLE:
+        return None
+    return sorted(assumptions[index] for index in solver.SufficientAssumptionsForInfeasibility())
+
+
+def create_day_schedule(config, inputs, constraints, prev_solutions=None, current_day=None, hint=None, info=None):
+    """
+    Creates an optimal day schedule using constraint programming.
+    
+    Fixed issues:
+    - Quality count indexing bug (was using [shift] instead of [employee][shift])
+    - Improved quality metric (minimize variance instead of exponential)
+    - Optimized CSP model (reuse indicator variables)
+    - Better search strategy
+    
+    Args:
+        current_day: Day index (0-based) for checking leave constraints
+        hint: Optional solution hint, one value per employee (None = no hint)
+        info: Optional dict; receives the solve's timings, model size and status (see solve_day)
+    
+    Returns:
+        (solution, new_quality_count), or (None, inputs["quality_count"]) if no solution exists
+    """
+    new_solution = solve_day(config, inputs, constraints, prev_solutions, current_day, hint=hint, info=info)
+    if new_solution is None:
+        return None, inputs["quality_count"]
+    
+    # Compute new quality count (copy to avoid mutation)
+    return new_solution, update_quality_count(config, inputs["quality_count"], new_solution)
+
+
+def solve_day(config, inputs, constraints, prev_solutions=None, current_day=None, nogoods=None, lookahead=False,
+              time_limit=None, first_solution=False, info=None, hint=None):
+    """
+    Solves one day and returns its optimal solution, or None if there is none.
+    
+    With config["day_engine"] == "flow" the day is solved as a min-cost flow
+    instead; CP-SAT is only used once prev_solutions or nogoods add cuts, or
+    lookahead adds the next day (see build_day_model).
+    config["day_encoding"] selects the CP-SAT model (see build_day_model).
+    
+    Args:
+        current_day: Day index (0-based) for checking leave constraints
+        time_limit: CP-SAT time limit, defaults to config["csp_time_limit"]
+        first_solution: Return the first solution found instead of the optimum
+        info: Optional dict; receives "seconds" (time spent), "gap" (relative
+              gap of the solution returned, None without one), "timed_out"
+              (the time limit ran out before a solution or a proof of none),
+              "engine" and "status", and for CP-SAT "build_seconds" (model
+              build time), "variables"/"constraints" (model size) and the
+              response stats "conflicts", "branches", "wall_time" and
+              "objective" (None without a solution)
+        hint: Optional solution hint for CP-SAT (see build_day_model); the flow engine ignores it
+    """
+    start = time.perf_counter()
+    if prev_solutions is None:
+        prev_solutions = []
+    
+    # Validate inputs
+    if len(inputs["quality_count"]) != config["no_employees"]:
+        raise ValueError(f"quality_count length ({len(inputs['quality_count'])}) doesn't match number of employees ({config['no_employees']})")
+    for i in range(config["no_employees"]):
+        # Validate quality_count structure
+        if len(inputs["quality_count"][i]) != config["no_shifts"]:
+            raise ValueError(f"Employee {i} quality_count length ({len(inputs['quality_count'][i])}) doesn't match number of shifts ({config['no_shifts']})")
+    
+    # Without exclusion cuts the day is a bounded transportation problem: solve it exactly as a min-cost flow
+    if config.get("day_engine", "cpsat") == "flow" and not prev_solutions and not nogoods and not lookahead:
+        costs = [[quality_val + 1 for quality_val in row] for row in inputs["quality_count"]]
+        new_solution, _ = solve_day_flow(day_domains(config, inputs, current_day), costs, constraints, config["no_shifts"])
+        if info is not None:
+            info.update(seconds=time.perf_counter() - start, gap=None if new_solution is None else 0.0, timed_out=False,
+                        engine="flow", status="INFEASIBLE" if new_solution is None else "OPTIMAL")
+        return new_solution
+    
+    model, decode = build_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods, lookahead, hint)
+    build_seconds = time.perf_counter() - start
+    
     # Solve the model
     solver = cp_model.CpSolver()
     
-    # Improved search strategy
-    solver.parameters.search_branching = cp_model.PORTFOLIO_SEARCH  # Better than FIXED_SEARCH
-    solver.parameters.max_time_in_seconds = config.get("csp_time_limit", 30.0)  # Time limit per day
-    solver.parameters.num_search_workers = 1  # Single-threaded for reproducibility
+    # Improved search strategy, time limit per day
+    configure_solver(solver, config, time_limit, first_solution=first_solution)
     
     # Solve
     status = solver.Solve(model)
     
+    new_solution = None
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        new_solution = [solver.Value(xi) for xi in x]
-        
-        # Compute new quality count (deep copy to avoid mutation)
-        new_quality_count = copy.deepcopy(inputs["quality_count"])
-        for i in range(config["no_employees"]):
-            if new_solution[i] > 0:  # Only update for non-zero shifts
-                shift_idx = new_solution[i] - 1
-                new_quality_count[i][shift_idx] += 1
-                
-                # Normalize: subtract minimum to keep values bounded
-                offset = min(new_quality_count[i])
-                new_quality_count[i] = [
-                    min(config.get("quality_threshold", 100), v - offset) 
-                    for v in new_quality_count[i]
-                ]
+        new_solution = decode(solver)
+    if info is not None:
+        info.update(seconds=time.perf_counter() - start, gap=None if new_solution is None else relative_gap(solver),
+                    timed_out=status == cp_model.UNKNOWN, build_seconds=build_seconds, **solver_info(model, solver, status))
+    return new_solution
+
+
+class SolutionPoolCollector(cp_model.CpSolverSolutionCallback):
+    """Collects enumerated day solutions that differ from every kept one in at least min_distance employees."""
+    
+    def __init__(self, decode, pool, pool_size, min_distance):
+        super().__init__()
+        self.decode = decode
+        self.pool = pool
+        self.pool_size = pool_size
+        self.min_distance = min_distance
+    
+    def OnSolutionCallback(self):
+        solution = self.decode(self)
+        for kept in self.pool:
+            if sum(value != kept_value for value, kept_value in zip(solution, kept)) < self.min_distance:
+                return
+        self.pool.append(solution)
+        if len(self.pool) >= self.pool_size:
+            self.StopSearch()
+
+
+def solve_day_pool(config, inputs, constraints, pool_size, prev_solutions=None, current_day=None, nogoods=None, lookahead=False,
+                   time_limit=None, first_solution=False, info=None, hint=None):
+    """
+    Solves one day for up to pool_size distinct, near-optimal, diverse solutions.
+    
+    The first solve finds the optimum (excluding prev_solutions, like
+    solve_day). The second bounds the objective at the
+    optimum + config["solution_pool_gap"], enumerates solutions, and keeps those
+    at least config["solution_pool_min_distance"] employees (Hamming distance)
+    away from every solution already kept.
+    
+    time_limit bounds both solves together: the enumeration only gets what
+    the first solve left of it. first_solution applies to both, and info receives the
+    time spent on both and the outcome, model size and stats of the first, as in solve_day,
+    plus info["solves"]: the CP-SAT solves run (2 when the enumeration ran). hint
+    only guides the first solve.
+    
+    Returns:
+        Solutions ordered by cost, the optimum first; empty if the day has none
+    """
+    start = time.perf_counter()
+    if time_limit is None:
+        time_limit = config.get("csp_time_limit", 30.0)
+    model, decode = build_day_model(config, inputs, constraints, prev_solutions, current_day, nogoods, lookahead, hint)
+    build_seconds = time.perf_counter() - start
+    solver = cp_model.CpSolver()
+    configure_solver(solver, config, time_limit, first_solution=first_solution)
+    status = solver.Solve(model)
+    if info is not None:
+        info.update(build_seconds=build_seconds, **solver_info(model, solver, status))
+    if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+        if info is not None:
+            info.update(seconds=time.perf_counter() - start, gap=None, timed_out=status == cp_model.UNKNOWN, solves=1)
+        return []
+    gap = relative_gap(solver)
+    
+    pool = [decode(solver)]
+    solves = 1
+    time_left = time_limit - (time.perf_counter() - start)
+    if pool_size > 1 and time_left > 0:
+        # Replace the objective by a bound on it, then enumerate
+        objective = model.Proto().objective
+        terms = [(model.GetIntVarFromProtoIndex(index), coeff) for index, coeff in zip(objective.vars, objective.coeffs)]
+        best = sum(coeff * solver.Value(var) for var, coeff in terms)
+        model.ClearObjective()
+        model.ClearHints()
+        model.Add(sum(coeff * var for var, coeff in terms) <= best + config.get("solution_pool_gap", 0))
         
-        return new_solution, new_quality_count
-    else:
-        return None, inputs["quality_count"]
+        enumerator = cp_model.CpSolver()
+        configure_solver(enumerator, config, time_left, num_workers=1)  # Enumeration needs a single worker
+        enumerator.parameters.enumerate_all_solutions = True
+        collector = SolutionPoolCollector(decode, pool, pool_size, max(1, config.get("solution_pool_min_distance", 1)))
+        enumerator.Solve(model, collector)
+        solves += 1
+    if info is not None:
+        info.update(seconds=time.perf_counter() - start, gap=gap, timed_out=False, solves=solves)
+    
+    def cost(solution):
+        return sum(inputs["quality_count"][i][value - 1] + 1 for i, value in enumerate(solution) if value > 0)
+    
+    return pool[:1] + sorted(pool[1:], key=cost)
 
 # config = {
 #     "no_employees": 30,
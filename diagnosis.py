@@ -0,0 +1,178 @@
+"""
+Infeasibility diagnosis.
+Explains a roster that cannot exist as a small set of conflicting input constraints.
+"""
+import datetime
+import time
+
+from ortools.sat.python import cp_model
+
+from availability import availability_for
+from csp import configure_solver
+
+
+def diagnose_infeasibility(config, inputs, constraints, no_days, time_limit, employees=None, start_date=None):
+    """
+    Finds a small set of input constraints that cannot all hold over the whole period.
+
+    The whole period is one model with a literal x[day][i][value] per
+    employee, day and value (0 = off). Work patterns are kept as they are:
+    employees are off on their off days and work on every other day they are
+    not on leave. Every other constraint group is enforced only under its own
+    assumption literal:
+    - each contiguous block of an employee's leave (without it, the employee
+      works those days)
+    - each employee's shift preferences, and shift exclusions
+    - each shift's min_count, and max_count, on each day
+    - each forbidden (previous shift, next shift) pair, also from inputs["previous_day"]
+    CP-SAT returns a subset of the assumptions that is infeasible on its own
+    (SufficientAssumptionsForInfeasibility), and each group is then dropped in
+    turn while the rest stays infeasible, which leaves a minimal core. Groups
+    outside the core are not enforced while it is minimised, so those solves
+    only involve the days and employees the core is about.
+
+    Everything, model building included, stops at time_limit seconds. Each
+    minimisation solve gets an even share of the time left; a group whose
+    solve runs out of time stays in the core, which is then reported with
+    minimal=False.
+
+    Args:
+        employees: Employee dicts of the input JSON ("name", "employee_id"), for the report
+        start_date: datetime of day 0, for the report
+
+    Returns:
+        dict with "status" ("infeasible", "feasible": every group can hold
+        together, or "unknown": no answer within time_limit), "core" (a
+        description of each group in the core), "minimal" and "seconds"
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit
+    no_employees = config["no_employees"]
+    no_shifts = config["no_shifts"]
+    availability = availability_for(config, inputs, no_days)
+
+    def result(status, core=(), minimal=False):
+        return {"status": status, "core": [groups[lit.Index()] for lit in core], "minimal": minimal,
+                "seconds": time.perf_counter() - start}
+
+    def employee(i):
+        if employees is not None and i < len(employees):
+            return f"{employees[i]['name']} ({employees[i]['employee_id']})"
+        return f"Employee {i + 1}"
+
+    def date(day):
+        if start_date is None:
+            return f"day {day + 1}"
+        return (start_date + datetime.timedelta(days=day)).strftime("%Y-%m-%d")
+
+    model = cp_model.CpModel()
+    # groups[literal index] = description of the constraint group the literal enables
+    groups = {}
+    literals = []
+
+    def group(description):
+        literal = model.NewBoolVar(f'group_{len(groups)}')
+        groups[literal.Index()] = description
+        literals.append(literal)
+        return literal
+
+    x = []
+    for day in range(no_days):
+        if time.perf_counter() > deadline:
+            return result("unknown")
+        day_vars = [[model.NewBoolVar(f'x_{day}_{i}_{value}') for value in range(no_shifts + 1)] for i in range(no_employees)]
+        for employee_vars in day_vars:
+            model.AddExactlyOne(employee_vars)
+        x.append(day_vars)
+
+    employee_leaves = inputs.get("employee_leaves", [])
+    shift_preferences = inputs.get("shift_preferences", [])
+    shift_exclusions = inputs.get("shift_exclusions", [])
+    for i in range(no_employees):
+        # Leave blocks: runs of consecutive leave days
+        leave_of = {}
+        leave_days = sorted(day for day in (employee_leaves[i] if i < len(employee_leaves) else ()) if 0 <= day < no_days)
+        for day in leave_days:
+            if day - 1 not in leave_of:
+                last = day
+                while last + 1 in leave_days:
+                    last += 1
+                leave = group(f"Leave of {employee(i)} from {date(day)} to {date(last)}")
+            leave_of[day] = leave
+            model.AddImplication(leave, x[day][i][0])
+
+        for day in range(no_days):
+            if availability.pattern_off[day, i]:
+                model.Add(x[day][i][0] == 1)
+            elif day in leave_of:
+                model.AddImplication(leave_of[day].Not(), x[day][i][0].Not())
+            else:
+                model.Add(x[day][i][0] == 0)
+
+        preferred = shift_preferences[i] if i < len(shift_preferences) else set()
+        if preferred:
+            preference = group(f"Shift preferences of {employee(i)}: shifts {sorted(preferred)}")
+            for day in range(no_days):
+                for value in range(1, no_shifts + 1):
+                    if value not in preferred:
+                        model.AddImplication(preference, x[day][i][value].Not())
+        excluded = shift_exclusions[i] if i < len(shift_exclusions) else set()
+        if excluded:
+            exclusion = group(f"Shift exclusions of {employee(i)}: shifts {sorted(excluded)}")
+            for day in range(no_days):
+                for value in excluded:
+                    if 1 <= value <= no_shifts:
+                        model.AddImplication(exclusion, x[day][i][value].Not())
+
+    # Shift bounds per day, so a core names the dates it is about and days outside it are left free
+    for day in range(no_days):
+        for value in range(1, no_shifts + 1):
+            assigned = [x[day][i][value] for i in range(no_employees)]
+            at_least = group(f"Shift {value} needs at least {constraints['min_count'][value]} employees on {date(day)}")
+            model.Add(sum(assigned) >= constraints["min_count"][value]).OnlyEnforceIf(at_least)
+            at_most = group(f"Shift {value} takes at most {constraints['max_count'][value]} employees on {date(day)}")
+            model.Add(sum(assigned) <= constraints["max_count"][value]).OnlyEnforceIf(at_most)
+
+    previous_day = inputs.get("previous_day") or [0] * no_employees
+    for k_val, forbidden_val in config["forbidden_constraints"]:
+        forbidden = group(f"Shift {forbidden_val} may not follow shift {k_val} (min_time_between_shifts)")
+        for i in range(no_employees):
+            if previous_day[i] == k_val and no_days > 0:
+                model.AddImplication(forbidden, x[0][i][forbidden_val].Not())
+            for day in range(1, no_days):
+                model.AddBoolOr([x[day - 1][i][k_val].Not(), x[day][i][forbidden_val].Not()]).OnlyEnforceIf(forbidden)
+
+    def solve(assumptions, solves_left=1):
+        """Returns (status, core) under assumptions; the core is only set when infeasible."""
+        remaining = (deadline - time.perf_counter()) / solves_left
+        if remaining <= 0:
+            return cp_model.UNKNOWN, None
+        model.ClearAssumptions()
+        model.AddAssumptions(assumptions)
+        solver = cp_model.CpSolver()
+        configure_solver(solver, config, remaining)
+        # Most cores are a day's shift counts against who can work them, a flow problem the LP settles at once
+        solver.parameters.linearization_level = 2
+        status = solver.Solve(model)
+        if status != cp_model.INFEASIBLE:
+            return status, None
+        sufficient = set(solver.SufficientAssumptionsForInfeasibility())
+        return status, [lit for lit in assumptions if lit.Index() in sufficient]
+
+    status, core = solve(literals)
+    if status == cp_model.UNKNOWN:
+        return result("unknown")
+    if status != cp_model.INFEASIBLE:
+        return result("feasible")
+
+    # Deletion filter: a group stays in the core only if the rest is feasible without it
+    position = 0
+    minimal = True
+    while position < len(core):
+        status, smaller = solve(core[:position] + core[position + 1:], len(core) - position)
+        if status == cp_model.INFEASIBLE:
+            core = smaller
+            continue
+        minimal &= status != cp_model.UNKNOWN
+        position += 1
+    return result("infeasible", core, minimal)
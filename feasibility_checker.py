@@ -2,12 +2,310 @@
 Feasibility checker for roaster generation.
 Detects impossible input configurations before attempting to solve.
 """
+import numpy as np
 
+from availability import Availability, availability_for
 
-def check_feasibility(config, inputs, constraints, no_days):
+
+# Up to this many shifts, the exact day check enumerates shift subsets; beyond, each day is solved as a flow
+HALL_MAX_SHIFTS = 10
+
+
+def shift_masks(shift_allowed, no_shifts):
+    """Bitmask of the shifts allowed by each row of shift_allowed (indexed by value, 0 = off); bit s - 1 is shift s."""
+    return shift_allowed[..., 1:no_shifts + 1].astype(np.int64) @ (np.int64(1) << np.arange(no_shifts, dtype=np.int64))
+
+
+def hall_violations(on_duty, masks, constraints, no_shifts):
+    """
+    Exact test of whether each day's on-duty employees can all take an allowed shift within the shift bounds.
+    
+    Every on-duty employee works exactly one shift of their mask, and each
+    shift s takes between min_count[s] and max_count[s] employees. By
+    Hoffman's circulation theorem this is possible if and only if, for every
+    subset S of shifts:
+    - "min": at least sum(min_count over S) employees can work some shift in S
+    - "max": at most sum(max_count over S) employees can only work shifts in S
+    Employees are grouped by mask, so each day costs one bincount and a
+    subset-sum transform over the 2^no_shifts masks. With more than
+    HALL_MAX_SHIFTS shifts, days are solved with solve_day_flow instead and a
+    violation names every shift.
+    
+    Args:
+        on_duty: (days, employees) bool, employees who must work a shift
+        masks: (days, employees) or (employees,) shift masks (see shift_masks)
+    
+    Returns:
+        One entry per day: None if the day is feasible, otherwise
+        (kind, shifts, bound, count) for the smallest violating subset: kind
+        "min" or "max" as above, the shift ids, the summed bound and the
+        number of employees
+    """
+    no_days, no_employees = on_duty.shape
+    masks = np.broadcast_to(masks, on_duty.shape)
+    min_counts = np.array([constraints["min_count"].get(value, 0) for value in range(1, no_shifts + 1)], dtype=np.int64)
+    max_counts = np.array([constraints["max_count"].get(value, no_employees) for value in range(1, no_shifts + 1)], dtype=np.int64)
+    
+    if no_shifts > HALL_MAX_SHIFTS:
+        from flow import solve_day_flow  # Deferred: ortools is only imported for days solved as a flow
+        violations = []
+        costs = [[0] * no_shifts] * no_employees
+        for day in range(no_days):
+            domains = [[value for value in range(1, no_shifts + 1) if mask >> (value - 1) & 1] if working else [0]
+                       for working, mask in zip(on_duty[day].tolist(), masks[day].tolist())]
+            solution, _ = solve_day_flow(domains, costs, constraints, no_shifts)
+            violations.append(None if solution is not None else
+                              ("min", list(range(1, no_shifts + 1)), int(min_counts.sum()), int(on_duty[day].sum())))
+        return violations
+    
+    no_subsets = 1 << no_shifts
+    # inside[day, S]: on-duty employees whose mask is a subset of S
+    days, employees = np.nonzero(on_duty)
+    inside = np.bincount(days * no_subsets + masks[days, employees], minlength=no_days * no_subsets).reshape(no_days, no_subsets)
+    subsets = np.arange(no_subsets)
+    for bit in range(no_shifts):
+        with_bit = subsets[subsets & (1 << bit) != 0]
+        inside[:, with_bit] += inside[:, with_bit ^ (1 << bit)]
+    # can_serve[day, S]: on-duty employees allowed some shift in S
+    can_serve = inside[:, -1:] - inside[:, (no_subsets - 1) ^ subsets]
+    members = (subsets[:, None] >> np.arange(no_shifts)) & 1
+    short = can_serve < members @ min_counts
+    over = inside > members @ max_counts
+    
+    # Smallest subsets first, "min" before "max"
+    order = np.lexsort((subsets, members.sum(axis=1)))
+    violations = []
+    for day in range(no_days):
+        violation = None
+        failing = np.flatnonzero(short[day, order] | over[day, order])
+        if len(failing):
+            subset = int(order[failing[0]])
+            shifts = [value for value in range(1, no_shifts + 1) if subset >> (value - 1) & 1]
+            if short[day, subset]:
+                violation = ("min", shifts, int(members[subset] @ min_counts), int(can_serve[day, subset]))
+            else:
+                violation = ("max", shifts, int(members[subset] @ max_counts), int(inside[day, subset]))
+        violations.append(violation)
+    return violations
+
+
+def hall_message(day, violation):
+    """Describes a violation returned by hall_violations for day (0-based)."""
+    kind, shifts, bound, count = violation
+    if kind == "min":
+        return (f"Day {day + 1}: Shifts {shifts} need at least {bound} employees in total but only {count} "
+                f"employees available can work any of them")
+    if not shifts:
+        return f"Day {day + 1}: {count} employees must work but no shift is allowed for them"
+    return (f"Day {day + 1}: {count} employees must work and can only take shifts {shifts}, "
+            f"which take at most {bound} employees in total")
+
+
+def check_feasibility(config, inputs, constraints, no_days, exact=True):
     """
     Check if the roaster generation problem is feasible.
     
+    The on-duty matrix (days x employees) and the per-shift eligibility
+    counts (days x shifts) are computed once from the availability tensor,
+    and every check reads them in bulk; messages are only formatted for the
+    days they concern. Checks 1-6 (message text and order included) match
+    check_feasibility_reference.
+    
+    With exact, check 7 tests every day that passed the count checks with
+    hall_violations: counts per shift can all be met while one flexible
+    employee is counted for several shifts, which only the exact test
+    catches. Forbidden transitions from inputs["previous_day"] apply to the
+    first day.
+    
+    Returns:
+        (is_feasible, list_of_warnings) where warnings are strings describing issues
+    """
+    # Leaves, work pattern off days and preference/exclusion sets come precompiled from the availability tensor
+    availability = availability_for(config, inputs, no_days)
+    on_leave = availability.on_leave[:no_days]
+    pattern_off = availability.pattern_off[:no_days]
+    on_duty = ~(on_leave | pattern_off)
+    
+    # available_per_shift[day, j]: on-duty employees allowed to work shift shift_ids[j]
+    shift_ids = list(constraints["min_count"].keys())
+    available_per_shift = on_duty.astype(np.int64) @ availability.shift_allowed[:, shift_ids].astype(np.int64)
+    
+    violations = None
+    if exact:
+        no_shifts = config["no_shifts"]
+        masks = np.broadcast_to(shift_masks(availability.shift_allowed, no_shifts), on_duty.shape)
+        if no_days > 0 and inputs.get("previous_day"):
+            masks = masks.copy()
+            masks[0] = shift_masks(availability.shift_allowed & ~availability.blocked[np.asarray(inputs["previous_day"])], no_shifts)
+        violations = lambda days: hall_violations(on_duty[days], masks[days], constraints, no_shifts)
+    
+    return feasibility_messages(config, inputs, constraints, on_leave, on_duty, on_duty.sum(axis=1), on_leave.sum(axis=1),
+                                (pattern_off & ~on_leave).sum(axis=1), available_per_shift, violations)
+
+
+def feasibility_messages(config, inputs, constraints, on_leave, on_duty, available_counts, leave_counts, pattern_off_counts,
+                         available_per_shift, violations=None):
+    """
+    Checks 1-7 of check_feasibility, read from the day counters.
+    
+    Args:
+        on_leave, on_duty: (days, employees) bool, only read on the days an error names
+        available_counts, leave_counts: (days,) on-duty employees and employees on leave
+        pattern_off_counts: (days,) employees on a work pattern off day and not on leave
+        available_per_shift: (days, shifts) on-duty employees allowed each shift of constraints["min_count"], in key order
+        violations: violations(days) returns hall_violations for an array of days; None skips check 7
+    
+    Returns:
+        (is_feasible, list_of_warnings) as check_feasibility
+    """
+    warnings = []
+    errors = []
+    no_employees = config["no_employees"]
+    
+    # Check 1: Minimum staffing requirements per day
+    total_min_required = sum(constraints["min_count"].values())
+    total_max_allowed = sum(constraints["max_count"].values())
+    
+    if total_min_required > no_employees:
+        errors.append(
+            f"INFEASIBLE: Total minimum employees required ({total_min_required}) exceeds "
+            f"total employees ({no_employees})"
+        )
+    
+    if total_max_allowed < total_min_required:
+        errors.append(
+            f"INFEASIBLE: Total maximum employees ({total_max_allowed}) is less than "
+            f"total minimum required ({total_min_required})"
+        )
+    
+    shift_ids = list(constraints["min_count"].keys())
+    min_required = np.array([constraints["min_count"][shift_id] for shift_id in shift_ids], dtype=np.int64)
+    
+    # Check 2: Day-by-day feasibility (considering leaves, work patterns, shift preferences, and shift exclusions)
+    flagged = (available_counts < total_min_required + 2) | (available_per_shift <= min_required).any(axis=1)
+    for day in np.flatnonzero(flagged).tolist():
+        num_available = int(available_counts[day])
+        
+        # Check if we have enough employees for minimum requirements (overall)
+        if num_available < total_min_required:
+            unavailable_reasons = {
+                i: "on leave" if on_leave[day, i] else "work pattern off day"
+                for i in np.flatnonzero(~on_duty[day])[:5].tolist()
+            }
+            errors.append(
+                f"INFEASIBLE: Day {day + 1}: Only {num_available} employees available "
+                f"but {total_min_required} minimum required. "
+                f"Unavailable: {unavailable_reasons}"
+            )
+        
+        # Check if we have enough for each shift's minimum (considering shift preferences)
+        for shift_id, min_req, num_available_for_shift in zip(shift_ids, min_required.tolist(), available_per_shift[day].tolist()):
+            if num_available_for_shift < min_req:
+                errors.append(
+                    f"INFEASIBLE: Day {day + 1}, Shift {shift_id}: Only {num_available_for_shift} employees "
+                    f"available (considering shift preferences) but {min_req} minimum required"
+                )
+            elif num_available_for_shift == min_req:
+                warnings.append(
+                    f"WARNING: Day {day + 1}, Shift {shift_id}: Exactly {num_available_for_shift} employees "
+                    f"available for {min_req} minimum requirement (no flexibility, considering shift preferences and exclusions)"
+                )
+        
+        # Warning if close to minimum (overall)
+        if num_available == total_min_required:
+            warnings.append(
+                f"WARNING: Day {day + 1}: Exactly {num_available} employees available "
+                f"for {total_min_required} minimum requirement (no flexibility)"
+            )
+        elif num_available < total_min_required + 2:
+            warnings.append(
+                f"WARNING: Day {day + 1}: Only {num_available} employees available "
+                f"for {total_min_required} minimum requirement (very tight)"
+            )
+    
+    # Check 3: Forbidden shift sequence impact
+    # Count how many employees are blocked from certain shifts due to previous day
+    if "previous_day" in inputs:
+        previous_counts = np.bincount(np.asarray(inputs["previous_day"], dtype=np.int64), minlength=config["no_shifts"] + 1)
+        forbidden_blocks = {}  # shift_id -> count of employees blocked
+        for k_val, forbidden_val in config["forbidden_constraints"]:
+            employees_with_k = int(previous_counts[k_val]) if 0 <= k_val < len(previous_counts) else 0
+            forbidden_blocks[forbidden_val] = forbidden_blocks.get(forbidden_val, 0) + employees_with_k
+        
+        # Check if forbidden constraints block too many employees from a shift
+        for shift_id, min_req in constraints["min_count"].items():
+            blocked = forbidden_blocks.get(shift_id, 0)
+            if blocked > no_employees - min_req:
+                warnings.append(
+                    f"WARNING: Shift {shift_id}: {blocked} employees may be blocked by "
+                    f"forbidden constraints, but {min_req} minimum required. "
+                    f"May be infeasible depending on other constraints."
+                )
+    
+    # Check 4: Work pattern distribution
+    # Check if work patterns cause too many employees to be off on the same days (leaves counted separately)
+    pattern_available = no_employees - pattern_off_counts - leave_counts
+    for day in np.flatnonzero(pattern_available < total_min_required).tolist():
+        errors.append(
+            f"INFEASIBLE: Day {day + 1}: {int(pattern_off_counts[day])} employees off due to work pattern, "
+            f"{int(leave_counts[day])} on leave, only {int(pattern_available[day])} available for {total_min_required} minimum"
+        )
+    
+    # Check 5: Shift-specific feasibility
+    # For each shift, check if enough employees can work it considering all constraints
+    for shift_id in range(1, config["no_shifts"] + 1):
+        min_req = constraints["min_count"].get(shift_id, 0)
+        max_allowed = constraints["max_count"].get(shift_id, no_employees)
+        
+        if min_req > max_allowed:
+            errors.append(
+                f"INFEASIBLE: Shift {shift_id}: min_count ({min_req}) > max_count ({max_allowed})"
+            )
+        
+        if min_req > no_employees:
+            errors.append(
+                f"INFEASIBLE: Shift {shift_id}: min_count ({min_req}) > total employees "
+                f"({no_employees})"
+            )
+    
+    # Check 6: Leave concentration
+    # Check if too many employees are on leave on the same days
+    leave_available = no_employees - leave_counts
+    for day in np.flatnonzero(leave_available <= total_min_required).tolist():
+        count, available = int(leave_counts[day]), int(leave_available[day])
+        if available < total_min_required:
+            errors.append(
+                f"INFEASIBLE: Day {day + 1}: {count} employees on leave, "
+                f"only {available} available for {total_min_required} minimum requirement"
+            )
+        else:
+            warnings.append(
+                f"WARNING: Day {day + 1}: {count} employees on leave, "
+                f"exactly {available} available (no flexibility)"
+            )
+    
+    # Check 7: Exact per-day assignment (Hall condition over shift subsets)
+    if violations is not None:
+        counted = np.zeros(len(available_counts), dtype=bool)  # Days already reported by the count checks
+        counted[available_counts < total_min_required] = True
+        counted[(available_per_shift < min_required).any(axis=1)] = True
+        counted[pattern_available < total_min_required] = True
+        counted[leave_available < total_min_required] = True
+        checked = np.flatnonzero(~counted)
+        for day, violation in zip(checked.tolist(), violations(checked)):
+            if violation is not None:
+                errors.append(f"INFEASIBLE: {hall_message(day, violation)}")
+    
+    return len(errors) == 0, errors + warnings
+
+
+def check_feasibility_reference(config, inputs, constraints, no_days):
+    """
+    Day-by-day loop version of check_feasibility, with the same results.
+    
+    Kept as the reference the vectorized checker is compared against (see
+    benchmark.py feasibility).
+    
     Returns:
         (is_feasible, list_of_warnings) where warnings are strings describing issues
     """
@@ -31,9 +329,8 @@ def check_feasibility(config, inputs, constraints, no_days):
         )
     
     # Check 2: Day-by-day feasibility (considering leaves, work patterns, shift preferences, and shift exclusions)
-    employee_leaves = inputs.get("employee_leaves", [])
-    shift_preferences = inputs.get("shift_preferences", [])
-    shift_exclusions = inputs.get("shift_exclusions", [])
+    # Leaves, work pattern off days and preference/exclusion sets come precompiled from the availability tensor
+    availability = availability_for(config, inputs, no_days)
     
     for day in range(no_days):
         # Count available employees for this day (overall)
@@ -45,22 +342,12 @@ def check_feasibility(config, inputs, constraints, no_days):
         
         for i in range(config["no_employees"]):
             # Check if on leave
-            if i < len(employee_leaves) and day in employee_leaves[i]:
+            if availability.on_leave[day, i]:
                 unavailable_reasons[i] = "on leave"
                 continue
             
-            # Check work pattern
-            # shift_day gets incremented each day in generate_roaster, so we simulate that
-            pattern_id = inputs["work_pattern"][i]
-            pattern = config["work_pattern"][pattern_id]
-            initial_shift_day = inputs["shift_day"][i]
-            
-            # Calculate what day this would be in the pattern cycle
-            # shift_day increments by 1 each day, so after 'day' days, it's initial + day
-            current_shift_day = initial_shift_day + day
-            pattern_day = current_shift_day % pattern["total_days"]
-            
-            if pattern_day in pattern["off_days"]:
+            # Check work pattern (shift_day advances by one every day)
+            if availability.pattern_off[day, i]:
                 unavailable_reasons[i] = "work pattern off day"
                 continue
             
@@ -68,18 +355,9 @@ def check_feasibility(config, inputs, constraints, no_days):
             available_employees.append(i)
             
             # Check shift preferences and exclusions: can this employee work each shift?
-            employee_prefs = shift_preferences[i] if i < len(shift_preferences) else set()
-            employee_exclusions = shift_exclusions[i] if i < len(shift_exclusions) else set()
-            
+            # Employee can work a shift if it is NOT excluded and (they have no preferences or it is preferred)
             for shift_id in constraints["min_count"].keys():
-                # Employee can work this shift if:
-                # - Shift is NOT in their exclusion list, AND
-                # - (They have no preferences (empty set = can work any shift), OR this shift is in their preference list)
-                if shift_id in employee_exclusions:
-                    # Employee cannot work this shift (excluded)
-                    continue
-                
-                if not employee_prefs or shift_id in employee_prefs:
+                if availability.shift_allowed[i, shift_id]:
                     available_per_shift[shift_id].append(i)
         
         num_available = len(available_employees)
@@ -146,27 +424,14 @@ def check_feasibility(config, inputs, constraints, no_days):
     pattern_off_counts = {}  # day -> count of employees off due to pattern
     
     for day in range(no_days):
-        pattern_off_count = 0
-        for i in range(config["no_employees"]):
-            # Skip if on leave (already counted)
-            if i < len(employee_leaves) and day in employee_leaves[i]:
-                continue
-            
-            pattern_id = inputs["work_pattern"][i]
-            pattern = config["work_pattern"][pattern_id]
-            initial_shift_day = inputs["shift_day"][i]
-            current_shift_day = initial_shift_day + day
-            pattern_day = current_shift_day % pattern["total_days"]
-            
-            if pattern_day in pattern["off_days"]:
-                pattern_off_count += 1
+        # Employees on leave are already counted below
+        pattern_off_count = int((availability.pattern_off[day] & ~availability.on_leave[day]).sum())
         
         pattern_off_counts[day] = pattern_off_count
         available = config["no_employees"] - pattern_off_count
         
         # Subtract leave count for this day
-        leave_count = sum(1 for i in range(config["no_employees"]) 
-                         if i < len(employee_leaves) and day in employee_leaves[i])
+        leave_count = int(availability.on_leave[day].sum())
         available -= leave_count
         
         if available < total_min_required:
@@ -196,8 +461,7 @@ def check_feasibility(config, inputs, constraints, no_days):
     # Check if too many employees are on leave on the same days
     leave_counts = {}  # day -> count of employees on leave
     for day in range(no_days):
-        count = sum(1 for i in range(config["no_employees"]) 
-                   if i < len(employee_leaves) and day in employee_leaves[i])
+        count = int(availability.on_leave[day].sum())
         leave_counts[day] = count
         
         available = config["no_employees"] - count
@@ -215,57 +479,57 @@ def check_feasibility(config, inputs, constraints, no_days):
     return len(errors) == 0, errors + warnings
 
 
-def check_feasibility_per_day(config, inputs, constraints, day, employee_leaves=None, shift_preferences=None, shift_exclusions=None):
+def check_feasibility_per_day(config, inputs, constraints, day, employee_leaves=None, shift_preferences=None, shift_exclusions=None,
+                              previous_day=None, exact=True):
     """
     Check feasibility for a specific day.
     Useful for checking during scheduling.
     
+    Args:
+        previous_day: Optional shifts of the day before; employees cannot take a shift
+                      that config["forbidden_constraints"] forbids after their previous one
+        exact: Once the counts pass, test the day exactly with hall_violations;
+               the reason then names the violating subset of shifts
+    
     Returns:
         (is_feasible, reason_string)
     """
-    if employee_leaves is None:
-        employee_leaves = inputs.get("employee_leaves", [])
-    if shift_preferences is None:
-        shift_preferences = inputs.get("shift_preferences", [])
-    if shift_exclusions is None:
-        shift_exclusions = inputs.get("shift_exclusions", [])
-    
-    # Count available employees (overall)
-    available_count = 0
-    # Count available employees per shift (considering shift preferences and exclusions)
-    available_per_shift = {shift_id: 0 for shift_id in constraints["min_count"].keys()}
-    
-    for i in range(config["no_employees"]):
-        # Check leave
-        if i < len(employee_leaves) and day in employee_leaves[i]:
-            continue
-        
-        # Check work pattern
-        pattern_id = inputs["work_pattern"][i]
-        pattern = config["work_pattern"][pattern_id]
-        initial_shift_day = inputs["shift_day"][i]
-        current_shift_day = initial_shift_day + day
-        pattern_day = current_shift_day % pattern["total_days"]
-        
-        if pattern_day in pattern["off_days"]:
-            continue
-        
-        # Employee is available
-        available_count += 1
-        
-        # Check shift preferences and exclusions
-        employee_prefs = shift_preferences[i] if i < len(shift_preferences) else set()
-        employee_exclusions = shift_exclusions[i] if i < len(shift_exclusions) else set()
-        
-        for shift_id in constraints["min_count"].keys():
-            # Employee can work this shift if:
-            # - Shift is NOT in their exclusion list, AND
-            # - (No preferences or shift in preferences)
-            if shift_id in employee_exclusions:
-                continue  # Excluded shift
-            
-            if not employee_prefs or shift_id in employee_prefs:
-                available_per_shift[shift_id] += 1
+    if employee_leaves is None and shift_preferences is None and shift_exclusions is None:
+        availability = inputs.get("availability")
+    else:
+        availability = None
+        inputs = dict(inputs)
+        if employee_leaves is not None:
+            inputs["employee_leaves"] = employee_leaves
+        if shift_preferences is not None:
+            inputs["shift_preferences"] = shift_preferences
+        if shift_exclusions is not None:
+            inputs["shift_exclusions"] = shift_exclusions
+    if availability is None or not availability.first_day <= day < availability.first_day + availability.no_days:
+        availability = Availability(config, inputs, 1, first_day=day)
+    row = day - availability.first_day
+    
+    # Count available employees (overall): not on leave and not on a work pattern off day
+    on_duty = ~(availability.on_leave[row] | availability.pattern_off[row])
+    available_count = int(on_duty.sum())
+    
+    # Shifts each employee may take (considering shift preferences and exclusions)
+    shift_allowed = availability.shift_allowed
+    if previous_day is not None:
+        shift_allowed = shift_allowed & ~availability.blocked[np.asarray(previous_day)]
+        stuck = np.flatnonzero(on_duty & ~shift_allowed[:, 1:].any(axis=1))
+        if len(stuck) > 0:
+            i = int(stuck[0])
+            return False, (
+                f"Day {day + 1}: Employee {i + 1} must work but no allowed shift "
+                f"may follow their previous shift {previous_day[i]}"
+            )
+    
+    # Count available employees per shift
+    available_per_shift = {
+        shift_id: int((on_duty & shift_allowed[:, shift_id]).sum())
+        for shift_id in constraints["min_count"].keys()
+    }
     
     total_min_required = sum(constraints["min_count"].values())
     
@@ -283,5 +547,163 @@ def check_feasibility_per_day(config, inputs, constraints, day, employee_leaves=
                     f"(considering shift preferences and exclusions) but {min_req} minimum required"
                 )
     
+    if exact:
+        violation = hall_violations(on_duty[None], shift_masks(shift_allowed, config["no_shifts"]), constraints, config["no_shifts"])[0]
+        if violation is not None:
+            return False, hall_message(day, violation)
+    
     return True, ""
 
+
+class FeasibilityChecker:
+    """
+    check_feasibility kept up to date under edits to its inputs.
+    
+    The checker owns copies of inputs and constraints, its own Availability
+    and the day counters check_feasibility reads (on-duty employees, leaves,
+    pattern off days and eligibility per shift). Each edit recompiles the
+    employee it concerns, compares their old and new contribution on the
+    days it can touch and adjusts the counters on the days that changed.
+    Those days are also the only ones whose exact check (hall_violations)
+    is redone by the next check(); other days keep their cached result.
+    Edits to a shift's bounds change every day's checks, so they mark every
+    day for the exact check.
+    
+    check() returns what check_feasibility returns for the edited inputs.
+    """
+
+    def __init__(self, config, inputs, constraints, no_days, exact=True):
+        self.config = config
+        self.no_days = no_days
+        self.exact = exact
+        no_employees = config["no_employees"]
+
+        # Edits must not reach the caller's inputs (or a shared inputs["availability"])
+        self.inputs = {key: value for key, value in inputs.items() if key != "availability"}
+        for key in ("shift_day", "work_pattern"):
+            self.inputs[key] = list(inputs[key])
+        for key in ("employee_leaves", "shift_preferences", "shift_exclusions"):
+            sets = [set(employee_set) for employee_set in inputs.get(key, [])]
+            self.inputs[key] = sets + [set() for _ in range(no_employees - len(sets))]
+        self.constraints = {"min_count": dict(constraints["min_count"]), "max_count": dict(constraints["max_count"])}
+        self.shift_ids = list(self.constraints["min_count"].keys())
+
+        self.availability = Availability(config, self.inputs, no_days)
+        on_leave = self.availability.on_leave
+        pattern_off = self.availability.pattern_off
+        on_duty = ~(on_leave | pattern_off)
+        self.available_counts = on_duty.sum(axis=1)
+        self.leave_counts = on_leave.sum(axis=1)
+        self.pattern_off_counts = (pattern_off & ~on_leave).sum(axis=1)
+        self.available_per_shift = on_duty.astype(np.int64) @ self.availability.shift_allowed[:, self.shift_ids].astype(np.int64)
+
+        # Exact check result per day, redone for stale days only
+        self.violations = [None] * no_days
+        self.stale = np.ones(no_days, dtype=bool)
+
+    def add_leave(self, i, start_day, end_day):
+        """Puts employee i on leave from start_day to end_day (0-based, inclusive)."""
+        self._edit_leave(i, start_day, end_day, set.update)
+
+    def remove_leave(self, i, start_day, end_day):
+        """Takes employee i off leave from start_day to end_day (0-based, inclusive)."""
+        self._edit_leave(i, start_day, end_day, set.difference_update)
+
+    def set_shift_preferences(self, i, shifts):
+        """Replaces employee i's preferred shifts (empty = no preference)."""
+        self._edit_employee(i, lambda: self.inputs["shift_preferences"].__setitem__(i, set(shifts)))
+
+    def set_shift_exclusions(self, i, shifts):
+        """Replaces employee i's excluded shifts."""
+        self._edit_employee(i, lambda: self.inputs["shift_exclusions"].__setitem__(i, set(shifts)))
+
+    def set_work_pattern(self, i, pattern_id, shift_day=None):
+        """Moves employee i to config["work_pattern"][pattern_id], optionally at a new position shift_day."""
+        if pattern_id not in self.config["work_pattern"]:
+            raise ValueError(f"Unknown work pattern {pattern_id}. Valid patterns: {list(self.config['work_pattern'])}")
+
+        def edit():
+            self.inputs["work_pattern"][i] = pattern_id
+            if shift_day is not None:
+                self.inputs["shift_day"][i] = shift_day
+        self._edit_employee(i, edit)
+
+    def set_shift_bounds(self, shift_id, min_count=None, max_count=None):
+        """Changes the min_count and/or max_count of shift_id."""
+        if shift_id not in self.constraints["min_count"]:
+            raise ValueError(f"Unknown shift {shift_id}. Valid shifts: {self.shift_ids}")
+        if min_count is not None:
+            self.constraints["min_count"][shift_id] = min_count
+        if max_count is not None:
+            self.constraints["max_count"][shift_id] = max_count
+        self.stale[:] = True
+
+    def check(self):
+        """
+        Returns:
+            (is_feasible, list_of_warnings) as check_feasibility(config, inputs, constraints, no_days, exact)
+            on the edited inputs and constraints
+        """
+        availability = self.availability
+        on_duty = ~(availability.on_leave | availability.pattern_off)
+        return feasibility_messages(self.config, self.inputs, self.constraints, availability.on_leave, on_duty,
+                                    self.available_counts, self.leave_counts, self.pattern_off_counts,
+                                    self.available_per_shift, self._violations if self.exact else None)
+
+    def _violations(self, days):
+        """hall_violations for days, redone only on the stale ones."""
+        stale = days[self.stale[days]]
+        if len(stale):
+            availability = self.availability
+            no_shifts = self.config["no_shifts"]
+            on_duty = ~(availability.on_leave[stale] | availability.pattern_off[stale])
+            masks = np.broadcast_to(shift_masks(availability.shift_allowed, no_shifts), on_duty.shape)
+            if stale[0] == 0 and self.inputs.get("previous_day"):
+                masks = masks.copy()
+                masks[0] = shift_masks(availability.shift_allowed & ~availability.blocked[np.asarray(self.inputs["previous_day"])], no_shifts)
+            for day, violation in zip(stale.tolist(), hall_violations(on_duty, masks, self.constraints, no_shifts)):
+                self.violations[day] = violation
+            self.stale[stale] = False
+        return [self.violations[day] for day in days.tolist()]
+
+    def _edit_leave(self, i, start_day, end_day, update):
+        days = np.arange(max(start_day, 0), min(end_day, self.no_days - 1) + 1)
+
+        def edit():
+            update(self.inputs["employee_leaves"][i], days.tolist())
+            for day in days.tolist():
+                self.availability.update_leave(i, day)
+        self._edit(i, days, edit)
+
+    def _edit_employee(self, i, edit):
+        def recompile():
+            edit()
+            self.availability.update_employee(i)
+        self._edit(i, np.arange(self.no_days), recompile)
+
+    def _edit(self, i, days, edit):
+        """Runs edit, which may only change employee i on days, and moves the counters by employee i's change there."""
+        before = self._contribution(i, days)
+        edit()
+        after = self._contribution(i, days)
+        if not len(days):
+            return
+        # allowed (every shift, not only the counted ones) decides the exact check, day 0's masks included
+        changed = np.zeros(len(days), dtype=bool)
+        for new, old in zip(after, before):
+            changed |= (new != old).reshape(len(days), -1).any(axis=1)
+        days = days[changed]
+        on_duty, on_leave, pattern_off, allowed = (new[changed].astype(np.int64) - old[changed] for new, old in zip(after, before))
+        self.available_counts[days] += on_duty
+        self.leave_counts[days] += on_leave
+        self.pattern_off_counts[days] += pattern_off
+        self.available_per_shift[days] += allowed[:, np.asarray(self.shift_ids, dtype=np.int64) - 1]
+        self.stale[days] = True
+
+    def _contribution(self, i, days):
+        """Employee i on days: on duty, on leave, pattern off only, and allowed[:, s - 1] for each shift s while on duty."""
+        on_leave = self.availability.on_leave[days, i]
+        pattern_off = self.availability.pattern_off[days, i]
+        on_duty = ~(on_leave | pattern_off)
+        allowed = on_duty[:, None] & self.availability.shift_allowed[i, 1:]
+        return on_duty, on_leave, pattern_off & ~on_leave, allowed
@@ -0,0 +1,58 @@
+"""
+Min-cost flow day solver.
+Solves the single-day assignment as a bounded transportation problem.
+"""
+from ortools.graph.python import min_cost_flow
+
+
+def solve_day_flow(domains, costs, constraints, no_shifts):
+    """
+    Assigns one allowed shift to every working employee at minimum total cost.
+
+    Network: employee -> shift (capacity 1, cost costs[i][shift - 1]) -> sink.
+    Shift lower bounds are moved into node supplies: each shift node demands
+    min_count and forwards at most max_count - min_count extra units to the sink.
+
+    Args:
+        domains: Allowed values per employee; [0] means the employee is off,
+                 otherwise the employee must work one of the listed shifts
+        costs: costs[i][shift - 1] = cost of employee i working shift
+
+    Returns:
+        (solution, total_cost), or (None, None) if the day is infeasible
+    """
+    no_employees = len(domains)
+    working = [i for i in range(no_employees) if domains[i] != [0]]
+    total_min = sum(constraints["min_count"][value] for value in range(1, no_shifts + 1))
+    if len(working) < total_min:
+        return None, None
+    for value in range(1, no_shifts + 1):
+        if constraints["min_count"][value] > constraints["max_count"][value]:
+            return None, None
+
+    # Nodes: working employees, then shifts 1..no_shifts, then the sink
+    shift_node = {value: len(working) + value - 1 for value in range(1, no_shifts + 1)}
+    sink = len(working) + no_shifts
+
+    smcf = min_cost_flow.SimpleMinCostFlow()
+    employee_arcs = []
+    for node, i in enumerate(working):
+        for value in domains[i]:
+            arc = smcf.add_arc_with_capacity_and_unit_cost(node, shift_node[value], 1, costs[i][value - 1])
+            employee_arcs.append((arc, i, value))
+        smcf.set_node_supply(node, 1)
+
+    for value in range(1, no_shifts + 1):
+        extra = constraints["max_count"][value] - constraints["min_count"][value]
+        smcf.add_arc_with_capacity_and_unit_cost(shift_node[value], sink, extra, 0)
+        smcf.set_node_supply(shift_node[value], -constraints["min_count"][value])
+    smcf.set_node_supply(sink, -(len(working) - total_min))
+
+    if smcf.solve() != smcf.OPTIMAL:
+        return None, None
+
+    solution = [0] * no_employees
+    for arc, i, value in employee_arcs:
+        if smcf.flow(arc) > 0:
+            solution[i] = value
+    return solution, smcf.optimal_cost()
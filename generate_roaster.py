@@ -1,61 +1,590 @@
-from csp import create_day_schedule
-import copy
+from csp import solve_day, solve_day_pool, explain_day_failure, apply_quality_count, undo_quality_count, update_quality_count
+from feasibility_checker import check_feasibility_per_day
+from availability import Availability
+from budget import TimeBudget
+from checkpoint import save_checkpoint, load_checkpoint, problem_fingerprint
+from hints import day_hint
+from collections import OrderedDict
+import contextlib
+import io
+import multiprocessing
+import time
+import numpy as np
 
 
-def simulate_roaster(day_no, total_no_days, config, inputs, constraints):
+def simulate_roaster(day_no, total_no_days, config, inputs, constraints, stats=None, budget=None, resume=False,
+                     telemetry=None):
     """
-    Recursively generates roaster schedule day by day with backtracking.
+    Generates roaster schedule day by day with backtracking.
     
-    Optimizations:
-    - Reduced memory copies (only copy what's necessary)
-    - Early termination when threshold reached
-    - Better state management
+    Runs iter_roaster without a commit depth, so every day stays open to
+    backtracking until the roster is complete; see iter_roaster for the search.
+    
+    Returns:
+        (schedule, quality_count), or (None, None) if no roaster exists or
+        the budget ran out first
+    """
+    days = iter_roaster(day_no, total_no_days, config, inputs, constraints, stats, budget, resume, telemetry=telemetry)
+    schedule = []
+    while True:
+        try:
+            _, solution = next(days)
+        except StopIteration as done:
+            quality_count = done.value
+            break
+        schedule.append(solution)
+    if quality_count is None:
+        return None, None
+    return inputs["schedule"] + schedule, quality_count
+
+
+def iter_roaster(day_no, total_no_days, config, inputs, constraints, stats=None, budget=None, resume=False,
+                 commit_depth=None, telemetry=None):
     """
-    # Base case: all days scheduled
-    if day_no == total_no_days:
-        return inputs["schedule"], inputs["quality_count"]
+    Generates roaster schedule day by day with backtracking, yielding days as they are committed.
+    
+    Depth-first search driven by an explicit stack instead of recursion, so
+    long horizons are not bounded by the interpreter's recursion limit:
+    - The roaster is a preallocated days x employees array; a day's row is
+      overwritten when it is re-solved
+    - quality_count is updated in place, and each day keeps an undo log that
+      is replayed when the search backtracks over it
+    - shift_day is advanced/rewound in place and previous_day is read from
+      the roaster, so no per-day input state is copied
+    
+    With config["backjumping"], a day without solutions is explained by
+    explain_day_failure. Since forbidden transitions only link consecutive
+    days, the conflict names either some of the previous day's shifts, which
+    are recorded as a nogood for that day and cut from every later attempt
+    at it, or nothing, in which case no earlier choice can help and the
+    search stops at once instead of retrying every level above it.
+    
+    config["lookahead"] looks one day ahead before committing a day:
+    - "check": each candidate is checked against the next day with
+      check_feasibility_per_day (counts plus forbidden transitions from the
+      candidate). A candidate that fails is counted as an attempt and
+      excluded, exactly as if the next day had failed, without solving it
+    - "model": the next day's constraints are part of the day model, so
+      candidates that would leave it infeasible are never produced
+    In both modes a next day that fails the check whatever precedes it ends
+    the search at once.
+    
+    With config["failed_state_cache_size"] > 0, every day left without a
+    roaster is remembered as a failed (day, previous_day) state (see
+    FailedStates), and the search backtracks as soon as it reaches one again.
+    
+    With config["solution_pool"], the first retry of a day solves once for a
+    pool of diverse near-optimal solutions covering its remaining attempts
+    (see solve_day_pool), and later retries are taken from the pool; only
+    once the pool is used up does the day fall back to exclusion cuts.
+    First attempts are solved as usual, so days that are never retried cost
+    nothing extra.
+    
+    With a TimeBudget (by default one of config["time_budget"] seconds, see
+    TimeBudget.from_config), each solve is limited to an even share of the
+    time left over one solve per day left plus the retries left on its day,
+    and the search gives up as soon as the deadline passes. A solve that runs
+    out of its share without an answer is counted in "timeouts" and also ends
+    the search as timed out: it says nothing about whether the day can be
+    solved, so the search does not backtrack over it.
+    
+    config["solution_hints"] lists where CP-SAT solves take a starting point
+    from: the day's previous attempt, the same day of the previous cycle, or
+    inputs["hint_roster"], a prior roster (see hints.day_hint).
+    
+    With config["speculative_workers"] > 0, a day that has to be retried is a
+    branching point: up to config["speculative_candidates"] alternatives are
+    solved, and the rest of the roster after each is searched in its own
+    process (at most speculative_workers at a time, each searching
+    sequentially). The first candidate in solve order whose subtree completes
+    the roster wins, and the other subtrees are terminated; waiting for the
+    earlier candidates keeps the result reproducible. If all fail, they count
+    as tried and the day moves on to its next batch.
+    
+    With config["checkpoint_file"], the whole search state (committed days,
+    quality_count, shift_day, the solutions tried per level, nogoods, pools,
+    failed states and stats) is saved every config["checkpoint_interval"]
+    seconds and when the budget runs out (see checkpoint.save_checkpoint).
+    With resume, the search continues from that checkpoint and ends with the
+    same roster as an uninterrupted run: a budget stop saves no unanswered
+    solve as tried, and "timed_out"/"timeouts" start over. Speculative
+    subtrees are not saved. A checkpoint of another problem raises ValueError.
+    
+    With commit_depth, backtracking never goes more than commit_depth days
+    behind the day being solved: once the search moves on to day d, day
+    d - commit_depth - 1 is final and is yielded at once, and its solutions
+    tried, nogoods, pool and undo log are dropped. The roaster is kept in a
+    ring of commit_depth + 2 days (at least config["hint_period"] days with
+    "cycle" hints), so memory no longer grows with the horizon. A day that
+    would need a final day changed fails the search, as day_no does without
+    a commit depth. Without one, every day is yielded once the roster is
+    complete. Checkpoints cannot be combined with a commit depth, since the
+    consumer already holds the yielded days.
+    
+    Args:
+        stats: Optional dict; receives counters "solves" (solver calls),
+               "attempts" (candidate days tried), "backtracks",
+               "nogoods", "skipped_levels" (levels unwound without retrying)
+               "lookahead_pruned" (candidates rejected by the lookahead) and
+               "failed_state_hits"/"failed_state_misses" (failed state lookups),
+               "timeouts" (solves that hit their time limit without an answer;
+               with a budget they end the search, without one they count as
+               failed attempts), "timed_out" (the budget ran out), and per
+               day from day_no on
+               "day_seconds" (solver time, over every attempt), "day_gap"
+               (relative gap of the day's latest solution, None if unsolved),
+               "day_attempts" (candidates tried) and "day_backtracks" (times
+               the search backtracked out of the day)
+        budget: Optional TimeBudget shared with the rest of the run
+        resume: Continue from config["checkpoint_file"] if it holds this problem's search
+        commit_depth: How many days behind the current one the search may still
+                      backtrack; None for no limit
+        telemetry: Optional Telemetry; receives a "solve" event per solver call,
+                   "commit"/"backtrack" events, and the counters in a final "search" event
     
-    solutions = []
+    Yields:
+        (day, solution) for each committed day from day_no on, in order
+    
+    Returns:
+        quality_count once the roster is complete, or None if no roaster
+        exists or the budget ran out first
+    """
+    if stats is None:
+        stats = {}
+    quality_count = yield from _search(day_no, total_no_days, config, inputs, constraints, stats, budget, resume,
+                                       commit_depth, telemetry)
+    if telemetry is not None:
+        telemetry.emit("search", complete=quality_count is not None,
+                       **{counter: value for counter, value in stats.items() if not isinstance(value, list)})
+    return quality_count
+
+
+def _search(day_no, total_no_days, config, inputs, constraints, stats, budget, resume, commit_depth, telemetry):
+    """The search of iter_roaster, which adds the final telemetry event."""
     max_attempts = config.get("threshold", 10)
-    print(f"\nIteration {day_no + 1}/{total_no_days}:")
+    backjumping = config.get("backjumping", False)
+    lookahead = config.get("lookahead", False)
+    if lookahead is True:
+        lookahead = "check"
+    for counter in ("solves", "attempts", "backtracks", "nogoods", "skipped_levels", "lookahead_pruned",
+                    "failed_state_hits", "failed_state_misses", "timeouts"):
+        stats.setdefault(counter, 0)
+    stats["timed_out"] = False
+    stats["day_seconds"] = [0.0] * (total_no_days - day_no)
+    stats["day_gap"] = [None] * (total_no_days - day_no)
+    stats["day_attempts"] = [0] * (total_no_days - day_no)
+    stats["day_backtracks"] = [0] * (total_no_days - day_no)
+    if budget is None:
+        budget = TimeBudget.from_config(config)
+    solution_pool = config.get("solution_pool", False)
+    failed_states = None
+    if config.get("failed_state_cache_size", 0) > 0:
+        failed_states = FailedStates(config["failed_state_cache_size"], config.get("failed_state_quality_tolerance"))
+    hint_sources = config.get("solution_hints") or []
+    speculative_workers = config.get("speculative_workers", 0)
+    speculative_candidates = config.get("speculative_candidates") or speculative_workers
+    checkpoint_path = config.get("checkpoint_file")
+    if commit_depth is not None and checkpoint_path:
+        raise ValueError("A commit depth cannot be combined with 'checkpoint_file'")
+    # roster[d % window] holds day d for the last window days
+    window = max(1, total_no_days - day_no)
+    if commit_depth is not None:
+        window = min(window, max(commit_depth + 2, config.get("hint_period", 7) if "cycle" in hint_sources else 0))
+    roster = np.zeros((window, config["no_employees"]), dtype=np.int64)
+    quality_count = [list(row) for row in inputs["quality_count"]]
+    
+    availability = inputs.get("availability")
+    if availability is None:
+        # inputs["shift_day"] is recorded at day_no
+        availability = Availability(config, inputs, total_no_days - day_no, first_day=day_no, elapsed_days=0)
+    
+    day_inputs = {
+        "shift_day": list(inputs["shift_day"]),
+        "work_pattern": inputs["work_pattern"],
+        "previous_day": inputs["previous_day"],
+        "quality_count": quality_count,
+        "employee_leaves": inputs.get("employee_leaves", []),
+        "shift_preferences": inputs.get("shift_preferences", []),
+        "shift_exclusions": inputs.get("shift_exclusions", []),
+        "availability": availability  # Precomputed availability (indexed by day_no)
+    }
+    
+    # One frame per open day on the current path: the solutions tried for that day
+    solutions_stack = []
+    undo_logs = {}
+    # nogoods[day]: partial assignments of that day proven to leave the next day infeasible
+    nogoods = {}
+    # pools[day]: pooled solutions of the current visit to day not tried yet (None: none were left)
+    pools = {}
+    day = day_no
+    # Days before floor are final (and yielded)
+    floor = day_no
     
-    while len(solutions) < max_attempts:
-        # Try to find a solution for current day
+    checkpoint_interval = config.get("checkpoint_interval", 60.0)
+    fingerprint = problem_fingerprint(config, inputs, constraints, day_no, total_no_days) if checkpoint_path else None
+    if resume and checkpoint_path:
+        state = load_checkpoint(checkpoint_path)
+        if state is None:
+            print(f"No checkpoint at {checkpoint_path}, starting from day {day_no + 1}")
+        elif state["search"]["fingerprint"] != fingerprint:
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to another roster problem and cannot be resumed")
+        else:
+            search = state["search"]
+            day = search["day"]
+            for committed_day, solution in enumerate(state["roster"], start=day_no):
+                roster[committed_day % window] = solution
+            quality_count[:] = state["quality_count"].tolist()
+            day_inputs["shift_day"] = state["shift_day"].tolist()
+            solutions_stack = []
+            if len(state["tried_counts"]):
+                solutions_stack = [level.tolist() for level in np.split(state["tried"], np.cumsum(state["tried_counts"])[:-1])]
+            replayed = [list(row) for row in inputs["quality_count"]]
+            for committed_day in range(day_no, day):
+                undo_logs[committed_day] = apply_quality_count(config, replayed, roster[committed_day % window])
+            nogoods = {int(nogood_day): [{int(i): value for i, value in nogood.items()} for nogood in day_nogoods]
+                       for nogood_day, day_nogoods in search["nogoods"].items()}
+            pools = {int(pool_day): pool for pool_day, pool in search["pools"].items()}
+            if failed_states is not None:
+                failed_states.restore(search["failed_states"])
+            stats.update(search["stats"])
+            # The budget that stopped the saved run is not this run's
+            stats["timed_out"] = False
+            stats["timeouts"] = 0
+            print(f"Resuming from checkpoint at day {day + 1}/{total_no_days}")
+    
+    def checkpoint():
+        save_checkpoint(checkpoint_path, {
+            "roster": path(day_no, day),
+            "quality_count": quality_count,
+            "shift_day": day_inputs["shift_day"],
+            "tried": np.array([solution for level in solutions_stack for solution in level],
+                              dtype=np.int64).reshape(-1, config["no_employees"]),
+            "tried_counts": [len(level) for level in solutions_stack],
+            "search": {
+                "fingerprint": fingerprint,
+                "day": day,
+                "nogoods": {str(nogood_day): [{str(i): value for i, value in nogood.items()} for nogood in day_nogoods]
+                            for nogood_day, day_nogoods in nogoods.items()},
+                "pools": {str(pool_day): pool for pool_day, pool in pools.items()},
+                "failed_states": failed_states.entries() if failed_states is not None else [],
+                "stats": stats,
+            },
+        })
+    last_checkpoint = time.monotonic()
+    
+    def stop_timed_out():
+        """Records that the budget ran out, saving a checkpoint to resume from with a new budget."""
+        stats["timed_out"] = True
+        if checkpoint_path:
+            checkpoint()
+    
+    def committed(earlier_day):
+        """Solution of a day before the current one: from the roster, or from inputs["schedule"] before day_no."""
+        if earlier_day >= day_no:
+            return roster[earlier_day % window] if earlier_day >= day - window else None
+        return inputs["schedule"][earlier_day] if 0 <= earlier_day < len(inputs["schedule"]) else None
+    
+    def path(start, end):
+        """Solutions of days start..end-1, which must still be in the roster ring."""
+        return np.array([roster[earlier_day % window] for earlier_day in range(start, end)],
+                        dtype=np.int64).reshape(-1, config["no_employees"])
+    
+    while day < total_no_days:
+        if checkpoint_path and time.monotonic() - last_checkpoint >= checkpoint_interval:
+            checkpoint()
+            last_checkpoint = time.monotonic()
+        if budget is not None and budget.expired():
+            stop_timed_out()
+            return None
+        
         # Pass current day number so CSP can check for leaves
-        solution, quality_count = create_day_schedule(config, inputs, constraints, solutions, current_day=day_no)
+        day_inputs["previous_day"] = roster[(day - 1) % window] if day > day_no else inputs["previous_day"]
+        
+        known_dead = False
+        if len(solutions_stack) == day - floor:
+            # First visit to this day, unless it is a state that already failed
+            if failed_states is not None:
+                known_dead = failed_states.contains(day, day_inputs["previous_day"], quality_count)
+                stats["failed_state_hits" if known_dead else "failed_state_misses"] += 1
+            if not known_dead:
+                print(f"\nIteration {day + 1}/{total_no_days}:")
+                solutions_stack.append([])
+                if lookahead and day + 1 < total_no_days and not check_feasibility_per_day(config, day_inputs, constraints, day + 1)[0]:
+                    # The next day cannot be staffed after any day: no roaster exists
+                    stats["skipped_levels"] += day - floor
+                    return None
+                pools.pop(day, None)
+        
+        solution = None
+        info = {}
+        # A budgeted solve ran out of time without an answer
+        budget_out = False
+        if not known_dead:
+            solutions = solutions_stack[-1]
+            time_limit, first_solution = None, False
+            if budget is not None:
+                # One solve per day left, plus the retries left on this day
+                solves_left = total_no_days - day + max(0, max_attempts - len(solutions) - 1)
+                time_limit, first_solution = budget.limits(config.get("csp_time_limit", 30.0), solves_left)
+            if len(solutions) < max_attempts:
+                hint = None
+                if hint_sources:
+                    hint = day_hint(config, hint_sources, day, committed, solutions, inputs.get("hint_roster"))
+                if speculative_workers and solutions and day + 1 < total_no_days:
+                    # Branching point: search the subtrees of several alternatives at once
+                    candidates, exhausted = [], False
+                    batch_start = len(solutions)
+                    while len(candidates) < speculative_candidates and len(solutions) < max_attempts:
+                        candidate = solve_day(config, day_inputs, constraints, solutions, current_day=day, nogoods=nogoods.get(day),
+                                              lookahead=lookahead == "model", time_limit=time_limit,
+                                              first_solution=first_solution, info=info, hint=hint)
+                        stats["solves"] += 1
+                        _record_solve(stats, day - day_no, info, telemetry, day_no)
+                        if candidate is None:
+                            budget_out = budget is not None and info["timed_out"]
+                            exhausted = True
+                            break
+                        solutions.append(candidate)
+                        stats["attempts"] += 1
+                        stats["day_attempts"][day - day_no] += 1
+                        if lookahead == "check" and not check_feasibility_per_day(config, day_inputs, constraints, day + 1,
+                                                                                  previous_day=candidate)[0]:
+                            stats["lookahead_pruned"] += 1
+                            continue
+                        candidates.append(candidate)
+                    if budget_out:
+                        del solutions[batch_start:]  # Their subtrees were never searched
+                        stop_timed_out()
+                        return None
+                    
+                    # Days no longer in the ring are None: only the cycle hints look back
+                    history = inputs["schedule"] + [None] * max(0, day - window - day_no) + path(max(day_no, day - window), day).tolist()
+                    subtree_inputs = []
+                    for candidate in candidates:
+                        subtree_inputs.append(dict(
+                            day_inputs,
+                            shift_day=[value + 1 for value in day_inputs["shift_day"]],
+                            previous_day=list(candidate),
+                            quality_count=update_quality_count(config, quality_count, candidate),
+                            schedule=history + [list(candidate)],
+                            hint_roster=inputs.get("hint_roster"),
+                        ))
+                    result = _explore_subtrees(day + 1, total_no_days, config, constraints, subtree_inputs,
+                                               speculative_workers, stats, day_no, budget)
+                    if result is not None:
+                        schedule, final_quality_count = result
+                        for committed_day in range(floor, total_no_days):
+                            yield committed_day, list(map(int, schedule[committed_day]))
+                        return final_quality_count
+                    if stats["timed_out"]:
+                        # A subtree ran out of budget: its candidate was not refuted
+                        del solutions[batch_start:]
+                        stop_timed_out()
+                        return None
+                    if not exhausted:
+                        continue  # Every candidate failed: solve the next batch
+                elif solution_pool and solutions and day not in pools:
+                    # First retry on this visit: pool the remaining attempts in one go
+                    pool_size = max_attempts - len(solutions)
+                    pool = solve_day_pool(config, day_inputs, constraints, pool_size, solutions, current_day=day,
+                                          nogoods=nogoods.get(day), lookahead=lookahead == "model",
+                                          time_limit=time_limit, first_solution=first_solution, info=info, hint=hint)
+                    _record_solve(stats, day - day_no, info, telemetry, day_no, "pool")
+                    # The optimum, plus the enumeration of the rest of the pool if time was left for it
+                    stats["solves"] += info["solves"]
+                    budget_out = not pool and budget is not None and info["timed_out"]
+                    if not budget_out:
+                        pools[day] = pool or None
+                if day in pools:
+                    solution = _take_from_pool(pools[day] or [], nogoods.get(day, []))
+                if solution is None and not budget_out and pools.get(day, []) is not None and not (speculative_workers and solutions):
+                    solution = solve_day(config, day_inputs, constraints, solutions, current_day=day, nogoods=nogoods.get(day),
+                                         lookahead=lookahead == "model", time_limit=time_limit,
+                                         first_solution=first_solution, info=info, hint=hint)
+                    stats["solves"] += 1
+                    _record_solve(stats, day - day_no, info, telemetry, day_no)
+                    budget_out = solution is None and budget is not None and info["timed_out"]
+        
+        if budget_out:
+            # The budget ran out, not the day: nothing is recorded as tried or failed
+            stop_timed_out()
+            return None
         
         if solution is None:
-            # No more solutions possible for this day
-            return None, None
+            if not known_dead:
+                conflict = None
+                if backjumping and len(solutions) < max_attempts:
+                    conflict = explain_day_failure(config, day_inputs, constraints, nogoods.get(day), current_day=day,
+                                                   time_limit=time_limit, info=info)
+                    _record_solve(stats, day - day_no, info, telemetry, day_no, "explain")
+                if conflict is not None and (not conflict or day == floor):
+                    # No choice on an earlier open day can fix this day: jump straight to the root
+                    stats["skipped_levels"] += day - floor
+                    return None
+                if conflict:
+                    nogoods.setdefault(day - 1, []).append({i: int(roster[(day - 1) % window][i]) for i in conflict})
+                    stats["nogoods"] += 1
+                
+                solutions_stack.pop()
+                if failed_states is not None:
+                    failed_states.add(day, day_inputs["previous_day"], quality_count)
+            
+            # Day exhausted: backtrack to the previous day and try its next solution
+            if day == floor:
+                return None
+            stats["backtracks"] += 1
+            stats["day_backtracks"][day - day_no] += 1
+            if telemetry is not None:
+                telemetry.emit("backtrack", day=day, attempts=stats["day_attempts"][day - day_no])
+            day -= 1
+            undo_quality_count(quality_count, undo_logs[day])
+            _advance_shift_day(day_inputs["shift_day"], -1)
+            continue
         
-        # Found a solution, add it to tried solutions
         solutions.append(solution)
+        stats["attempts"] += 1
+        stats["day_attempts"][day - day_no] += 1
+        if lookahead == "check" and day + 1 < total_no_days:
+            next_feasible, _ = check_feasibility_per_day(config, day_inputs, constraints, day + 1, previous_day=solution)
+            if not next_feasible:
+                # The next day cannot be staffed after this candidate: try the next one
+                stats["lookahead_pruned"] += 1
+                continue
         
-        # Prepare state for next day (optimized: only copy what changes)
-        # Store current solution in schedule temporarily
-        current_schedule = inputs["schedule"] + [solution]
-        
-        # Create minimal new_input dict (avoid deep copy of entire structure)
-        new_input = {
-            "shift_day": [val + 1 for val in inputs["shift_day"]],  # Increment day counter
-            "work_pattern": inputs["work_pattern"],  # Reference (immutable in practice)
-            "previous_day": solution,  # Current day's solution becomes previous
-            "quality_count": quality_count,  # Updated quality counts
-            "schedule": current_schedule,  # Current schedule state
-            "employee_leaves": inputs.get("employee_leaves", []),  # Pass leave information
-            "shift_preferences": inputs.get("shift_preferences", []),  # Pass shift preferences
-            "shift_exclusions": inputs.get("shift_exclusions", [])  # Pass shift exclusions
-        }
-        
-        # Recursively solve remaining days
-        added_schedule, final_quality_count = simulate_roaster(
-            day_no + 1, total_no_days, config, new_input, constraints
-        )
-        
-        if added_schedule is not None:
-            # Success! Return the complete schedule
-            return added_schedule, final_quality_count
-        # else: backtrack and try next solution
-    
-    # Exhausted all solution attempts for this day
-    return None, None
\ No newline at end of file
+        # Found a solution: commit it and move on to the next day
+        roster[day % window] = solution
+        undo_logs[day] = apply_quality_count(config, quality_count, solution)
+        _advance_shift_day(day_inputs["shift_day"], 1)
+        if telemetry is not None:
+            telemetry.emit("commit", day=day, attempts=len(solutions), day_attempts=stats["day_attempts"][day - day_no])
+        day += 1
+        
+        while commit_depth is not None and floor < day - commit_depth:
+            # Out of backtracking reach: the day is final
+            yield floor, roster[floor % window].tolist()
+            solutions_stack.pop(0)
+            undo_logs.pop(floor)
+            nogoods.pop(floor, None)
+            pools.pop(floor, None)
+            floor += 1
+    
+    for committed_day in range(floor, total_no_days):
+        yield committed_day, roster[committed_day % window].tolist()
+    return quality_count
+
+
+def _explore_subtree(day_no, total_no_days, config, inputs, constraints, budget):
+    """Runs simulate_roaster from day_no in a worker process, with its progress output silenced."""
+    stats = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = simulate_roaster(day_no, total_no_days, config, inputs, constraints, stats, budget)
+    return result, stats
+
+
+def _explore_subtrees(day, total_no_days, config, constraints, subtree_inputs, workers, stats, stats_day_no, budget):
+    """
+    Searches from day after each candidate of the previous day in a process pool.
+    
+    Results are read in candidate order, so the first candidate that completes
+    the roster wins even if a later one finishes first; leaving the pool
+    terminates the subtrees still running. Counters of every finished subtree
+    are added to stats.
+    
+    Returns:
+        (schedule, quality_count) of the winning subtree, or None if all failed
+    """
+    if not subtree_inputs:
+        return None
+    # Subtrees search sequentially, so workers stay capped, and leave the checkpoint to the parent
+    subtree_config = dict(config, speculative_workers=0, checkpoint_file=None)
+    with multiprocessing.Pool(min(workers, len(subtree_inputs))) as pool:
+        jobs = [pool.apply_async(_explore_subtree, (day, total_no_days, subtree_config, inputs, constraints, budget))
+                for inputs in subtree_inputs]
+        for job in jobs:
+            (schedule, quality_count), subtree_stats = job.get()
+            for counter, value in subtree_stats.items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    stats[counter] += value
+            offset = day - stats_day_no
+            for per_day in ("day_seconds", "day_attempts", "day_backtracks"):
+                for row, value in enumerate(subtree_stats[per_day]):
+                    stats[per_day][offset + row] += value
+            stats["timed_out"] |= subtree_stats["timed_out"]
+            if schedule is not None:
+                stats["day_gap"][offset:] = subtree_stats["day_gap"]
+                return schedule, quality_count
+    return None
+
+
+def _record_solve(stats, row, info, telemetry=None, day_no=0, solve="day"):
+    """Adds a solve's time to its day, and its gap when it produced a solution; emits it as a "solve" event."""
+    stats["day_seconds"][row] += info["seconds"]
+    stats["timeouts"] += info["timed_out"]
+    if info["gap"] is not None:
+        stats["day_gap"][row] = info["gap"]
+    if telemetry is not None:
+        telemetry.emit("solve", day=day_no + row, solve=solve, **info)
+
+
+def _take_from_pool(pool, nogoods):
+    """Pops the next pooled solution that no nogood recorded since the pool was built rules out."""
+    while pool:
+        solution = pool.pop(0)
+        if not any(all(solution[i] == value for i, value in nogood.items()) for nogood in nogoods):
+            return solution
+    return None
+
+
+def _advance_shift_day(shift_day, step):
+    """Moves every employee's work pattern day counter by step, in place."""
+    for i in range(len(shift_day)):
+        shift_day[i] += step
+
+
+class FailedStates:
+    """
+    Bounded LRU memo of search states whose subtree ended without a roaster.
+    
+    A state is (day, previous_day): with the static availability (and shift_day,
+    which only depends on the day) it decides every hard constraint from that
+    day on. quality_count only steers which attempts the threshold budget
+    allows; with quality_tolerance set, a state only matches when every
+    quality_count entry is within the tolerance of the one it failed with.
+    """
+    
+    def __init__(self, max_size, quality_tolerance=None):
+        self.max_size = max_size
+        self.quality_tolerance = quality_tolerance
+        # (day, previous_day bytes) -> quality_count it failed with (None without a tolerance)
+        self.states = OrderedDict()
+    
+    def _key(self, day, previous_day):
+        return day, np.asarray(previous_day, dtype=np.int64).tobytes()
+    
+    def add(self, day, previous_day, quality_count):
+        key = self._key(day, previous_day)
+        self.states[key] = np.array(quality_count) if self.quality_tolerance is not None else None
+        self.states.move_to_end(key)
+        if len(self.states) > self.max_size:
+            self.states.popitem(last=False)
+    
+    def entries(self):
+        """Remembered states as [day, previous_day, quality_count or None], least recently used first."""
+        return [[day, np.frombuffer(previous_day, dtype=np.int64).tolist(), None if quality is None else quality.tolist()]
+                for (day, previous_day), quality in self.states.items()]
+    
+    def restore(self, entries):
+        """Replaces the remembered states with entries() of another memo."""
+        self.states.clear()
+        for day, previous_day, quality in entries:
+            self.states[self._key(day, previous_day)] = None if quality is None else np.array(quality)
+    
+    def contains(self, day, previous_day, quality_count):
+        key = self._key(day, previous_day)
+        if key not in self.states:
+            return False
+        failed_quality = self.states[key]
+        if failed_quality is not None and np.abs(np.array(quality_count) - failed_quality).max() > self.quality_tolerance:
+            return False
+        self.states.move_to_end(key)
+        return True
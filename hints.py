@@ -0,0 +1,74 @@
+"""
+Solution hints for the day models.
+Collects a starting point for each day from earlier attempts, earlier days and prior rosters.
+"""
+import csv
+
+
+HINT_SOURCES = ("attempt", "cycle", "roster")
+
+
+def day_hint(config, sources, day, schedule, attempts, prior_roster=None):
+    """
+    Builds the solution hint for day from the first source that covers each employee.
+
+    Sources, in the order given by config["solution_hints"]:
+    - "attempt": the day's previous attempt (the exclusion cut forces at least one change)
+    - "cycle": the roster config["hint_period"] days earlier (same weekday last week by default)
+    - "roster": the same day of a prior roster (see read_roster_csv), wrapping around it
+
+    Args:
+        schedule: Callable returning the committed solution of an earlier day, or None
+        attempts: Solutions already tried for day on the current visit
+        prior_roster: Day solutions of a prior roster, None for unknown employees
+
+    Returns:
+        One value per employee (None = no hint), or None if no source had anything
+    """
+    hint = None
+    for source in sources:
+        if source == "attempt":
+            candidate = attempts[-1] if attempts else None
+        elif source == "cycle":
+            candidate = schedule(day - config.get("hint_period", 7))
+        elif source == "roster":
+            candidate = prior_roster[day % len(prior_roster)] if prior_roster else None
+        else:
+            raise ValueError(f"Unknown solution hint source '{source}'. Valid sources: {list(HINT_SOURCES)}")
+        if candidate is None:
+            continue
+        if hint is None:
+            hint = [None] * config["no_employees"]
+        hint = [value if value is not None else (None if other is None else int(other)) for value, other in zip(hint, candidate)]
+    return hint
+
+
+def read_roster_csv(path, employees):
+    """
+    Reads a roster.csv written by Roster.to_csv as hints for employees.
+
+    Rows are matched by "Employee id". The first date column holds the shifts
+    worked before that roster started, so it is skipped. Streamed rosters
+    (see writers.RosterCsvWriter) have one row per day instead, starting
+    with the same day before the roster.
+
+    Returns:
+        List of day solutions, one value per employee; None for employees not in the file
+    """
+    def value(cell):
+        return 0 if cell == "Off" else int(cell.split()[-1])  # "Shift k" or "Off"
+
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames[0] == "Date":
+            return [
+                [value(row[employee["employee_id"]]) if employee["employee_id"] in row else None for employee in employees]
+                for row in list(reader)[1:]
+            ]
+        date_columns = [column for column in reader.fieldnames if column not in ("Employee id", "Employee name", "Work Pattern")][1:]
+        rows = {row["Employee id"]: row for row in reader}
+
+    return [
+        [value(rows[employee["employee_id"]][column]) if employee["employee_id"] in rows else None for employee in employees]
+        for column in date_columns
+    ]
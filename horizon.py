@@ -0,0 +1,324 @@
+"""
+Whole-horizon roaster model.
+Builds a single CP-SAT model covering every day instead of solving day by day.
+"""
+import math
+
+from ortools.sat.python import cp_model
+
+from availability import Availability, availability_for
+from budget import TimeBudget
+from csp import update_quality_count, configure_solver
+
+
+def create_horizon_schedule(no_days, config, inputs, constraints, budget=None):
+    """
+    Creates a full roaster for no_days days with one constraint programming model.
+
+    Encodes the same hard constraints as create_day_schedule (work pattern off days,
+    leaves, shift preferences/exclusions, per-shift min/max counts) for every day,
+    plus the forbidden shift transitions between consecutive days.
+
+    The fairness objective spreads the day model's cost over the whole period:
+    the k-th time employee i works shift s costs quality_count[i][s] + k, so
+    working a shift n times costs n * quality_count[i][s] + n * (n + 1) / 2.
+
+    With a TimeBudget (by default config["time_budget"]), the solve is also
+    capped at the time left, and the best roster found by then is returned.
+
+    Returns:
+        (schedule, quality_count) where schedule is a list of day solutions and
+        quality_count is replayed day by day exactly as simulate_roaster would,
+        or (None, None) if no roaster was found within horizon_time_limit
+    """
+    if len(inputs["quality_count"]) != config["no_employees"]:
+        raise ValueError(f"quality_count length ({len(inputs['quality_count'])}) doesn't match number of employees ({config['no_employees']})")
+
+    if budget is None:
+        budget = TimeBudget.from_config(config)
+    time_limit = config.get("horizon_time_limit", 120.0)
+    if budget is not None:
+        time_limit = min(time_limit, budget.remaining())
+    availability = availability_for(config, inputs, no_days)
+    # A single worker rarely finds a first roster on this model; the LNS and
+    # feasibility-jump workers of a parallel portfolio do
+    schedule = solve_horizon_window(config, constraints, availability, 0, no_days, inputs["previous_day"], inputs["quality_count"],
+                                    time_limit, config.get("horizon_search_workers", 8))
+    if schedule is None:
+        return None, None
+
+    quality_count = inputs["quality_count"]
+    for solution in schedule:
+        quality_count = update_quality_count(config, quality_count, solution)
+    return schedule, quality_count
+
+
+def create_rolling_schedule(no_days, config, inputs, constraints, budget=None):
+    """
+    Creates a roaster by solving overlapping windows of the horizon model.
+
+    Each window covers config["rolling_window"] (W) days starting after the last
+    committed day; its first config["rolling_commit"] (K) days are committed and
+    the window slides forward, carrying previous_day and quality_count (shift_day
+    is covered by the shared availability). When a window has no solution, the
+    last committed days are reopened and solved together with it: the overlap
+    grows by K days per retry, up to config["rolling_max_retries"] retries.
+
+    Windows are small enough for a single worker with automatic search
+    (config["rolling_search_workers"], config["rolling_search_branching"]),
+    which keeps the time per window, and so the total, linear in the horizon.
+    With a TimeBudget (by default config["time_budget"]), each window solve is
+    also capped at the time left. Windows are not given an even share like the
+    days of simulate_roaster: their solve times vary too much, and a window
+    cut off before its first solution is treated as infeasible.
+
+    Returns:
+        (schedule, quality_count) like create_horizon_schedule, or (None, None)
+    """
+    if len(inputs["quality_count"]) != config["no_employees"]:
+        raise ValueError(f"quality_count length ({len(inputs['quality_count'])}) doesn't match number of employees ({config['no_employees']})")
+
+    window = max(1, config.get("rolling_window", 7))
+    commit = min(window, max(1, config.get("rolling_commit", 5)))
+    max_retries = config.get("rolling_max_retries", 3)
+    time_limit = config.get("rolling_time_limit", 30.0)
+    num_workers = config.get("rolling_search_workers", 1)
+    search_branching = config.get("rolling_search_branching", "automatic")
+    availability = availability_for(config, inputs, no_days)
+    if budget is None:
+        budget = TimeBudget.from_config(config)
+
+    schedule = []
+    # quality_counts[d] = quality_count before day d
+    quality_counts = [inputs["quality_count"]]
+    while len(schedule) < no_days:
+        first_day = len(schedule)
+        for retry in range(max_retries + 1):
+            # Reopen retry * K committed days in front of the window
+            reopened = min(retry * commit, first_day)
+            start = first_day - reopened
+            length = min(window + reopened, no_days - start)
+            previous_day = schedule[start - 1] if start > 0 else inputs["previous_day"]
+            window_time_limit, first_solution = time_limit, False
+            if budget is not None:
+                if budget.expired():
+                    return None, None
+                window_time_limit, first_solution = budget.limits(time_limit, 1)
+            solutions = solve_horizon_window(config, constraints, availability, start, length, previous_day,
+                                             quality_counts[start], window_time_limit, num_workers, search_branching,
+                                             first_solution)
+            if solutions is not None:
+                break
+            if start == 0:
+                return None, None  # Nothing left to reopen
+        else:
+            return None, None
+
+        # Commit through K days past the old frontier (everything on the last window)
+        committed = length if start + length == no_days else reopened + commit
+        del schedule[start:]
+        del quality_counts[start + 1:]
+        for solution in solutions[:committed]:
+            schedule.append(solution)
+            quality_counts.append(update_quality_count(config, quality_counts[-1], solution))
+
+    return schedule, quality_counts[-1]
+
+
+def cyclic_period(config, inputs, no_days):
+    """
+    Returns the period of a cyclic roster for no_days days, or None if one does not fit.
+
+    Shift demand is the same every day, so without leaves every constraint repeats
+    with the least common multiple of the work patterns in use. A cyclic roster
+    needs that period to be shorter than the horizon and at most
+    config["cyclic_max_period"] days, and leaves to cover at most
+    config["cyclic_max_leave_ratio"] of all employee days (each one is patched).
+    """
+    patterns = {config["work_pattern"][pattern_id]["total_days"] for pattern_id in inputs["work_pattern"]}
+    period = math.lcm(*patterns) if patterns else 1
+    if period >= no_days or period > config.get("cyclic_max_period", 63):
+        return None
+    leave_days = sum(1 for leaves in inputs.get("employee_leaves", []) for day in leaves if 0 <= day < no_days)
+    if leave_days > config.get("cyclic_max_leave_ratio", 0.05) * no_days * config["no_employees"]:
+        return None
+    return period
+
+
+def create_cyclic_schedule(no_days, config, inputs, constraints, budget=None):
+    """
+    Creates a roaster by solving one cycle of the work patterns and repeating it.
+
+    The cycle (see cyclic_period) is a horizon model without leaves whose last day
+    wraps to its first under config["forbidden_constraints"], so copies of it can
+    follow each other and previous_day. Days with leaves are then patched: each
+    run of them is re-solved with the roster around it fixed, widened by
+    config["cyclic_patch_margin"] days on both sides per retry (up to
+    config["rolling_max_retries"] retries), with the rolling window settings.
+    The cycle is solved within config["cyclic_time_limit"] (its best roster by
+    then is kept) with the horizon workers; a TimeBudget caps every solve, as
+    in create_horizon_schedule.
+
+    Returns:
+        (schedule, quality_count) like create_horizon_schedule, or (None, None)
+        if there is no cyclic roster (including when cyclic_period is None)
+    """
+    if len(inputs["quality_count"]) != config["no_employees"]:
+        raise ValueError(f"quality_count length ({len(inputs['quality_count'])}) doesn't match number of employees ({config['no_employees']})")
+
+    period = cyclic_period(config, inputs, no_days)
+    if period is None:
+        return None, None
+    if budget is None:
+        budget = TimeBudget.from_config(config)
+
+    def time_limit(limit):
+        return limit if budget is None else min(limit, budget.remaining())
+
+    cycle_availability = Availability(config, dict(inputs, employee_leaves=[]), period)
+    cycle = solve_horizon_window(config, constraints, cycle_availability, 0, period, inputs["previous_day"], inputs["quality_count"],
+                                 time_limit(config.get("cyclic_time_limit", 60.0)), config.get("horizon_search_workers", 8),
+                                 cyclic=True)
+    if cycle is None:
+        return None, None
+    schedule = [list(cycle[day % period]) for day in range(no_days)]
+
+    # Patch each run of days where a tiled employee works through a leave
+    availability = availability_for(config, inputs, no_days)
+    patched_days = [day for day in range(no_days) if any(
+        availability.on_leave[day, i] and schedule[day][i] != 0 for i in range(config["no_employees"]))]
+    margin = max(1, config.get("cyclic_patch_margin", 2))
+    runs = []
+    for day in patched_days:
+        if runs and day <= runs[-1][1] + 1:
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+
+    for first, last in runs:
+        for retry in range(config.get("rolling_max_retries", 3) + 1):
+            start = max(0, first - retry * margin)
+            end = min(no_days - 1, last + retry * margin)
+            quality_count = inputs["quality_count"]
+            for solution in schedule[:start]:
+                quality_count = update_quality_count(config, quality_count, solution)
+            solutions = solve_horizon_window(
+                config, constraints, availability, start, end - start + 1,
+                schedule[start - 1] if start > 0 else inputs["previous_day"], quality_count,
+                time_limit(config.get("rolling_time_limit", 30.0)), config.get("rolling_search_workers", 1),
+                config.get("rolling_search_branching", "automatic"),
+                next_day=schedule[end + 1] if end + 1 < no_days else None)
+            if solutions is not None:
+                schedule[start:end + 1] = solutions
+                break
+        else:
+            return None, None
+
+    quality_count = inputs["quality_count"]
+    for solution in schedule:
+        quality_count = update_quality_count(config, quality_count, solution)
+    return schedule, quality_count
+
+
+def solve_horizon_window(config, constraints, availability, first_day, no_days, previous_day, quality_count,
+                         time_limit, num_workers, search_branching=None, first_solution=False, next_day=None, cyclic=False):
+    """
+    Solves days first_day .. first_day + no_days - 1 with one model.
+
+    Args:
+        availability: Availability covering the window
+        previous_day: Shifts worked the day before first_day
+        quality_count: quality_count before first_day
+        next_day: Shifts already fixed for the day after the window, if any
+        cyclic: The window repeats, so its first day also follows its last day
+
+    Returns:
+        List of day solutions, or None if none was found within time_limit
+    """
+    no_employees = config["no_employees"]
+    no_shifts = config["no_shifts"]
+
+    model = cp_model.CpModel()
+
+    # x[day][i][value] = 1 if employee i takes value (0 = off) on first_day + day
+    x = []
+    for day in range(no_days):
+        # Transitions from the last shift before the window are known up front
+        domains = availability.day_domains(first_day + day, previous_day if day == 0 else None)
+        if next_day is not None and day == no_days - 1:
+            # Transitions into the fixed day after the window are known up front too
+            domains = [[value for value in domain if not availability.blocked[value, next_day[i]]]
+                       for i, domain in enumerate(domains)]
+        day_vars = []
+        for i in range(no_employees):
+            employee_vars = {value: model.NewBoolVar(f'x_{day}_{i}_{value}') for value in domains[i]}
+            model.AddExactlyOne(employee_vars.values())
+            day_vars.append(employee_vars)
+        x.append(day_vars)
+
+    if config.get("horizon_symmetry_breaking", False):
+        # Employees with the same domains on every day of the window, the same previous
+        # shift, the same fixed next-day shift and the same quality_count row can swap
+        # whole rows, so order each such group by its first-day value
+        identical = {}
+        rows = slice(first_day - availability.first_day, first_day - availability.first_day + no_days)
+        for i in range(no_employees):
+            key = (availability.allowed[rows, i].tobytes(), int(previous_day[i]), tuple(quality_count[i]),
+                   int(next_day[i]) if next_day is not None else None)
+            identical.setdefault(key, []).append(i)
+        for members in identical.values():
+            for i, j in zip(members, members[1:]):
+                model.Add(sum(value * var for value, var in x[0][i].items()) <= sum(value * var for value, var in x[0][j].items()))
+
+    # Per-shift min/max counts on every day
+    for day in range(no_days):
+        for value in range(1, no_shifts + 1):
+            assigned = [x[day][i][value] for i in range(no_employees) if value in x[day][i]]
+            model.Add(sum(assigned) >= constraints["min_count"][value])
+            model.Add(sum(assigned) <= constraints["max_count"][value])
+
+    # Hard forbidden constraints between consecutive days (the last day wraps to the first when cyclic)
+    for day in range(0 if cyclic else 1, no_days):
+        for k_val, forbidden_val in config["forbidden_constraints"]:
+            for i in range(no_employees):
+                if k_val in x[day - 1][i] and forbidden_val in x[day][i]:
+                    model.AddBoolOr([x[day - 1][i][k_val].Not(), x[day][i][forbidden_val].Not()])
+
+    # Fairness: the k-th time employee i works shift s costs quality_count[i][s] + k.
+    # The cost is convex in k, so the steps taken are always a prefix and can be ordered.
+    total_quality = 0
+    for i in range(no_employees):
+        if len(quality_count[i]) != no_shifts:
+            raise ValueError(f"Employee {i} quality_count length ({len(quality_count[i])}) doesn't match number of shifts ({no_shifts})")
+
+        for shift in range(no_shifts):
+            worked = [x[day][i][shift + 1] for day in range(no_days) if shift + 1 in x[day][i]]
+            if not worked:
+                continue
+            steps = [model.NewBoolVar(f'step_{i}_{shift}_{k}') for k in range(len(worked))]
+            model.Add(sum(steps) == sum(worked))
+            for k in range(1, len(steps)):
+                model.AddImplication(steps[k], steps[k - 1])
+            total_quality += sum((quality_count[i][shift] + k + 1) * step for k, step in enumerate(steps))
+
+    model.Minimize(total_quality)
+
+    # Build day by day, cheapest shift first, like the day-by-day solver would
+    decision_vars = []
+    for day in range(no_days):
+        for i in range(no_employees):
+            decision_vars.extend(var for value, var in sorted(
+                x[day][i].items(), key=lambda item: (item[0] == 0, quality_count[i][item[0] - 1] if item[0] else 0)))
+    model.AddDecisionStrategy(decision_vars, cp_model.CHOOSE_FIRST, cp_model.SELECT_MAX_VALUE)
+
+    solver = cp_model.CpSolver()
+    configure_solver(solver, config, time_limit, num_workers, search_branching, first_solution)
+    status = solver.Solve(model)
+
+    if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+        return None
+
+    return [
+        [next(value for value, var in x[day][i].items() if solver.BooleanValue(var)) for i in range(no_employees)]
+        for day in range(no_days)
+    ]
@@ -0,0 +1,425 @@
+"""
+Roster pipeline.
+Validates, checks and solves one Problem; the library API behind process_request.py.
+
+    from config import load_problem
+    from pipeline import solve
+
+    problem = load_problem("config.json")
+    roster = solve(problem, {"roster_mode": "horizon"})
+    if roster.status == "solved":
+        roster.to_csv("roaster.csv")
+"""
+import copy
+import datetime
+import time
+
+from feasibility_checker import check_feasibility
+from availability import Availability
+from budget import TimeBudget
+from hints import read_roster_csv
+from telemetry import Telemetry
+
+# ortools (through the solvers and the diagnosis), pandas and openpyxl are imported by the
+# code paths that use them, so importing this module (and starting process_request.py) stays cheap
+
+
+def validate_inputs(config, inputs, constraints):
+    """Validate that all required inputs are present and correctly formatted."""
+    errors = []
+    
+    # Check required config keys
+    required_config = ["no_employees", "no_shifts", "work_pattern", "forbidden_constraints"]
+    for key in required_config:
+        if key not in config:
+            errors.append(f"Missing config key: {key}")
+    
+    # Check required input keys
+    required_inputs = ["shift_day", "work_pattern", "previous_day", "quality_count"]
+    for key in required_inputs:
+        if key not in inputs:
+            errors.append(f"Missing input key: {key}")
+    
+    # Validate array lengths
+    if "no_employees" in config:
+        n_emp = config["no_employees"]
+        for key in ["shift_day", "work_pattern", "previous_day", "quality_count"]:
+            if key in inputs and len(inputs[key]) != n_emp:
+                errors.append(f"Input '{key}' length ({len(inputs[key])}) doesn't match number of employees ({n_emp})")
+        
+        # Validate employee_leaves if present
+        if "employee_leaves" in inputs:
+            if len(inputs["employee_leaves"]) != n_emp:
+                errors.append(f"Input 'employee_leaves' length ({len(inputs['employee_leaves'])}) doesn't match number of employees ({n_emp})")
+            else:
+                # Validate each leave set
+                for i, leave_set in enumerate(inputs["employee_leaves"]):
+                    if not isinstance(leave_set, set):
+                        errors.append(f"Employee {i}: employee_leaves[{i}] must be a set")
+                    else:
+                        # Check that all leave day indices are valid (non-negative integers)
+                        for day_idx in leave_set:
+                            if not isinstance(day_idx, int) or day_idx < 0:
+                                errors.append(f"Employee {i}: employee_leaves[{i}] contains invalid day index: {day_idx}")
+        
+        # Validate shift_preferences if present
+        if "shift_preferences" in inputs:
+            if len(inputs["shift_preferences"]) != n_emp:
+                errors.append(f"Input 'shift_preferences' length ({len(inputs['shift_preferences'])}) doesn't match number of employees ({n_emp})")
+            else:
+                # Validate each preference set
+                valid_shift_ids = set(range(1, config.get("no_shifts", 0) + 1))
+                for i, pref_set in enumerate(inputs["shift_preferences"]):
+                    if not isinstance(pref_set, set):
+                        errors.append(f"Employee {i}: shift_preferences[{i}] must be a set")
+                    else:
+                        # Check that all shift IDs are valid
+                        for shift_id in pref_set:
+                            if not isinstance(shift_id, int):
+                                errors.append(f"Employee {i}: shift_preferences[{i}] contains non-integer: {shift_id}")
+                            elif shift_id not in valid_shift_ids and shift_id != 0:
+                                errors.append(f"Employee {i}: shift_preferences[{i}] contains invalid shift ID: {shift_id}. Valid IDs: {valid_shift_ids}")
+        
+        # Validate shift_exclusions if present
+        if "shift_exclusions" in inputs:
+            if len(inputs["shift_exclusions"]) != n_emp:
+                errors.append(f"Input 'shift_exclusions' length ({len(inputs['shift_exclusions'])}) doesn't match number of employees ({n_emp})")
+            else:
+                # Validate each exclusion set
+                valid_shift_ids = set(range(1, config.get("no_shifts", 0) + 1))
+                for i, excl_set in enumerate(inputs["shift_exclusions"]):
+                    if not isinstance(excl_set, set):
+                        errors.append(f"Employee {i}: shift_exclusions[{i}] must be a set")
+                    else:
+                        # Check that all shift IDs are valid
+                        for shift_id in excl_set:
+                            if not isinstance(shift_id, int):
+                                errors.append(f"Employee {i}: shift_exclusions[{i}] contains non-integer: {shift_id}")
+                            elif shift_id not in valid_shift_ids:
+                                errors.append(f"Employee {i}: shift_exclusions[{i}] contains invalid shift ID: {shift_id}. Valid IDs: {valid_shift_ids}")
+                        
+                        # Check for conflicts with preferences
+                        if "shift_preferences" in inputs and i < len(inputs["shift_preferences"]):
+                            pref_set = inputs["shift_preferences"][i]
+                            conflicting_shifts = excl_set & pref_set
+                            if conflicting_shifts:
+                                errors.append(
+                                    f"Employee {i}: shift_exclusions[{i}] and shift_preferences[{i}] cannot overlap. "
+                                    f"Conflicting shifts: {sorted(conflicting_shifts)}"
+                                )
+        
+        # Validate quality_count structure
+        if "quality_count" in inputs:
+            for i, qc in enumerate(inputs["quality_count"]):
+                if "no_shifts" in config and len(qc) != config["no_shifts"]:
+                    errors.append(f"Employee {i} quality_count length ({len(qc)}) doesn't match number of shifts ({config['no_shifts']})")
+    
+    # Validate constraints
+    if "min_count" in constraints and "max_count" in constraints:
+        for shift_id in range(1, config.get("no_shifts", 0) + 1):
+            if shift_id in constraints["min_count"] and shift_id in constraints["max_count"]:
+                if constraints["min_count"][shift_id] > constraints["max_count"][shift_id]:
+                    errors.append(f"Shift {shift_id}: min_count ({constraints['min_count'][shift_id]}) > max_count ({constraints['max_count'][shift_id]})")
+    
+    if errors:
+        raise ValueError("Input validation failed:\n" + "\n".join(f"  - {e}" for e in errors))
+    
+    return True
+
+
+def is_streaming(config):
+    """Whether the daily search hands each day over as soon as it is final (config["commit_depth"])."""
+    return config.get("roster_mode", "daily") == "daily" and config.get("commit_depth") is not None
+
+
+class Roster:
+    """
+    Result of solve for one Problem.
+
+    Attributes:
+        status: "solved", "timeout" (no complete roster within config["time_budget"]) or "failed"
+        days: One list of shift values per day (0 = off), the previous day first if the
+              problem has one; empty when the days went to solve's on_day instead
+        dates: datetime of each row of days
+        quality_count: Final quality_count, None unless solved
+        solve_stats: Daily search statistics (see iter_roaster), empty in other modes
+        solve_seconds: Time spent in the roster search
+        streamed_days: Days handed to on_day, the previous day excluded
+        feasibility_messages: Warnings of check_feasibility
+        diagnosis: Result of diagnose_infeasibility for a failed run with config["diagnose"], otherwise None
+    """
+
+    def __init__(self, problem, status, days, quality_count, solve_stats, solve_seconds, streamed_days,
+                 feasibility_messages, diagnosis=None):
+        self.problem = problem
+        self.status = status
+        self.days = days
+        self.dates = [problem.start_date + datetime.timedelta(days=i) for i in range(len(days))]
+        self.quality_count = quality_count
+        self.solve_stats = solve_stats
+        self.solve_seconds = solve_seconds
+        self.streamed_days = streamed_days
+        self.feasibility_messages = feasibility_messages
+        self.diagnosis = diagnosis
+
+    def _columns(self):
+        """(data, data_columns): one column of shift labels per date, plus the employee columns."""
+        employees = self.problem.employees
+        data = {}
+        for date, day in zip(self.dates, self.days):
+            data[date.strftime("%Y-%m-%d")] = [f"Shift {val}" if val != 0 else "Off" for val in day]
+
+        data["Employee name"] = [employees[j]["name"] for j in range(0, len(self.days[0]))]
+        data["Employee id"] = [employees[j]["employee_id"] for j in range(0, len(self.days[0]))]
+        data["Work Pattern"] = [employees[j]["preferred_work_pattern"] for j in range(0, len(self.days[0]))]
+        return data, [date.strftime("%Y-%m-%d") for date in self.dates]
+
+    def to_csv(self, path):
+        """Writes the roster with one row per employee and one column per date."""
+        import pandas as pd
+
+        data, data_columns = self._columns()
+        columns = ["Employee id", "Employee name", "Work Pattern"] + data_columns
+        df = pd.DataFrame(data, columns=columns)
+        df.to_csv(path, index=False)
+
+    def to_xlsx(self, path):
+        """Writes the roster as to_csv does, with the problem's shift colours."""
+        from openpyxl import Workbook
+        from openpyxl.styles import PatternFill
+
+        shift_colours = self.problem.shift_colours
+        data, data_columns = self._columns()
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Roaster"
+
+        # Move "Employee name" to the last column
+        columns = [col for col in data_columns] + ["Employee id", "Employee name", "Work Pattern"]
+
+        for col_num, column_title in enumerate(columns, start=1):
+            ws.cell(row=1, column=col_num, value=column_title)
+
+        for row_num, employee_data in enumerate(zip(*[data[col] for col in columns]), start=2):
+            for col_num, cell_value in enumerate(employee_data, start=1):
+                ws.cell(row=row_num, column=col_num, value=cell_value)
+
+        employee_name_color = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")
+        value_colors = {}
+
+        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=1, max_col=ws.max_column):
+            for cell in row:
+                if cell.column >= ws.max_column-3:  # Last column (Employee name)
+                    cell.fill = employee_name_color
+                else:
+                    value_colors[cell.value] = PatternFill(start_color=shift_colours[cell.value],
+                        end_color=shift_colours[cell.value],
+                        fill_type="solid")
+                    cell.fill = value_colors[cell.value]
+
+        # Move "Employee name" to the first column
+        columns = ["Employee id", "Employee name", "Work Pattern"] + data_columns
+
+        for col_num, column_title in enumerate(columns, start=1):
+            ws.cell(row=1, column=col_num, value=column_title)
+
+        for row_num, employee_data in enumerate(zip(*[data[col] for col in columns]), start=2):
+            for col_num, cell_value in enumerate(employee_data, start=1):
+                cell = ws.cell(row=row_num, column=col_num, value=cell_value)
+                if col_num <= 3:  # First column (Employee name)
+                    cell.fill = employee_name_color
+                else:
+                    cell.fill = value_colors.get(cell_value, PatternFill(fill_type=None))
+        wb.save(path)
+
+
+def solve(problem, options=None, resume=False, on_day=None, telemetry=None):
+    """
+    Validates, checks and solves problem.
+
+    Works on copies of the problem's config, inputs and constraints, so a
+    Problem can be solved any number of times in one process.
+
+    Args:
+        options: config.json settings to override for this solve, e.g. {"roster_mode": "horizon"}
+        resume: Continue the daily search from config["checkpoint_file"]
+        on_day: With a commit depth, on_day(date, solution) receives each day as soon as it
+                is final (the previous day first) and Roster.days stays empty; without one,
+                committed days are collected into Roster.days
+        telemetry: Telemetry to emit to; by default one is started from the config
+                   (config["telemetry_file"], config["profile"]) and closed on return
+
+    Returns:
+        Roster
+
+    Raises:
+        ValueError: The inputs fail validation, the problem is infeasible, or the options conflict
+    """
+    config = copy.deepcopy(problem.config)
+    config.update(options or {})
+    inputs = copy.deepcopy(problem.inputs)
+    constraints = copy.deepcopy(problem.constraints)
+    no_days = problem.no_days
+
+    # --resume continues the daily search from config["checkpoint_file"]
+    if resume and not config.get("checkpoint_file"):
+        raise ValueError("--resume needs 'checkpoint_file' in config.json")
+
+    # Run-level deadline (config["time_budget"]), covering validation and feasibility too
+    budget = TimeBudget.from_config(config)
+
+    # Structured events (config["telemetry_file"]) and profiling (config["profile"]); None when both are off
+    own_telemetry = telemetry is None
+    if own_telemetry:
+        telemetry = Telemetry.from_config(config)
+        if telemetry is not None:
+            telemetry.start_profile(config.get("profile"), config.get("profile_file"))
+    if telemetry is not None:
+        telemetry.emit("phase", phase="config", seconds=problem.load_seconds)
+    try:
+        return _solve(problem, config, inputs, constraints, no_days, budget, resume, on_day, telemetry)
+    finally:
+        if own_telemetry and telemetry is not None:
+            telemetry.stop_profile()
+            telemetry.close()
+
+
+def _solve(problem, config, inputs, constraints, no_days, budget, resume, on_day, telemetry):
+    start_date = problem.start_date
+
+    # Initialize schedule
+    inputs["schedule"] = []
+
+    # Prior roster to take solution hints from (config["solution_hints"] "roster")
+    if config.get("hint_roster_file"):
+        inputs["hint_roster"] = read_roster_csv(config["hint_roster_file"], problem.employees)
+
+    # Validate inputs
+    print("Validating inputs...")
+    try:
+        validate_inputs(config, inputs, constraints)
+        print("✓ Input validation passed")
+    except ValueError as e:
+        print(f"✗ Validation error: {e}")
+        raise
+
+    if telemetry is not None:
+        telemetry.lap("validation")
+
+    # Compile availability once; shared by the feasibility checker and the day models
+    inputs["availability"] = Availability(config, inputs, no_days)
+
+    # Check feasibility
+    print("\nChecking feasibility...")
+    is_feasible, feasibility_messages = check_feasibility(config, inputs, constraints, no_days)
+
+    if feasibility_messages:
+        print("\nFeasibility Check Results:")
+        for msg in feasibility_messages:
+            if msg.startswith("INFEASIBLE"):
+                print(f"  ✗ {msg}")
+            else:
+                print(f"  ⚠ {msg}")
+
+        if not is_feasible:
+            print("\n✗ Problem is INFEASIBLE. Please adjust constraints, leaves, or work patterns.")
+            raise ValueError("Problem is infeasible - see feasibility check results above")
+        else:
+            print("\n⚠ Warnings detected but problem may still be solvable.")
+
+    if telemetry is not None:
+        telemetry.lap("feasibility")
+
+    print("\nStarting simulation...")
+    print(f"Days to schedule: {no_days}")
+    print(f"Employees: {config['no_employees']}")
+    print(f"Shifts: {config['no_shifts']}")
+    print(f"Date range: {start_date.strftime('%Y-%m-%d')} to {problem.end_date.strftime('%Y-%m-%d')}")
+
+    print(f"Roster mode: {config.get('roster_mode', 'daily')}")
+    if budget is not None:
+        print(f"Time budget: {budget.seconds}s ({budget.remaining():.1f}s left)")
+
+    if config.get("roster_mode", "daily") == "cyclic":
+        from horizon import cyclic_period
+        period = cyclic_period(config, inputs, no_days)
+        if period is None:
+            print("Work patterns or leaves do not allow a cyclic roster, falling back to daily mode")
+            config["roster_mode"] = "daily"
+        else:
+            print(f"Cycle length: {period} days")
+
+    # With a commit depth, the daily search hands over each day as soon as it is final
+    streaming = is_streaming(config)
+    if streaming and config.get("checkpoint_file"):
+        raise ValueError("'commit_depth' cannot be combined with 'checkpoint_file'")
+
+    # Rows are dated from start_date: a previous day takes start_date itself
+    previous = [inputs["previous_day"]] if "previous_day" in inputs and inputs["previous_day"] else []
+    first_date = start_date + datetime.timedelta(days=len(previous))
+
+    solve_stats = {}
+    streamed_days = 0
+    solve_start = time.perf_counter()
+    if streaming:
+        from generate_roaster import iter_roaster
+        print(f"Commit depth: {config['commit_depth']} days")
+        days = iter_roaster(0, no_days, config, inputs, constraints, solve_stats, budget,
+                            commit_depth=config["commit_depth"], telemetry=telemetry)
+        final_solutions = []
+        if on_day is None:
+            on_day = lambda date, solution: final_solutions.append(solution)
+        elif previous:
+            on_day(start_date, previous[0])
+            previous = []  # Handed to on_day like every other day
+        while True:
+            try:
+                day, solution = next(days)
+            except StopIteration as done:
+                final_quality_count = done.value
+                break
+            on_day(first_date + datetime.timedelta(days=day), solution)
+            streamed_days += 1
+        if final_quality_count is None:
+            final_solutions = None
+    elif config.get("roster_mode", "daily") == "horizon":
+        from horizon import create_horizon_schedule
+        final_solutions, final_quality_count = create_horizon_schedule(no_days, config, inputs, constraints, budget)
+    elif config.get("roster_mode", "daily") == "rolling":
+        from horizon import create_rolling_schedule
+        final_solutions, final_quality_count = create_rolling_schedule(no_days, config, inputs, constraints, budget)
+    elif config.get("roster_mode", "daily") == "cyclic":
+        from horizon import create_cyclic_schedule
+        final_solutions, final_quality_count = create_cyclic_schedule(no_days, config, inputs, constraints, budget)
+    else:
+        from generate_roaster import simulate_roaster
+        final_solutions, final_quality_count = simulate_roaster(0, no_days, config, inputs, constraints, solve_stats, budget, resume,
+                                                                telemetry)
+    if config.get("roster_mode", "daily") == "daily":
+        if final_solutions is not None:
+            print(f"\nSolver time: {sum(solve_stats['day_seconds']):.2f}s, "
+                  f"largest day gap: {max(solve_stats['day_gap'], default=0.0):.2%}")
+
+    solve_seconds = time.perf_counter() - solve_start
+    if telemetry is not None:
+        telemetry.lap("solve")  # Includes handing days to on_day when streaming
+
+    if final_solutions is not None:
+        return Roster(problem, "solved", previous + final_solutions, final_quality_count,
+                      solve_stats, solve_seconds, streamed_days, feasibility_messages)
+    if budget is not None and (budget.expired() or solve_stats.get("timed_out")):
+        return Roster(problem, "timeout", [], None, solve_stats, solve_seconds, streamed_days, feasibility_messages)
+
+    diagnosis = None
+    if config.get("diagnose", False):
+        # Never spends longer than the solve it explains
+        time_limit = solve_seconds
+        if config.get("diagnosis_time_limit") is not None:
+            time_limit = min(time_limit, config["diagnosis_time_limit"])
+        print(f"\nDiagnosing (up to {time_limit:.1f}s)...")
+        from diagnosis import diagnose_infeasibility
+        diagnosis = diagnose_infeasibility(config, inputs, constraints, no_days, time_limit, problem.employees, first_date)
+        diagnosis["time_limit"] = time_limit
+        if telemetry is not None:
+            telemetry.emit("diagnosis", **diagnosis)
+    return Roster(problem, "failed", [], None, solve_stats, solve_seconds, streamed_days, feasibility_messages, diagnosis)
@@ -0,0 +1,113 @@
+"""
+Structured run telemetry.
+Emits solver, search and phase events as JSON lines and/or to a hook, with optional cProfile/tracemalloc capture.
+"""
+import io
+import json
+import time
+
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+class Telemetry:
+    """
+    Sink for the structured events of one run.
+
+    Every event is a flat dict with "event" (its kind), "t" (seconds since the
+    telemetry started) and its own fields. Events are appended to a JSON lines
+    file and/or passed to hook, a callable taking the event dict. Code that
+    emits events takes telemetry=None and skips them when it is None, so a run
+    without telemetry pays nothing beyond that check.
+
+    Events:
+    - "phase": a stage of pipeline.solve ("config", "validation",
+      "feasibility", "solve") or process_request.py ("export") and its "seconds"
+    - "solve": one solver call of the daily search (see iter_roaster) with the
+      fields of solve_day's info: build and solve time, model size, status and
+      CP-SAT response stats
+    - "commit"/"backtrack": the daily search committing or leaving a day
+    - "search": the search counters once the daily search ends
+    - "profile": the top entries of a cProfile or tracemalloc capture
+    """
+
+    def __init__(self, path=None, hook=None):
+        self.file = open(path, "a") if path else None
+        self.hook = hook
+        self.start = self.lap_start = time.perf_counter()
+        self.profile_mode = None
+
+    @classmethod
+    def from_config(cls, config, hook=None):
+        """
+        Starts telemetry to config["telemetry_file"] and/or hook.
+
+        Returns None if neither is set and config["profile"] is off.
+        """
+        if not config.get("telemetry_file") and hook is None and config.get("profile") is None:
+            return None
+        return cls(config.get("telemetry_file"), hook)
+
+    def emit(self, event, **fields):
+        record = {"event": event, "t": round(time.perf_counter() - self.start, 6), **fields}
+        if self.file is not None:
+            self.file.write(json.dumps(record, default=str) + "\n")
+            self.file.flush()
+        if self.hook is not None:
+            self.hook(record)
+
+    def lap(self, name):
+        """Emits a "phase" event for the time since the previous lap (or since the telemetry started)."""
+        now = time.perf_counter()
+        self.emit("phase", phase=name, seconds=now - self.lap_start)
+        self.lap_start = now
+
+    def start_profile(self, mode, path=None):
+        """
+        Starts capturing a profile until stop_profile.
+
+        Args:
+            mode: "cprofile" (cumulative time per function) or "tracemalloc"
+                  (peak and largest allocation sites); None captures nothing
+            path: Optional file for the full capture (pstats dump or tracemalloc snapshot)
+        """
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}'. Valid modes: {list(PROFILE_MODES)}")
+        self.profile_mode, self.profile_path = mode, path
+        # Deferred: the profilers are only imported by runs that capture a profile
+        if mode == "cprofile":
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif mode == "tracemalloc":
+            import tracemalloc
+            tracemalloc.start()
+
+    def stop_profile(self, top=20):
+        """Stops the capture and emits its top entries as a "profile" event."""
+        if self.profile_mode == "cprofile":
+            import pstats
+            self.profiler.disable()
+            if self.profile_path:
+                self.profiler.dump_stats(self.profile_path)
+            stats = pstats.Stats(self.profiler, stream=io.StringIO())
+            entries = [{"function": f"{filename}:{line}({function})", "calls": calls, "seconds": cumulative}
+                       for (filename, line, function), (_, calls, _, cumulative, _) in
+                       sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]]
+            self.emit("profile", mode="cprofile", entries=entries)
+        elif self.profile_mode == "tracemalloc":
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if self.profile_path:
+                snapshot.dump(self.profile_path)
+            entries = [{"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                       for stat in snapshot.statistics("lineno")[:top]]
+            self.emit("profile", mode="tracemalloc", peak_bytes=peak, entries=entries)
+        self.profile_mode = None
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,64 @@
+import contextlib
+import io
+
+import pytest
+
+from benchmark import prepare, synthetic_json_config
+from budget import TimeBudget
+from generate_roaster import simulate_roaster
+
+
+class CheckBudget(TimeBudget):
+    """Budget that expires after a number of expired() checks, so a run stops at the same point every time."""
+
+    def __init__(self, checks):
+        super().__init__(3600.0)
+        self.checks = checks
+
+    def expired(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def run(no_days, config, inputs, constraints, budget=None, resume=False):
+    inputs = dict(inputs, schedule=[])
+    with contextlib.redirect_stdout(io.StringIO()):
+        return simulate_roaster(0, no_days, config, inputs, constraints, {}, budget, resume)
+
+
+def problem(tmp_path):
+    json_config = synthetic_json_config(20, 14, seed=1, leave_ratio=0.3)
+    return prepare(json_config, checkpoint_file=str(tmp_path / "checkpoint.npz"))
+
+
+@pytest.mark.parametrize("checks", [1, 5, 10])
+def test_resumed_run_matches_uninterrupted(tmp_path, checks):
+    """A run stopped by its budget and resumed from the checkpoint ends with the uninterrupted run's roster."""
+    no_days, config, inputs, constraints = problem(tmp_path)
+    schedule, quality_count = run(no_days, config, inputs, constraints)
+    assert schedule is not None
+
+    assert run(no_days, config, inputs, constraints, CheckBudget(checks)) == (None, None)
+    resumed, resumed_quality_count = run(no_days, config, inputs, constraints, resume=True)
+    assert [list(map(int, solution)) for solution in resumed] == [list(map(int, solution)) for solution in schedule]
+    assert [list(map(int, row)) for row in resumed_quality_count] == [list(map(int, row)) for row in quality_count]
+
+
+@pytest.mark.parametrize("edit", ["leave", "preference", "max_count", "forbidden", "day_encoding"])
+def test_checkpoint_of_edited_problem_is_rejected(tmp_path, edit):
+    """Resuming after the problem was edited raises ValueError instead of continuing the old search."""
+    no_days, config, inputs, constraints = problem(tmp_path)
+    assert run(no_days, config, inputs, constraints, CheckBudget(5)) == (None, None)
+
+    if edit == "leave":
+        inputs["employee_leaves"][0] = inputs["employee_leaves"][0] | {no_days - 1}
+    elif edit == "preference":
+        inputs["shift_preferences"][0] = {1}
+    elif edit == "max_count":
+        constraints["max_count"][1] += 1
+    elif edit == "forbidden":
+        config["forbidden_constraints"] = config["forbidden_constraints"][1:]
+    else:
+        config["day_encoding"] = "boolean"
+    with pytest.raises(ValueError):
+        run(no_days, config, inputs, constraints, resume=True)
@@ -0,0 +1,40 @@
+import pytest
+
+from benchmark import prepare, run_daily
+
+
+def two_day_json_config():
+    """Two employees alike on day 0; employee 1 is on leave on day 1."""
+    employees = [
+        {"employee_id": f"E{e}", "name": f"Employee {e + 1}", "preferred_work_pattern": 1,
+         "no_work_days_from_previous_pattern": 0, "no_off_days_from_previous_pattern": 0,
+         "last_shift": 2, "quality": [0, 0]}
+        for e in range(2)
+    ]
+    employees[1]["leaves"] = [{"start_date": "2025-01-07", "end_date": "2025-01-07"}]
+    return {
+        "start_date": "2025-01-06",
+        "end_date": "2025-01-07",
+        "no_work_pattern": 1,
+        "work_pattern": [{"pettern_id": 1, "no_working_days": 5, "no_off_days": 2}],
+        "no_of_shifts": 2,
+        "shifts": [
+            {"shift_id": 1, "start_time": "06:00:00", "end_time": "14:00:00",
+             "min_no_of_employees": 1, "max_no_of_employees": 1, "colour": "FFFFFF"},
+            {"shift_id": 2, "start_time": "14:00:00", "end_time": "22:00:00",
+             "min_no_of_employees": 0, "max_no_of_employees": 2, "colour": "FFFFFF"},
+        ],
+        "min_time_between_shifts": 0,
+        "no_of_employees": 2,
+        "employees": employees,
+    }
+
+
+@pytest.mark.parametrize("day_encoding", ["integer", "boolean", "classes"])
+def test_day_encodings_agree_when_employees_differ_later(day_encoding):
+    """Employees alike today but not on later days must not share a class in the "classes" encoding."""
+    no_days, config, inputs, constraints = prepare(two_day_json_config(), day_encoding=day_encoding,
+                                                   forbidden_constraints=[(1, 1)])
+    schedule, _ = run_daily(no_days, config, inputs, constraints)
+    assert schedule is not None
+    assert [list(map(int, solution)) for solution in schedule] == [[2, 1], [1, 0]]
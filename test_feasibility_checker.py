@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from benchmark import prepare, random_checker_edit, synthetic_json_config
+from feasibility_checker import FeasibilityChecker, check_feasibility, check_feasibility_reference
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("tightness", [0.45, 0.7])
+def test_vectorized_matches_reference(seed, tightness):
+    """check_feasibility without the exact check returns the loop version's verdict and messages, in order."""
+    no_days, config, inputs, constraints = prepare(synthetic_json_config(60, 30, seed=seed, tightness=tightness, leave_ratio=0.4))
+    assert check_feasibility(config, inputs, constraints, no_days, exact=False) == \
+        check_feasibility_reference(config, inputs, constraints, no_days)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_checker_matches_full_check(seed):
+    """After every random edit, FeasibilityChecker.check() returns what check_feasibility returns on the edited inputs."""
+    rng = random.Random(seed)
+    no_days, config, inputs, constraints = prepare(synthetic_json_config(40, 28, seed=seed, tightness=0.7))
+    checker = FeasibilityChecker(config, inputs, constraints, no_days)
+    assert checker.check() == check_feasibility(config, inputs, constraints, no_days)
+    for _ in range(60):
+        kind = random_checker_edit(rng, checker, config, inputs, constraints, no_days)
+        assert checker.check() == check_feasibility(config, inputs, constraints, no_days), kind
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from benchmark import check_day_solution, day_cost, prepare, random_day_inputs, synthetic_json_config
+from csp import create_day_schedule
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_flow_engine_matches_cpsat(seed):
+    """The min-cost flow day engine agrees with the CP-SAT day model on feasibility and optimal cost."""
+    rng = random.Random(seed)
+    json_config = synthetic_json_config(rng.choice([20, 50]), 14, seed=seed, tightness=rng.uniform(0.3, 0.75), leave_ratio=0.3)
+    no_days, config, inputs, constraints = prepare(json_config)
+    day, day_inputs = random_day_inputs(no_days, config, inputs, rng)
+
+    results = {}
+    for engine in ("cpsat", "flow"):
+        config["day_engine"] = engine
+        results[engine], _ = create_day_schedule(config, day_inputs, constraints, current_day=day)
+
+    assert (results["cpsat"] is None) == (results["flow"] is None)
+    if results["flow"] is not None:
+        check_day_solution(config, day_inputs, constraints, day, results["flow"])
+        assert day_cost(day_inputs, results["flow"]) == day_cost(day_inputs, results["cpsat"])
@@ -1,5 +1,4 @@
 import datetime
-import pandas as pd
 
 def validate_config(config):
     required_keys = {
@@ -16,8 +15,8 @@ def validate_config(config):
     
     ############################# Start date and end date #############################
     try: 
-        config['start_date'] = pd.to_datetime(config["start_date"])
-        config['end_date'] = pd.to_datetime(config["end_date"])
+        config['start_date'] = datetime.datetime.strptime(config["start_date"], "%Y-%m-%d")
+        config['end_date'] = datetime.datetime.strptime(config["end_date"], "%Y-%m-%d")
     except:
         raise ValueError('Start date and end date must be in the format YYYY-MM-DD')
     if config['start_date'] > config['end_date']:
@@ -42,8 +41,8 @@ def validate_config(config):
         if not required_keys_shifts.issubset(shift.keys()):
             raise ValueError(f'Each shift must contain the keys: {required_keys_shifts}')
         try:
-            shift['start_time'] = datetime.datetime.combine(datetime.date.min, pd.to_datetime(shift['start_time']).time())
-            shift['end_time'] = datetime.datetime.combine(datetime.date.min, pd.to_datetime(shift['end_time']).time())
+            shift['start_time'] = datetime.datetime.combine(datetime.date.min, datetime.datetime.strptime(shift['start_time'], "%H:%M:%S").time())
+            shift['end_time'] = datetime.datetime.combine(datetime.date.min, datetime.datetime.strptime(shift['end_time'], "%H:%M:%S").time())
             if shift['start_time'] >= shift['end_time']:
                 shift['end_time'] += datetime.timedelta(days=1)
         except:
@@ -148,8 +147,8 @@ def validate_config(config):
                 
                 # Validate date formats
                 try:
-                    leave_start = pd.to_datetime(leave['start_date'])
-                    leave_end = pd.to_datetime(leave['end_date'])
+                    leave_start = datetime.datetime.strptime(leave['start_date'], "%Y-%m-%d")
+                    leave_end = datetime.datetime.strptime(leave['end_date'], "%Y-%m-%d")
                 except:
                     raise ValueError(f'Employee {emp_idx} (ID: {employee.get("employee_id", "unknown")}): Leave {leave_idx} dates must be in format YYYY-MM-DD')
                 
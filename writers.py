@@ -0,0 +1,81 @@
+"""
+Incremental roster writers.
+Write a roster one day at a time, as iter_roaster commits days, without holding the whole roster.
+"""
+import csv
+
+
+def shift_label(value):
+    return f"Shift {value}" if value != 0 else "Off"
+
+
+class RosterCsvWriter:
+    """
+    Writes roster.csv with one row per day: the date, then one column per employee id.
+
+    Rows are flushed as they are written, so the file can be read while the
+    roster is still being generated.
+    """
+
+    def __init__(self, path, employees):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Date"] + [employee["employee_id"] for employee in employees])
+
+    def write_day(self, date, solution):
+        self.writer.writerow([date.strftime("%Y-%m-%d")] + [shift_label(value) for value in solution])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RosterXlsxWriter:
+    """
+    Writes roster.xlsx with one row per day, coloured like Roster.to_xlsx's workbook.
+
+    Uses openpyxl's write-only mode, which streams rows to disk; the workbook
+    is only valid once closed.
+    """
+
+    def __init__(self, path, employees, shift_colours):
+        # Deferred: openpyxl is only imported by runs that write a workbook
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import PatternFill
+
+        self.path = path
+        self.cell_class = WriteOnlyCell
+        self.no_fill = PatternFill(fill_type=None)
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Roaster")
+        self.header_fill = PatternFill(start_color="FFFF99", end_color="FFFF99", fill_type="solid")
+        self.fills = {label: PatternFill(start_color=colour, end_color=colour, fill_type="solid")
+                      for label, colour in shift_colours.items()}
+        self.sheet.append([self._cell("Date", self.header_fill)] +
+                          [self._cell(employee["employee_id"], self.header_fill) for employee in employees])
+
+    def _cell(self, value, fill):
+        cell = self.cell_class(self.sheet, value=value)
+        cell.fill = fill
+        return cell
+
+    def write_day(self, date, solution):
+        labels = [shift_label(value) for value in solution]
+        self.sheet.append([self._cell(date.strftime("%Y-%m-%d"), self.header_fill)] +
+                          [self._cell(label, self.fills.get(label, self.no_fill)) for label in labels])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()